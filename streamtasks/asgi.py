@@ -108,6 +108,11 @@ class ASGIEventReceiver(Receiver[ASGIEventMessage]):
     super().__init__(client)
     self._recv_port = recv_port
 
+  @property
+  def dispatch_topics(self): return ()
+  @property
+  def dispatch_ports(self): return (self._recv_port,)
+
   def on_message(self, message: Message):
     if not isinstance(message, AddressedMessage): return
     if message.port != self._recv_port: return
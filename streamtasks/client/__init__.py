@@ -1,27 +1,32 @@
 from typing import Iterable, Optional, Any, Union
 import asyncio
-from streamtasks.client.discovery import request_addresses
+from streamtasks.client.discovery import DiscoveryLeases, request_addresses, request_topic_ids
 from streamtasks.client.receiver import Receiver
 from streamtasks.client.topic import InTopic, InTopicSynchronizer, OutTopic, InTopicsContext, OutTopicsContext, SynchronizedInTopic
-from streamtasks.client.discovery import DiscoveryConstants, GenerateTopicsRequestBody, GenerateTopicsResponseBody, ResolveAddressRequestBody, ResolveAddressResonseBody
-from streamtasks.utils import IdGenerator, IdTracker, AwaitableIdTracker
+from streamtasks.client.discovery import DiscoveryConstants, ResolveAddressRequestBody, ResolveAddressResonseBody
+from streamtasks.utils import FlowControlPolicy, IdGenerator, IdTracker, AwaitableIdTracker
 from streamtasks.net.serialization import RawData
 from streamtasks.net import Endpoint, EndpointOrAddress, Link, endpoint_or_address_to_endpoint
 from streamtasks.net.helpers import ids_to_priced_ids
-from streamtasks.net.messages import AddressedMessage, AddressesChangedMessage, InTopicsChangedMessage, OutTopicsChangedMessage, TopicControlData, TopicDataMessage, TopicMessage
+from streamtasks.net.messages import AddressedMessage, AddressesChangedMessage, InTopicsChangedMessage, Message, OutTopicsChangedMessage, TopicControlData, TopicDataMessage, TopicMessage
 from streamtasks.services.constants import NetworkAddresses, NetworkPorts
-from streamtasks.client.fetch import FetchError, FetchReponseReceiver, FetchRequestMessage, FetchResponseMessage
+from streamtasks.client.fetch import FetchError, FetchRequestMessage, FetchResponseDispatcher
 
 
 class Client:
-  def __init__(self, link: Link):
+  def __init__(self, link: Link, leases: Optional[DiscoveryLeases] = None):
     self._link = link
+    self._leases = leases
     self._started_event = asyncio.Event()
     self._receivers: list[Receiver] = []
+    self._topic_receivers: dict[Optional[int], tuple[Receiver, ...]] = {}
+    self._port_receivers: dict[Optional[int], tuple[Receiver, ...]] = {}
     self._receive_task: Optional[asyncio.Task] = None
+    self._receivers_changed = asyncio.Event()
     self._address: Optional[int] = None
     self._address_resolver_cache: dict[str, int] = {}
     self._port_generator = IdGenerator(NetworkPorts.DYNAMIC_START, 0xffffffffffffffff)
+    self._fetch_dispatcher: Optional[FetchResponseDispatcher] = None
 
     self._subscribed_provided_topics = AwaitableIdTracker()
     self._in_topics = IdTracker()
@@ -31,8 +36,9 @@ class Client:
   def address(self): return self._address
 
   def out_topic(self, topic: int): return OutTopic(self, topic)
-  def in_topic(self, topic: int): return InTopic(self, topic)
-  def sync_in_topic(self, topic: int, sync: InTopicSynchronizer): return SynchronizedInTopic(self, topic, sync)
+  def in_topic(self, topic: int, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK): return InTopic(self, topic, max_size=max_size, policy=policy)
+  def sync_in_topic(self, topic: int, sync: InTopicSynchronizer, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK):
+    return SynchronizedInTopic(self, topic, sync, max_size, policy)
 
   def start(self): self._started_event.set()
   async def stop_wait(self):
@@ -60,18 +66,17 @@ class Client:
     return res.address
 
   async def request_address(self):
-    addresses = await request_addresses(self, 1)
-    new_address = next(iter(addresses))
+    if self._leases is None: new_address = next(iter(await request_addresses(self, 1)))
+    else: new_address = (await self._leases.addresses.take(1))[0]
     assert self._address is None, "there cant be an address already present, when requesting one"
     await self.set_address(new_address)
     return new_address
 
   async def request_topic_ids(self, count: int, apply: bool = False) -> list[int]:
-    raw_res = await self.fetch(NetworkAddresses.ID_DISCOVERY, DiscoveryConstants.FD_REQUEST_TOPICS, GenerateTopicsRequestBody(count=count).model_dump())
-    res = GenerateTopicsResponseBody.model_validate(raw_res)
-    if len(res.topics) != count: raise Exception("The fetch request returned an invalid number of topics")
-    if apply: await self.register_out_topics(res.topics)
-    return res.topics
+    if self._leases is None: topics = await request_topic_ids(self, count)
+    else: topics = await self._leases.topic_ids.take(count)
+    if apply: await self.register_out_topics(topics)
+    return topics
 
   async def set_address(self, address: Optional[int]):
     new_addresses = set() if address is None else set([ address ])
@@ -100,23 +105,31 @@ class Client:
 
   async def fetch(self, endpoint: EndpointOrAddress, descriptor: str, body: Any):
     if self.address is None: raise Exception("No local address")
-    return_port = self.get_free_port()
-    async with FetchReponseReceiver(self, return_port) as receiver:
-      await self.send_to(endpoint_or_address_to_endpoint(endpoint, NetworkPorts.FETCH), RawData(FetchRequestMessage(
-        return_address=self.address,
-        return_port=return_port,
-        descriptor=descriptor,
-        body=body).model_dump()))
-      response_data: FetchResponseMessage = await receiver.get()
+    if self._fetch_dispatcher is None: self._fetch_dispatcher = FetchResponseDispatcher(self, self.get_free_port())
+    async with self._fetch_dispatcher as dispatcher:
+      request_id, response = dispatcher.create_request()
+      try:
+        await self.send_to(endpoint_or_address_to_endpoint(endpoint, NetworkPorts.FETCH), RawData(FetchRequestMessage(
+          return_address=self.address,
+          return_port=dispatcher.return_port,
+          request_id=request_id,
+          descriptor=descriptor,
+          body=body).model_dump()))
+        response_data = await response
+      finally: dispatcher.remove_request(request_id)
     if response_data.error:
       raise FetchError(response_data.body)
     return response_data.body
 
   async def enable_receiver(self, receiver: Receiver):
     self._receivers.append(receiver)
+    self._update_receiver_index(receiver, True)
     self._receive_task = self._receive_task or asyncio.create_task(self._task_receive())
   async def disable_receiver(self, receiver: Receiver):
     self._receivers.remove(receiver)
+    self._update_receiver_index(receiver, False)
+    self._receivers_changed.set()
+    self._receivers_changed.clear()
     if len(self._receivers) == 0 and self._receive_task is not None:
       self._receive_task.cancel()
       try: await self._receive_task
@@ -128,6 +141,29 @@ class Client:
 
   async def _get_address(self, address: Union[int, str]) -> int: return await self.resolve_address_name(address) if isinstance(address, str) else address
 
+  def _update_receiver_index(self, receiver: Receiver, add: bool):
+    # NOTE: receivers without a restriction are stored under the None key
+    for index, keys in ((self._topic_receivers, receiver.dispatch_topics), (self._port_receivers, receiver.dispatch_ports)):
+      for key in ((None,) if keys is None else keys):
+        receivers = index.get(key, ())
+        if add: index[key] = receivers + (receiver,)
+        elif len(receivers) > 1: index[key] = tuple(r for r in receivers if r is not receiver)
+        else: index.pop(key, None)
+
+  def _get_receivers(self, message: Message) -> tuple[Receiver, ...]:
+    if isinstance(message, TopicMessage): return self._topic_receivers.get(message.topic, ()) + self._topic_receivers.get(None, ())
+    if isinstance(message, AddressedMessage): return self._port_receivers.get(message.port, ()) + self._port_receivers.get(None, ())
+    return tuple(self._receivers)
+
+  async def _wait_receivers_writable(self, receivers: tuple[Receiver, ...]):
+    # NOTE: stop reading from the link while a blocking receiver is full, so that the backpressure reaches the sender
+    for receiver in receivers:
+      while receiver.blocking and receiver in self._receivers:
+        waiters = (asyncio.ensure_future(receiver.wait_writable()), asyncio.ensure_future(self._receivers_changed.wait()))
+        try: await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+          for waiter in waiters: waiter.cancel()
+
   async def _task_receive(self):
     try:
       while len(self._receivers) > 0:
@@ -136,7 +172,8 @@ class Client:
         await self._started_event.wait()
         if isinstance(message, InTopicsChangedMessage): self._subscribed_provided_topics.change_many(message.add, message.remove)
         if isinstance(message, TopicMessage) and message.topic not in self._in_topics: continue
-        for receiver in self._receivers:
-          receiver.on_message(message)
+        receivers = self._get_receivers(message)
+        for receiver in receivers: receiver.on_message(message)
+        await self._wait_receivers_writable(receivers)
     finally:
       self._receive_task = None
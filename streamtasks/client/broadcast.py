@@ -48,6 +48,9 @@ class BroadcastReceiver(Receiver[T]):
     self._endpoint = endpoint_or_address_to_endpoint(endpoint, NetworkPorts.BROADCAST)
     self._topics_ns_map: dict[int, str] = {}
 
+  @property
+  def dispatch_ports(self): return ()
+
   async def _on_start_recv(self):
     ns_topic_map: dict[int, str] = await self._client.fetch(self._endpoint, "gettopics", list(self._namespaces))
     self._topics_ns_map: dict[int, str] = { v:k for k, v in ns_topic_map.items() }
@@ -1,6 +1,7 @@
+from collections import deque
 from contextlib import asynccontextmanager
 import secrets
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, Optional
 from pydantic import BaseModel, ValidationError, field_validator
 from streamtasks.client.broadcast import BroadcastReceiver
 from streamtasks.client.receiver import Receiver
@@ -96,6 +97,11 @@ class TopicSignalReceiver(Receiver):
     self._topic = topic
     self._signal_event = asyncio.Event()
 
+  @property
+  def dispatch_topics(self): return (self._topic,)
+  @property
+  def dispatch_ports(self): return ()
+
   async def _on_start_recv(self): await self._client.register_in_topics([self._topic])
   async def _on_stop_recv(self): await self._client.unregister_in_topics([self._topic])
 
@@ -113,6 +119,11 @@ class ResolveAddressesReceiver(Receiver[GenerateAddressesResponseMessage]):
     super().__init__(client)
     self._request_id = request_id
 
+  @property
+  def dispatch_topics(self): return (NetworkTopics.ADDRESSES_CREATED,)
+  @property
+  def dispatch_ports(self): return ()
+
   async def _on_start_recv(self): await self._client.register_in_topics([NetworkTopics.ADDRESSES_CREATED])
   async def _on_stop_recv(self): await self._client.unregister_in_topics([NetworkTopics.ADDRESSES_CREATED])
 
@@ -145,6 +156,35 @@ async def request_addresses(client: 'Client', count: int) -> set[int]:
   if len(addresses) != count: raise Exception("The response returned an invalid number of addresses")
   return addresses
 
+async def request_topic_ids(client: 'Client', count: int) -> list[int]:
+  raw_res = await client.fetch(NetworkAddresses.ID_DISCOVERY, DiscoveryConstants.FD_REQUEST_TOPICS, GenerateTopicsRequestBody(count=count).model_dump())
+  res = GenerateTopicsResponseBody.model_validate(raw_res)
+  if len(res.topics) != count: raise Exception("The fetch request returned an invalid number of topics")
+  return res.topics
+
+class IdLease:
+  """
+  Requests ids in batches and hands them out locally, so that most requests do not need a round trip to the discovery.
+  Leased ids that are never handed out are simply lost, the discovery never hands out an id twice.
+  """
+  def __init__(self, request: Callable[[int], Awaitable[Iterable[int]]], batch_size: int) -> None:
+    self.batch_size = batch_size
+    self._request = request
+    self._ids: deque[int] = deque()
+    self._lock = asyncio.Lock()
+
+  async def take(self, count: int) -> list[int]:
+    async with self._lock: # NOTE: concurrent requests wait for one batch instead of requesting their own
+      missing = count - len(self._ids)
+      if missing > 0: self._ids.extend(sorted(await self._request(max(missing, self.batch_size))))
+      return [ self._ids.popleft() for _ in range(count) ]
+
+class DiscoveryLeases:
+  """address and topic id leases, which can be shared by the clients of a worker."""
+  def __init__(self, client: 'Client', address_batch_size: int = 32, topic_id_batch_size: int = 64) -> None:
+    self.addresses = IdLease(lambda count: request_addresses(client, count), address_batch_size)
+    self.topic_ids = IdLease(lambda count: request_topic_ids(client, count), topic_id_batch_size)
+
 async def delete_topic_space(client: 'Client', id: int): await client.fetch(NetworkAddresses.ID_DISCOVERY, DiscoveryConstants.FD_DELETE_TOPIC_SPACE, TopicSpaceRequestMessage(id=id).model_dump())
 async def register_topic_space(client: 'Client', topic_ids: set[int]) -> tuple[int, dict[int, int]]:
   result = await client.fetch(NetworkAddresses.ID_DISCOVERY, DiscoveryConstants.FD_REGISTER_TOPIC_SPACE, RegisterTopicSpaceRequestMessage(topic_ids=topic_ids).model_dump())
@@ -9,32 +9,36 @@ from typing import TYPE_CHECKING, Any, Callable, Awaitable
 import logging
 
 from streamtasks.services.constants import NetworkPorts
+from streamtasks.utils import AsyncTaskManager, IdGenerator
 if TYPE_CHECKING:
   from streamtasks.client import Client
 
 class FetchRequestMessage(BaseModel):
   return_address: int
   return_port: int
+  request_id: int = 0
   descriptor: str
   body: Any
 
 class FetchResponseMessage(BaseModel):
+  request_id: int = 0
   body: Any
   error: bool = False
 
 class FetchRequest:
-  def __init__(self, client: 'Client', return_endpoint: Endpoint, body: Any):
+  def __init__(self, client: 'Client', return_endpoint: Endpoint, body: Any, request_id: int = 0):
     self._client = client
     self._return_endpoint = return_endpoint
+    self._request_id = request_id
     self.body = body
     self.response_sent = False
 
   async def respond(self, body: Any):
-    await self._client.send_to(self._return_endpoint, RawData(FetchResponseMessage(body=body).model_dump()))
+    await self._client.send_to(self._return_endpoint, RawData(FetchResponseMessage(request_id=self._request_id, body=body).model_dump()))
     self.response_sent = True
 
   async def respond_error(self, content: Any):
-    await self._client.send_to(self._return_endpoint, RawData(FetchResponseMessage(body=content, error=True).model_dump()))
+    await self._client.send_to(self._return_endpoint, RawData(FetchResponseMessage(request_id=self._request_id, body=content, error=True).model_dump()))
     self.response_sent = True
 
 class FetchErrorStatusCode(Enum):
@@ -63,23 +67,54 @@ class FetchError(BaseException):
       return f"<FetchError {FetchErrorStatusCode(self.body[0])}: {self.body[1]}>"
     return f"<FetchError {self.body}>"
 
-class FetchReponseReceiver(Receiver[FetchResponseMessage]):
+class FetchResponseDispatcher(Receiver[FetchResponseMessage]):
+  """
+  Receives the responses to many in-flight requests on one port and matches them by request id.
+  Servers without request ids respond with id 0, these responses are matched to the oldest pending request.
+  """
   def __init__(self, client: 'Client', return_port: int):
     super().__init__(client)
     self._return_port = return_port
+    self._request_id_generator = IdGenerator(1, 0xffffffffffffffff)
+    self._pending: dict[int, asyncio.Future[FetchResponseMessage]] = {}
+
+  @property
+  def return_port(self): return self._return_port
+  @property
+  def dispatch_topics(self): return ()
+  @property
+  def dispatch_ports(self): return (self._return_port,)
+
+  def create_request(self) -> tuple[int, asyncio.Future[FetchResponseMessage]]:
+    request_id = self._request_id_generator.next()
+    self._pending[request_id] = fut = asyncio.get_running_loop().create_future()
+    return request_id, fut
+  def remove_request(self, request_id: int): self._pending.pop(request_id, None)
 
   def on_message(self, message: Message):
     if not isinstance(message, AddressedMessage): return
-    a_message: AddressedMessage = message
-    if not a_message.port == self._return_port or not isinstance(a_message.data, RawData): return
-    try: self._recv_queue.put_nowait(FetchResponseMessage.model_validate(a_message.data.data))
-    except ValidationError: pass
+    if message.port != self._return_port or not isinstance(message.data, RawData): return
+    try: response = FetchResponseMessage.model_validate(message.data.data)
+    except ValidationError: return
+    if response.request_id == 0: fut = self._pending.pop(next(iter(self._pending)), None) if self._pending else None
+    else: fut = self._pending.pop(response.request_id, None)
+    if fut is not None and not fut.done(): fut.set_result(response)
 
 class FetchServer(Receiver[tuple[str, FetchRequest]]):
-  def __init__(self, client: 'Client', port: int = NetworkPorts.FETCH):
+  """
+  Handles requests one at a time by default.
+  Servers whose handlers are safe to interleave at their awaits can handle up to max_concurrency requests at once.
+  """
+  def __init__(self, client: 'Client', port: int = NetworkPorts.FETCH, max_concurrency: int = 1):
     super().__init__(client)
     self._descriptor_mapping: dict[str, Callable[[FetchRequest], Awaitable[Any]]] = {}
     self._port = port
+    self._max_concurrency = max_concurrency
+
+  @property
+  def dispatch_topics(self): return ()
+  @property
+  def dispatch_ports(self): return (self._port,)
 
   def add_route(self, descriptor: str, func: Callable[[FetchRequest], Awaitable[Any]]): self._descriptor_mapping[descriptor] = func
   def remove_route(self, descriptor: str): self._descriptor_mapping.pop(descriptor, None)
@@ -97,19 +132,30 @@ class FetchServer(Receiver[tuple[str, FetchRequest]]):
     try:
       fr_message = FetchRequestMessage.model_validate(a_message.data.data)
       if fr_message.descriptor in self._descriptor_mapping:
-        self._recv_queue.put_nowait((fr_message.descriptor, FetchRequest(self._client, (fr_message.return_address, fr_message.return_port), fr_message.body)))
+        self._recv_queue.put_nowait((fr_message.descriptor, FetchRequest(self._client, (fr_message.return_address, fr_message.return_port), fr_message.body, fr_message.request_id)))
     except ValidationError: pass
 
   async def run(self):
-    async with self:
-      while True:
-        descriptor, fr = await self.get()
-        if descriptor in self._descriptor_mapping:
-          try:
-            await self._descriptor_mapping[descriptor](fr)
-            if not fr.response_sent: await fr.respond(None)
-          except asyncio.CancelledError: raise
-          except ValidationError as e: await fr.respond_error(new_fetch_body_bad_request(str(e)))
-          except BaseException as e:
-            if not fr.response_sent: await fr.respond_error(new_fetch_body_general_error(str(e)))
-            logging.debug(e, descriptor)
+    tasks = AsyncTaskManager()
+    semaphore = asyncio.Semaphore(self._max_concurrency)
+    try:
+      async with self:
+        while True:
+          descriptor, fr = await self.get()
+          await semaphore.acquire()
+          tasks.create(self._handle_request(descriptor, fr, semaphore))
+    finally:
+      await tasks.cancel_all()
+
+  async def _handle_request(self, descriptor: str, fr: FetchRequest, semaphore: asyncio.Semaphore):
+    try:
+      if descriptor not in self._descriptor_mapping: return
+      await self._descriptor_mapping[descriptor](fr)
+      if not fr.response_sent: await fr.respond(None)
+    except asyncio.CancelledError: raise
+    except ValidationError as e: await fr.respond_error(new_fetch_body_bad_request(str(e)))
+    except BaseException as e:
+      if not fr.response_sent: await fr.respond_error(new_fetch_body_general_error(str(e)))
+      logging.debug(e, descriptor)
+    finally:
+      semaphore.release()
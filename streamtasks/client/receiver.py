@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
 from streamtasks.net.serialization import RawData
 from streamtasks.net.messages import Message, TopicControlData, TopicControlMessage, TopicDataMessage, TopicMessage
-from typing import Generic, Iterable, TYPE_CHECKING, TypeVar
+from typing import Generic, Iterable, Optional, TYPE_CHECKING, TypeVar
 import asyncio
+from streamtasks.utils import FlowControlPolicy, FlowControlQueue
 
 if TYPE_CHECKING:
   from streamtasks.client import Client
@@ -10,11 +11,18 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 
 class Receiver(ABC, Generic[T]):
-  def __init__(self, client: 'Client'):
-    self._recv_queue: asyncio.Queue[T] = asyncio.Queue()
+  def __init__(self, client: 'Client', max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK):
+    self._recv_queue: FlowControlQueue[T] = FlowControlQueue(max_size, policy)
     self._client: 'Client' = client
     self._receiving_count: int = 0
 
+  # NOTE: the client only passes topic and addressed messages to receivers of their topic or port, None receives all.
+  # Must not change while the receiver is enabled.
+  @property
+  def dispatch_topics(self) -> Optional[Iterable[int]]: return None
+  @property
+  def dispatch_ports(self) -> Optional[Iterable[int]]: return None
+
   @abstractmethod
   def on_message(self, message: Message):
     pass
@@ -33,7 +41,11 @@ class Receiver(ABC, Generic[T]):
     await asyncio.sleep(0)
     await self._on_stop_recv()
 
+  @property
+  def blocking(self): return self._recv_queue.policy == FlowControlPolicy.BLOCK and self._recv_queue.full()
+
   def empty(self): return self._recv_queue.empty()
+  async def wait_writable(self): await self._recv_queue.wait_writable()
   async def get(self): return await self._recv_queue.get()
   async def recv(self):
     async with self: return await self.get()
@@ -52,6 +64,11 @@ class TopicsReceiver(Receiver[tuple[int, RawData | TopicControlData]]):
     self._topics: set[int] = set(topics)
     self._subscribe = subscribe
 
+  @property
+  def dispatch_topics(self): return self._topics
+  @property
+  def dispatch_ports(self): return ()
+
   async def _on_start_recv(self):
     if self._subscribe and len(self._topics) > 0: await self._client.register_in_topics(self._topics)
   async def _on_stop_recv(self):
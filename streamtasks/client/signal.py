@@ -22,6 +22,11 @@ class SignalServer(Receiver[tuple[str, Any]]):
     self._descriptor_mapping: dict[str, Callable[[Any], Awaitable[Any]]] = {}
     self._port = port
 
+  @property
+  def dispatch_topics(self): return ()
+  @property
+  def dispatch_ports(self): return (self._port,)
+
   def add_route(self, descriptor: str, func: Callable[[Any], Awaitable[Any]]): self._descriptor_mapping[descriptor] = func
   def remove_route(self, descriptor: str): self._descriptor_mapping.pop(descriptor, None)
 
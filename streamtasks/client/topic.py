@@ -3,7 +3,7 @@ import asyncio
 from enum import Enum, auto
 from typing import TYPE_CHECKING, Iterable, Optional
 from streamtasks.client.receiver import Receiver
-from streamtasks.utils import AsyncBool, AsyncTrigger
+from streamtasks.utils import AsyncBool, AsyncMinTracker, AsyncTrigger, FlowControlPolicy
 from streamtasks.net.serialization import RawData
 from streamtasks.message.utils import get_timestamp_from_message
 from streamtasks.net import Message
@@ -57,11 +57,18 @@ class _InTopicAction(Enum):
 
 
 class _InTopicReceiver(Receiver[tuple[_InTopicAction, None | int | TopicControlData | RawData]]):
-  def __init__(self, client: 'Client', topic: int):
-    super().__init__(client)
+  def __init__(self, client: 'Client', topic: int, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK):
+    super().__init__(client, max_size, policy)
     self._topic = topic
 
-  def _put_msg(self, action: _InTopicAction, data: None | int | TopicControlData | RawData): self._recv_queue.put_nowait((action, data))
+  @property
+  def dispatch_topics(self): return (self._topic,)
+  @property
+  def dispatch_ports(self): return ()
+
+  def _put_msg(self, action: _InTopicAction, data: None | int | TopicControlData | RawData):
+    # NOTE: only data follows the drop policy, cost and control changes are always kept
+    self._recv_queue.put_nowait((action, data), None if action == _InTopicAction.DATA else FlowControlPolicy.BLOCK)
 
   def on_message(self, message: Message):
     if isinstance(message, OutTopicsChangedMessage):
@@ -75,9 +82,9 @@ class _InTopicReceiver(Receiver[tuple[_InTopicAction, None | int | TopicControlD
       if isinstance(message, TopicDataMessage): self._put_msg(_InTopicAction.DATA, message.data)
 
 class InTopic(_TopicBase):
-  def __init__(self, client: 'Client', topic: int, receiver: Optional[_InTopicReceiver] = None) -> None:
+  def __init__(self, client: 'Client', topic: int, receiver: Optional[_InTopicReceiver] = None, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK) -> None:
     super().__init__(client, topic)
-    self._receiver = receiver if receiver else _InTopicReceiver(client, topic)
+    self._receiver = receiver if receiver else _InTopicReceiver(client, topic, max_size, policy)
     self._a_is_paused = AsyncBool()
     self._cost: Optional[int] = None
 
@@ -117,16 +124,16 @@ class InTopicSynchronizer:
 class SequentialInTopicSynchronizer(InTopicSynchronizer):
   def __init__(self) -> None:
     super().__init__()
-    self._topic_timestamps: dict[int, int] = {}
+    self._topic_timestamps: AsyncMinTracker[int] = AsyncMinTracker()
     self._timestamp_trigger = AsyncTrigger()
 
   @property
-  def min_timestamp(self): return 0 if len(self._topic_timestamps) == 0 else min(self._topic_timestamps.values())
+  def min_timestamp(self): return self._topic_timestamps.min
 
   async def wait_for(self, topic_id: int, timestamp: int) -> bool:
     if timestamp < self._topic_timestamps.get(topic_id, 0): return False # NOTE: drop the past
     self._set_topic_timestamp(topic_id, timestamp)
-    while self._is_waiting(topic_id, timestamp): await self._timestamp_trigger.wait()
+    while self._is_waiting(topic_id, timestamp): await self._wait_changed(timestamp)
     return True
 
   async def set_paused(self, topic_id: int, paused: bool):
@@ -134,9 +141,10 @@ class SequentialInTopicSynchronizer(InTopicSynchronizer):
     else: self._set_topic_timestamp(topic_id, self.min_timestamp)
 
   def _is_waiting(self, topic_id: int, timestamp: int): return self.min_timestamp < timestamp
+  def _wait_changed(self, timestamp: int): return self._topic_timestamps.wait_min(timestamp)
   def _set_topic_timestamp(self, topic_id: int, timestamp: int | None):
-    if timestamp is None: self._topic_timestamps.pop(topic_id, None)
-    else: self._topic_timestamps[topic_id] = timestamp
+    if timestamp is None: self._topic_timestamps.remove(topic_id)
+    else: self._topic_timestamps.set(topic_id, timestamp)
     self._timestamp_trigger.trigger()
 
 class PrioritizedSequentialInTopicSynchronizer(SequentialInTopicSynchronizer):
@@ -157,6 +165,7 @@ class PrioritizedSequentialInTopicSynchronizer(SequentialInTopicSynchronizer):
   def set_priority(self, topic_id: int, priority: int):
     self._topic_priorities[topic_id] = priority
 
+  def _wait_changed(self, timestamp: int): return self._timestamp_trigger.wait() # NOTE: priorities can change who waits without changing the minimum
   def _is_waiting(self, topic_id: int, timestamp: int):
     min_timestamp = self.min_timestamp
     if min_timestamp < timestamp: return True
@@ -165,8 +174,8 @@ class PrioritizedSequentialInTopicSynchronizer(SequentialInTopicSynchronizer):
     return any(True for tid, timestamp in self._topic_timestamps.items() if tid != topic_id and timestamp == min_timestamp and tid not in self._done_topics and self._topic_priorities.get(tid, 0) > priority)
 
 class _SynchronizedInTopicReceiver(_InTopicReceiver):
-  def __init__(self, client: 'Client', topic: int, sync: InTopicSynchronizer):
-    super().__init__(client, topic)
+  def __init__(self, client: 'Client', topic: int, sync: InTopicSynchronizer, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK):
+    super().__init__(client, topic, max_size, policy)
     self._sync = sync
 
   async def get(self):
@@ -184,8 +193,8 @@ class _SynchronizedInTopicReceiver(_InTopicReceiver):
         except ValueError: pass
 
 class SynchronizedInTopic(InTopic):
-  def __init__(self, client: 'Client', topic: int, sync: InTopicSynchronizer) -> None:
-    super().__init__(client, topic, _SynchronizedInTopicReceiver(client, topic, sync))
+  def __init__(self, client: 'Client', topic: int, sync: InTopicSynchronizer, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK) -> None:
+    super().__init__(client, topic, _SynchronizedInTopicReceiver(client, topic, sync, max_size, policy))
 
 class _OutTopicAction(Enum):
   SET_REQUESTED = auto()
@@ -196,6 +205,11 @@ class _OutTopicReceiver(Receiver[tuple[_OutTopicAction, bool]]):
     super().__init__(client)
     self._topic = topic
 
+  @property
+  def dispatch_topics(self): return ()
+  @property
+  def dispatch_ports(self): return ()
+
   def _put_msg(self, action: _OutTopicAction, data: bool): self._recv_queue.put_nowait((action, data))
   def on_message(self, message: Message):
     if isinstance(message, InTopicsChangedMessage):
@@ -69,7 +69,7 @@ class AutoReconnector(Worker):
       while True:
         try:
           link = await self.connect_fn()
-          await self.switch.add_link(link)
+          await self.add_link(link)
           self._async_connected.set(True)
           link.on_closed.append(functools.partial(self._async_connected.set, False))
           if link.closed: self._async_connected.set(False) # in case it closed already
@@ -129,13 +129,21 @@ class RawConnection(ABC):
 
 class RawStreamConnection(RawConnection):
   SYNC_WORD = b"\xb8\x23\xa0\x6f"
+  FRAME_HEADER = struct.Struct("<4sL")
 
-  def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+  def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, flush_delay: float = 0, max_write_buffer_size: int = 1 << 16) -> None:
     super().__init__()
     self._reader = reader
     self._writer = writer
+    self._flush_delay = flush_delay
+    self._max_write_buffer_size = max_write_buffer_size
+    self._write_buffer: list[bytes] = []
+    self._write_buffer_size = 0
+    self._flush_handle: asyncio.Handle | None = None
 
-  def close(self): self._writer.close()
+  def close(self):
+    self._flush()
+    self._writer.close()
 
   async def send(self, data: bytes):
     try: return await super().send(data)
@@ -148,17 +156,32 @@ class RawStreamConnection(RawConnection):
       raise ConnectionClosedError(str(e))
 
   async def _send(self, data: bytes):
-    self._writer.write(RawStreamConnection.SYNC_WORD)
-    self._writer.write(struct.pack("<L", len(data)))
-    self._writer.write(data)
-    await self._writer.drain()
+    if self._writer.is_closing(): raise ConnectionResetError("Connection is closing")
+    self._write_buffer.append(RawStreamConnection.FRAME_HEADER.pack(RawStreamConnection.SYNC_WORD, len(data)))
+    self._write_buffer.append(data)
+    self._write_buffer_size += RawStreamConnection.FRAME_HEADER.size + len(data)
+    # frames are coalesced and written at the latest after flush_delay, or once the buffer is full
+    if self._write_buffer_size >= self._max_write_buffer_size: self._flush()
+    elif self._flush_handle is None:
+      loop = asyncio.get_running_loop()
+      self._flush_handle = loop.call_soon(self._flush) if self._flush_delay <= 0 else loop.call_later(self._flush_delay, self._flush)
+    await self._writer.drain() # NOTE: only suspends when the transport is paused
+
+  def _flush(self):
+    if self._flush_handle is not None:
+      self._flush_handle.cancel()
+      self._flush_handle = None
+    if len(self._write_buffer) == 0: return
+    if not self._writer.is_closing(): self._writer.writelines(self._write_buffer)
+    self._write_buffer = []
+    self._write_buffer_size = 0
 
   async def _recv(self) -> bytes:
-    sync_index = 0
-    while sync_index < len(RawStreamConnection.SYNC_WORD):
-      next_byte = await self._reader.readexactly(1)
-      if RawStreamConnection.SYNC_WORD[sync_index] == next_byte[0]: sync_index += 1
-      else: sync_index = 0
+    while True:
+      try:
+        await self._reader.readuntil(RawStreamConnection.SYNC_WORD)
+        break
+      except asyncio.LimitOverrunError as e: await self._reader.readexactly(e.consumed) # NOTE: discard data without a sync word
     data_len, = struct.unpack("<L", await self._reader.readexactly(4))
     return await self._reader.readexactly(data_len)
 
@@ -220,7 +243,7 @@ class StreamServerBase(ServerBase):
       connection = RawStreamConnection(reader, writer)
       await connection.init_server(self.handshake_data)
       link = RawConnectionLink(connection, self.cost)
-      await self.switch.add_link(link)
+      await self.add_link(link)
       self.on_connected()
       link.on_closed.append(self.on_disconnected)
     except BaseException as e: logging.warning(f"Failed to initialize connection. Error: {e}")
@@ -258,7 +281,7 @@ class WebsocketServer(ServerBase):
       connection = RawWebsocketConnection(socket)
       await connection.init_server(self.handshake_data)
       link = RawConnectionLink(connection, self.cost)
-      await self.switch.add_link(link)
+      await self.add_link(link)
       self.on_connected()
       link.on_closed.append(self.on_disconnected)
       link.on_closed.append(close_event.set)
@@ -6,9 +6,9 @@ import av.audio.codeccontext
 import av.codec
 from streamtasks.debugging import ddebug_value
 from streamtasks.env import DEBUG_MEDIA
-from streamtasks.media.codec import CodecInfo, Frame, Reformatter
+from streamtasks.media.pool import FrameBufferPool
+from streamtasks.media.codec import CodecInfo, CodecWorker, Frame, Reformatter
 import numpy as np
-import asyncio
 import av
 from streamtasks.media.util import apply_options_to_codec_context, options_from_codec_context
 
@@ -45,8 +45,9 @@ def sample_format_to_dtype(sample_format: str):
   return _SAMPLE_FORMAT_NP_2_AV_INFO[sample_format][1]
 
 class AudioFrame(Frame[av.AudioFrame]):
-  def to_ndarray(self):
-    return self.frame.to_ndarray()
+  def to_ndarray(self, pool: FrameBufferPool | None = None):
+    """with a pool, the data is copied into a buffer of the pool, which should be released after use."""
+    return self._to_ndarray(pool)
 
   def to_bytes(self) -> bytes: return self.to_ndarray().tobytes("C")
 
@@ -137,20 +138,30 @@ class AudioResampler(Reformatter):
     self.resampler = av.AudioResampler(to_codec.format, to_codec.layout, to_codec.rate)
     self.from_codec = from_codec
     self.min_pts = -2**31
+    self._worker = CodecWorker()
 
-  async def reformat(self, frame: AudioFrame) -> list[AudioFrame]:
-    loop = asyncio.get_running_loop()
+  async def reformat(self, frame: AudioFrame) -> list[AudioFrame]: return self._debug_frames(await self._worker.run(self.reformat_sync, frame))
+  async def reformat_all(self, frames: list[AudioFrame]): return self._debug_frames(await self._worker.run(self.reformat_all_sync, list(frames)))
+
+  def reformat_sync(self, frame: AudioFrame) -> list[AudioFrame]:
     if self.from_codec is not None:
       frame.frame.rate = self.from_codec.rate
-    av_frames = await loop.run_in_executor(None, self.resampler.resample, frame.frame)
     frames: list[AudioFrame] = []
 
-    for av_frame in av_frames:
+    for av_frame in self.resampler.resample(frame.frame):
       ts = av_frame.dts if av_frame.pts is None else av_frame.pts
       av_frame.pts = ts
       av_frame.dts = ts
 
       frames.append(AudioFrame(av_frame))
+    return frames
+
+  def reformat_all_sync(self, frames: list[AudioFrame]):
+    out_frames: list[AudioFrame] = []
+    for frame in frames: out_frames.extend(self.reformat_sync(frame))
+    return out_frames
+
+  def _debug_frames(self, frames: list[AudioFrame]):
     if DEBUG_MEDIA():
       for f in frames:
         ddebug_value("audio frame at duration", float(f.dtime or 0))
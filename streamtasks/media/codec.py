@@ -1,14 +1,18 @@
 from abc import ABC, abstractmethod
 from fractions import Fraction
-from typing import Any, ByteString, Iterable, Literal, Self, TypeVar, Generic
+import functools
+import threading
+from typing import Any, ByteString, Callable, Iterable, Literal, Self, TypeVar, Generic
 import av.codec
 import av.frame
 import av.video
 from streamtasks.media.packet import MediaPacket
+from streamtasks.media.pool import FrameBufferPool
 import av
 import asyncio
+import numpy as np
 
-from streamtasks.utils import hertz_to_fintervall
+from streamtasks.utils import SyncQueue, hertz_to_fintervall
 
 T = TypeVar('T', bound=av.frame.Frame)
 
@@ -32,9 +36,19 @@ class Frame(ABC, Generic[T]):
     self.frame.dts = ts
     self.frame.pts = ts
 
+  @abstractmethod
+  def to_ndarray(self, pool: FrameBufferPool | None = None) -> np.ndarray: pass
+
   @abstractmethod
   def to_bytes(self) -> ByteString: pass
 
+  def _to_ndarray(self, pool: FrameBufferPool | None):
+    array = self.frame.to_ndarray()
+    if pool is None: return array
+    out = pool.acquire(array.shape, array.dtype) # NOTE: the array of av may point into the frame, the pooled one is owned by the caller
+    np.copyto(out, array)
+    return out
+
   @staticmethod
   def from_av_frame(av_frame: Any) -> 'Frame[T]':
     if isinstance(av_frame, av.VideoFrame):
@@ -46,30 +60,86 @@ class Frame(ABC, Generic[T]):
 
 F = TypeVar('F', bound=Frame)
 
+def _run_codec_jobs(jobs: SyncQueue[tuple[asyncio.Future, Callable, tuple] | Callable]):
+  while True:
+    batch = jobs.get_all()
+    results: dict[asyncio.AbstractEventLoop, list[tuple[asyncio.Future, Any, BaseException | None]]] = {}
+    final_job: Callable | None = None
+    for job in batch:
+      if not isinstance(job, tuple): # NOTE: the final job, submitted on close
+        final_job = job
+        break
+      fut, fn, args = job
+      try: result = (fut, fn(*args), None)
+      except BaseException as e: result = (fut, None, e)
+      results.setdefault(fut.get_loop(), []).append(result)
+    # NOTE: the results are posted before the final job, which may close the codec or the loop waiting on them
+    for loop, loop_results in results.items(): loop.call_soon_threadsafe(_set_codec_job_results, loop_results)
+    if final_job is not None:
+      final_job()
+      return
+
+def _set_codec_job_results(results: list[tuple[asyncio.Future, Any, BaseException | None]]):
+  for fut, result, error in results:
+    if fut.done(): continue
+    if error is None: fut.set_result(result)
+    else: fut.set_exception(error)
+
+class CodecWorker:
+  """
+  Runs the operations of a codec on its own thread, so that the codec state stays on one thread.
+  Operations are run back to back in the order they were submitted, their results are handed back to the event loop in batches.
+  """
+  def __init__(self) -> None:
+    self._jobs: SyncQueue[tuple[asyncio.Future, Callable, tuple] | Callable] = SyncQueue()
+    self._thread: threading.Thread | None = None
+    self._closed = False
+
+  def __del__(self): self.close()
+
+  def run(self, fn: Callable, *args) -> asyncio.Future:
+    if self._closed: raise ValueError("The codec worker is closed!")
+    fut = asyncio.get_running_loop().create_future()
+    self._jobs.put((fut, fn, args))
+    if self._thread is None:
+      # NOTE: the thread only references the queue, so that the worker can be collected
+      self._thread = threading.Thread(target=_run_codec_jobs, args=(self._jobs,), name="codec worker", daemon=True)
+      self._thread.start()
+    return fut
+
+  def close(self, fn: Callable[[], Any] = lambda: None):
+    """stops the thread after the submitted operations, then calls fn on it."""
+    if self._closed: return
+    self._closed = True
+    if self._thread is None: fn()
+    else: self._jobs.put(fn)
+
 
 class Encoder(Generic[F]):
   def __init__(self, codec_info: 'CodecInfo[F]'):
     self.codec_info = codec_info
     self.codec_context = codec_info._get_av_codec_context("w")
     self.time_base = codec_info.time_base
+    self._worker = CodecWorker()
 
   def __del__(self): self.close()
 
-  async def encode(self, frame: F) -> list[MediaPacket]:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, self.encode_sync, frame)
-
-  async def flush(self) -> list[MediaPacket]:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, self.flush_sync)
+  async def encode(self, frame: F) -> list[MediaPacket]: return await self._worker.run(self.encode_sync, frame)
+  async def encode_all(self, frames: Iterable[F]) -> list[MediaPacket]: return await self._worker.run(self.encode_all_sync, list(frames))
+  async def flush(self) -> list[MediaPacket]: return await self._worker.run(self.flush_sync)
 
   def encode_sync(self, frame: F):
     if frame.ptime is None: raise ValueError("Frame must have a ptime before encoding!")
     return self._encode(frame)
 
+  def encode_all_sync(self, frames: Iterable[F]):
+    packets: list[MediaPacket] = []
+    for frame in frames: packets.extend(self.encode_sync(frame))
+    return packets
+
   def flush_sync(self): return self._encode(None)
 
-  def close(self): self.codec_context.close(strict=False)
+  def close(self): self._worker.close(functools.partial(self.codec_context.close, strict=False))
   def _encode(self, frame: F | None): return [ MediaPacket.from_av_packet(packet, self.time_base) for packet in self.codec_context.encode(None if frame is None else frame.frame) ]
 
 
@@ -78,19 +148,18 @@ class Decoder(Generic[F]):
     self.codec_info = codec_info
     self.codec_context = codec_context or codec_info._get_av_codec_context("r")
     self.time_base = codec_info.time_base
+    self._worker = CodecWorker()
 
   async def decode(self, packet: MediaPacket) -> list[F]:
-    loop = asyncio.get_running_loop()
     av_packet = packet.to_av_packet(self.time_base)
-    frames = await loop.run_in_executor(None, self._decode, av_packet)
+    frames = await self._worker.run(self._decode, av_packet)
     return [ Frame.from_av_frame(frame) for frame in frames ]
 
   async def flush(self):
-    loop = asyncio.get_running_loop()
-    frames = await loop.run_in_executor(None, self._decode, None)
+    frames = await self._worker.run(self._decode, None)
     return [ Frame.from_av_frame(frame) for frame in frames ]
 
-  def close(self): self.codec_context.close()
+  def close(self): self._worker.close(self.codec_context.close)
   def _decode(self, packet: av.packet.Packet) -> list[F]: return self.codec_context.decode(packet)
 
 class Reformatter(Generic[F]):
@@ -130,10 +199,7 @@ class AVTranscoder(Transcoder):
     return packets
 
   async def _encode_frames(self, frames: Iterable[Frame]):
-    packets: list[MediaPacket] = []
-    for frame in await self.reformatter.reformat_all(frames):
-      packets.extend(await self.encoder.encode(frame))
-    return packets
+    return await self.encoder.encode_all(await self.reformatter.reformat_all(frames))
 
 class CodecInfo(ABC, Generic[F]):
   def __init__(self, codec: str):
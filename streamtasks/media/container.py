@@ -9,31 +9,30 @@ import asyncio
 from streamtasks.debugging import ddebug_value
 from streamtasks.env import DEBUG_MEDIA
 from streamtasks.media.audio import AudioCodecInfo
-from streamtasks.media.codec import AVTranscoder, CodecInfo, Decoder
+from streamtasks.media.codec import AVTranscoder, CodecInfo, CodecWorker, Decoder
 from streamtasks.media.packet import MediaPacket
 from streamtasks.media.video import VideoCodecInfo
-from streamtasks.utils import AsyncConsumer, AsyncMPProducer, AsyncProducer, AsyncTrigger
+from streamtasks.utils import AsyncConsumer, AsyncMPProducer, AsyncMinTracker, AsyncProducer
 
 class _StreamContext:
   def __init__(self) -> None:
     self.lock = asyncio.Lock()
-    self._sync_update_trigger = AsyncTrigger()
-    self._sync_channels: dict[int, Fraction] = {}
+    self.worker = CodecWorker() # NOTE: muxes all streams of the container on one thread
+    self._sync_channels: AsyncMinTracker[int] = AsyncMinTracker()
 
   def create_sync_channel(self):
     channel_id = len(self._sync_channels)
-    self._sync_channels[channel_id] = 0
+    self._sync_channels.set(channel_id, 0)
     return channel_id
 
-  def is_min(self, channel: int): return self._sync_channels[channel] == min(self._sync_channels.values())
+  def is_min(self, channel: int): return self._sync_channels.get(channel) == self._sync_channels.min
 
   async def sync_wait_channel_min(self, channel: int):
     while not self.is_min(channel):
-      await self._sync_update_trigger.wait()
+      await self._sync_channels.wait_min(self._sync_channels.get(channel))
 
   def set_sync_channel_time(self, channel: int, time: Fraction):
-    self._sync_channels[channel] = max(self._sync_channels[channel], time)
-    self._sync_update_trigger.trigger()
+    self._sync_channels.set(channel, max(self._sync_channels.get(channel), time))
 
 class _Demuxer(AsyncMPProducer[av.Packet]):
   def __init__(self, container: av.container.InputContainer) -> None:
@@ -147,10 +146,9 @@ class AVOutputStream:
     if DEBUG_MEDIA():
       ddebug_value("mux wait", self._stream.type, False)
 
-    loop = asyncio.get_running_loop()
     async with self._ctx.lock:
       assert av_packet.dts <= av_packet.pts, "dts must be lower than pts before muxing"
-      await loop.run_in_executor(None, self._stream.container.mux, av_packet)
+      await self._ctx.worker.run(self._stream.container.mux, av_packet)
       assert av_packet.dts <= av_packet.pts, "dts must be lower than pts after muxing"
       if self._stream.type == "audio":
         self._dts_counter += int(self._stream.codec_context.frame_size)
@@ -167,7 +165,8 @@ class OutputContainer:
 
   async def close(self):
     await self._ctx.lock.acquire()
-    self._container.close()
+    await self._ctx.worker.run(self._container.close)
+    self._ctx.worker.close()
 
   def add_video_stream(self, codec_info: VideoCodecInfo):
     time_base = codec_info.time_base
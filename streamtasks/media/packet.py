@@ -1,3 +1,4 @@
+from streamtasks.message.codec import MessageCodec
 from streamtasks.message.types import TimestampMessage
 from dataclasses import dataclass
 from fractions import Fraction
@@ -34,3 +35,5 @@ class MediaPacket:
 
 class MediaMessage(TimestampMessage):
   packet: MediaPacket
+
+MediaMessageCodec = MessageCodec(MediaMessage)
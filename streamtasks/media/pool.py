@@ -0,0 +1,33 @@
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+
+def copy_to_buffer(array: np.ndarray, buffer: memoryview | np.ndarray):
+  """copies an array, which may not be contiguous, into a buffer of the same size."""
+  np.copyto(np.frombuffer(buffer, dtype=array.dtype).reshape(array.shape), array)
+
+class FrameBufferPool:
+  """
+  Hands out reusable frame buffers, to avoid allocating a new buffer for every frame.
+  New buffers are zeroed, buffers that are reused keep the content they were released with.
+  """
+  def __init__(self, max_free: int = 4) -> None:
+    self.max_free = max_free
+    self._free: dict[tuple[tuple[int, ...], np.dtype], deque[np.ndarray]] = {}
+
+  def acquire(self, shape: tuple[int, ...], dtype: np.dtype = np.uint8) -> np.ndarray:
+    free = self._free.get((tuple(shape), np.dtype(dtype)))
+    try: return free.pop()
+    except (AttributeError, IndexError): return np.zeros(shape, dtype=dtype)
+
+  def release(self, buffer: np.ndarray):
+    free = self._free.setdefault((buffer.shape, buffer.dtype), deque())
+    if len(free) < self.max_free: free.append(buffer)
+
+  @contextmanager
+  def borrow(self, shape: tuple[int, ...], dtype: np.dtype = np.uint8):
+    buffer = self.acquire(shape, dtype)
+    try: yield buffer
+    finally: self.release(buffer)
+
+  def clear(self): self._free.clear()
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+import os
+import struct
+import sys
+from typing import Any, Callable
+from streamtasks.message.codec import TimestampChuckMessageCodec, TimestampSharedChuckMessageCodec
+from streamtasks.message.types import SharedMemoryHandle, TimestampSharedChuckMessage
+
+# segment header: frame size; slot header: generation, size. A generation of 0 marks a slot that is being written.
+_SEGMENT_HEADER = struct.Struct("<Q")
+_SLOT_HEADER = struct.Struct("<QQ")
+
+def _get_slot_offset(slot: int, frame_size: int): return _SEGMENT_HEADER.size + slot * (_SLOT_HEADER.size + frame_size)
+
+_owned_segments: dict[str, shared_memory.SharedMemory] = {} # segments created by pools in this process
+_unclosed_segments: list[shared_memory.SharedMemory] = [] # segments with frame views that were still in use when they were closed
+
+def _try_close_segment(shm: shared_memory.SharedMemory):
+  try:
+    shm.close()
+    return True
+  except BufferError: return False
+
+def _close_segment(shm: shared_memory.SharedMemory):
+  # NOTE: close fails while frame views are still in use, it is retried the next time a segment is closed
+  _unclosed_segments[:] = [ s for s in _unclosed_segments if not _try_close_segment(s) ]
+  if not _try_close_segment(shm): _unclosed_segments.append(shm)
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+  # NOTE: the segment is owned by the writing process, which unlinks it. Prevent the tracker from unlinking it when this process exits.
+  if sys.version_info >= (3, 13): return shared_memory.SharedMemory(name=name, track=False)
+  shm = shared_memory.SharedMemory(name=name)
+  if os.name == "posix": resource_tracker.unregister("/" + shm.name, "shared_memory") # NOTE: posix segments are registered with a leading slash
+  return shm
+
+@dataclass
+class SharedFrame:
+  timestamp: int
+  data: bytes | memoryview
+  handle: SharedMemoryHandle | None = None
+
+class SharedFramePool:
+  """
+  A ring of fixed size frame slots in a shared memory segment.
+  Slots are reused round robin, readers detect overwritten slots by comparing the generation in the handle with the one in the slot.
+  """
+  def __init__(self, slot_count: int = 8) -> None:
+    if slot_count < 1: raise ValueError("slot_count must be at least 1!")
+    self.slot_count = slot_count
+    self._shm: shared_memory.SharedMemory | None = None
+    self._frame_size = 0
+    self._next_slot = 0
+    self._generation = 0
+
+  @property
+  def name(self): return None if self._shm is None else self._shm.name
+
+  def write(self, data: bytes | memoryview) -> SharedMemoryHandle:
+    data = memoryview(data).cast("B")
+    def copy(buf: memoryview): buf[:] = data
+    return self.write_with(data.nbytes, copy)
+
+  def write_with(self, size: int, fill: Callable[[memoryview], Any]) -> SharedMemoryHandle:
+    """Lets fill write the frame directly into the next slot, to avoid an intermediate copy."""
+    if self._shm is None or size > self._frame_size: self._allocate(size)
+
+    slot = self._next_slot
+    self._next_slot = (slot + 1) % self.slot_count
+    self._generation += 1
+
+    offset = _get_slot_offset(slot, self._frame_size)
+    buf = self._shm.buf
+    _SLOT_HEADER.pack_into(buf, offset, 0, 0)
+    slot_buf = buf[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + size]
+    try: fill(slot_buf)
+    finally: slot_buf.release()
+    _SLOT_HEADER.pack_into(buf, offset, self._generation, size)
+    return SharedMemoryHandle(name=self._shm.name, slot=slot, generation=self._generation, size=size)
+
+  def discard(self, handle: SharedMemoryHandle):
+    """gives back the slot of the last written frame, so that the next write reuses it instead of overwriting an older frame."""
+    if self._shm is None or handle.name != self._shm.name or handle.generation != self._generation: return
+    _SLOT_HEADER.pack_into(self._shm.buf, _get_slot_offset(handle.slot, self._frame_size), 0, 0)
+    self._next_slot = handle.slot
+
+  def create_message(self, timestamp: int, data: bytes | memoryview): return TimestampSharedChuckMessage(timestamp=timestamp, handle=self.write(data))
+  def create_message_with(self, timestamp: int, size: int, fill: Callable[[memoryview], Any]):
+    return TimestampSharedChuckMessage(timestamp=timestamp, handle=self.write_with(size, fill))
+
+  def close(self):
+    if self._shm is None: return
+    _owned_segments.pop(self._shm.name, None)
+    _close_segment(self._shm)
+    self._shm.unlink()
+    self._shm = None
+
+  def _allocate(self, frame_size: int):
+    self.close() # NOTE: readers holding handles into the old segment will see them as invalid
+    self._frame_size = frame_size
+    self._next_slot = 0
+    self._shm = shared_memory.SharedMemory(create=True, size=_get_slot_offset(self.slot_count, frame_size))
+    _SEGMENT_HEADER.pack_into(self._shm.buf, 0, frame_size)
+    _owned_segments[self._shm.name] = self._shm
+
+  def __enter__(self): return self
+  def __exit__(self, *_): self.close()
+
+class SharedFrameReader:
+  """
+  Reads frames from the segments of pools in other processes.
+  At most max_segments segments are kept open, the least recently used one is closed when a handle names a new segment.
+  """
+  def __init__(self, max_segments: int = 8) -> None:
+    if max_segments < 1: raise ValueError("max_segments must be at least 1!")
+    self.max_segments = max_segments
+    self._segments: OrderedDict[str, shared_memory.SharedMemory | None] = OrderedDict()
+
+  def read(self, handle: SharedMemoryHandle) -> memoryview | None:
+    buf = self._get_slot_buffer(handle)
+    if buf is None or not self._is_valid(buf, handle): return None
+    return buf[_SLOT_HEADER.size:_SLOT_HEADER.size + handle.size]
+
+  def read_message(self, data: Any) -> SharedFrame:
+    if isinstance(data, dict) and "handle" in data:
+      message = TimestampSharedChuckMessageCodec.decode(data)
+      frame_data = self.read(message.handle)
+      if frame_data is None: raise ValueError("The shared frame is not available anymore!")
+      return SharedFrame(timestamp=message.timestamp, data=frame_data, handle=message.handle)
+    message = TimestampChuckMessageCodec.decode(data)
+    return SharedFrame(timestamp=message.timestamp, data=message.data)
+
+  def is_valid(self, frame: SharedFrame):
+    """checks whether the data of a frame was overwritten while it was used."""
+    if frame.handle is None: return True
+    buf = self._get_slot_buffer(frame.handle)
+    return buf is not None and self._is_valid(buf, frame.handle)
+
+  def close(self):
+    for shm in self._segments.values():
+      if shm is not None: _close_segment(shm)
+    self._segments.clear()
+
+  def _is_valid(self, buf: memoryview, handle: SharedMemoryHandle):
+    generation, size = _SLOT_HEADER.unpack_from(buf)
+    return generation == handle.generation and size == handle.size
+
+  def _get_slot_buffer(self, handle: SharedMemoryHandle) -> memoryview | None:
+    if handle.name in _owned_segments: shm = _owned_segments[handle.name]
+    else: shm = self._get_segment(handle.name)
+    if shm is None: return None
+    frame_size, = _SEGMENT_HEADER.unpack_from(shm.buf)
+    offset = _get_slot_offset(handle.slot, frame_size)
+    if handle.size > frame_size or offset + _SLOT_HEADER.size + frame_size > shm.size: return None
+    return shm.buf[offset:offset + _SLOT_HEADER.size + frame_size]
+
+  def _get_segment(self, name: str) -> shared_memory.SharedMemory | None:
+    if name in self._segments:
+      self._segments.move_to_end(name)
+      return self._segments[name]
+    try: shm = _open_segment(name)
+    except FileNotFoundError: shm = None
+    self._segments[name] = shm
+    while len(self._segments) > self.max_segments:
+      _, evicted = self._segments.popitem(last=False)
+      if evicted is not None: _close_segment(evicted)
+    return shm
+
+  def __enter__(self): return self
+  def __exit__(self, *_): self.close()
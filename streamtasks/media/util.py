@@ -128,44 +128,90 @@ def apply_options_to_codec_context(ctx: av.codec.context.CodecContext, options:
 def options_from_codec_context(ctx: av.codec.context.CodecContext) -> dict[str, str]:
     return strip_nones_from_dict({ "bit_rate": None if ctx.bit_rate is None else str(ctx.bit_rate), "bit_rate_tolerance": None if ctx.bit_rate_tolerance is None else str(ctx.bit_rate_tolerance)  })
 
+class SampleBuffer:
+  """
+  A preallocated buffer of samples along the first axis, which is written at the end and consumed from the front.
+  Instead of wrapping around, the remaining samples are moved to the front once the end is reached, so that reads are always views.
+  The storage is kept at least half free after moving, which keeps pushing amortized O(1) per sample.
+  Views returned by data are valid until the next push.
+  """
+  def __init__(self) -> None:
+    self._storage: np.ndarray | None = None
+    self._start = 0
+    self._end = 0
+
+  def __len__(self): return self._end - self._start
+
+  @property
+  def data(self) -> np.ndarray: return self._storage[self._start:self._end]
+  @property
+  def dtype(self): return self._storage.dtype
+  @property
+  def sample_shape(self) -> tuple[int, ...]: return self._storage.shape[1:]
+
+  def push(self, samples: np.ndarray):
+    if self._storage is None or self._storage.dtype != samples.dtype or self._storage.shape[1:] != samples.shape[1:]:
+      assert len(self) == 0, "the sample type must not change while samples are buffered"
+      self._storage = np.empty((max(samples.shape[0] * 2, 1024), *samples.shape[1:]), dtype=samples.dtype)
+      self._start = self._end = 0
+    self._reserve(samples.shape[0])[:] = samples
+
+  def push_zeros(self, count: int): self._reserve(count)[:] = 0
+  def drop(self, count: int): self._start = min(self._start + count, self._end)
+  def clear(self): self._start = self._end = 0
+
+  def _reserve(self, count: int):
+    size = len(self)
+    if self._end + count > self._storage.shape[0]:
+      if (size + count) * 2 > self._storage.shape[0]:
+        storage = np.empty(((size + count) * 2, *self._storage.shape[1:]), dtype=self._storage.dtype)
+        storage[:size] = self.data
+        self._storage = storage
+      else: self._storage[:size] = self.data
+      self._start, self._end = 0, size
+    self._end += count
+    return self._storage[self._end - count:self._end]
+
 class AudioChunker:
+  """The chunks are views into the buffer, which are valid until next is called again."""
   def __init__(self, chunk_size: int, sample_rate: int) -> None:
     self.chunk_size = chunk_size
     self.sample_rate = sample_rate
     self.buffer_duration = 1000 * chunk_size // sample_rate
-    self.buffer: np.ndarray | None = None
+    self.buffer = SampleBuffer()
 
   @property
-  def buffer_size(self): return 0 if self.buffer is None else self.buffer.size
+  def buffer_size(self): return len(self.buffer)
 
   def next(self, buf: np.ndarray, timestamp: int):
     current_timestamp = timestamp - self.buffer_size * 1000 // self.sample_rate
-    self.buffer = buf.flatten() if self.buffer is None else np.concatenate((self.buffer, buf.flatten()))
+    self.buffer.push(buf.reshape(-1))
 
-    while self.buffer.size > self.chunk_size:
-      yield (self.buffer[:self.chunk_size], current_timestamp)
-      self.buffer = self.buffer[self.chunk_size:]
+    while self.buffer_size > self.chunk_size:
+      yield (self.buffer.data[:self.chunk_size], current_timestamp)
+      self.buffer.drop(self.chunk_size)
       current_timestamp += self.buffer_duration
 
 class PaddedAudioChunker:
+  """The chunks are views into the buffer, which are valid until next is called again."""
   def __init__(self, chunk_size: int, sample_rate: int, padding: int) -> None:
     self.chunk_size = chunk_size
     self.sample_rate = sample_rate
     self.padding = padding
     self.process_buffer_size = self.chunk_size + 2 * self.padding
     self.buffer_duration = 1000 * chunk_size // sample_rate
-    self.buffer: np.ndarray | None = None
+    self.buffer = SampleBuffer()
 
   @property
-  def buffer_size(self): return 0 if self.buffer is None else self.buffer.size
+  def buffer_size(self): return len(self.buffer)
 
   def next(self, buf: np.ndarray, timestamp: int):
     current_timestamp = timestamp - (self.buffer_size - self.padding) * 1000 // self.sample_rate
-    self.buffer = buf.flatten() if self.buffer is None else np.concatenate((self.buffer, buf.flatten()))
+    self.buffer.push(buf.reshape(-1))
 
-    while self.buffer.size > self.process_buffer_size:
-      yield (self.buffer[:self.process_buffer_size], current_timestamp)
-      self.buffer = self.buffer[self.chunk_size:]
+    while self.buffer_size > self.process_buffer_size:
+      yield (self.buffer.data[:self.process_buffer_size], current_timestamp)
+      self.buffer.drop(self.chunk_size)
       current_timestamp += self.buffer_duration
 
   def strip_padding(self, buf: np.ndarray): return buf[self.padding:-self.padding]
@@ -190,7 +236,7 @@ class AudioSequencer:
     self._sample_rate = sample_rate
     self._desync_time = Fraction(0)
     self._buffer_start_time: Fraction | None = None
-    self._sample_buffer: np.ndarray | None = None
+    self._samples = SampleBuffer()
     self._keep_buffer_size = keep_buffer_size
     assert max_stretch_ratio >= 1
     self._max_stretch_ratio = max_stretch_ratio
@@ -199,71 +245,75 @@ class AudioSequencer:
   def start_time(self): return self._buffer_start_time
 
   @property
-  def end_time(self): return self._buffer_start_time + Fraction(self._sample_buffer.shape[0], self._sample_rate)
+  def end_time(self): return self._buffer_start_time + Fraction(len(self._samples), self._sample_rate)
 
   @property
-  def started(self): return self._sample_buffer is not None and self._buffer_start_time is not None
+  def started(self): return self._buffer_start_time is not None
 
   def reset(self, force: bool = False):
-    if self._sample_buffer is None or self._buffer_start_time is None or self._sample_buffer.size == 0 or force:
-      self._sample_buffer = None
+    if not self.started or len(self._samples) == 0 or force:
+      self._samples.clear()
       self._buffer_start_time = None
       self._desync_time = Fraction(0)
 
-  def get_max_samples(self, time: Fraction) -> int: return max(0, self._sample_buffer.shape[0] - self._get_start_sample_offset(time) - self._keep_buffer_size)
+  def get_max_samples(self, time: Fraction) -> int: return max(0, len(self._samples) - self._get_start_sample_offset(time) - self._keep_buffer_size)
   def pop_start(self, time: Fraction, sample_count: int) -> np.ndarray:
-    if self._sample_buffer is None or self._buffer_start_time is None: return self._make_zeros(sample_count)
+    result = self._make_zeros(sample_count)
+    if not self.started: return result
     start_offset = self._get_start_sample_offset(time)
-    buf_end = max(0, min(sample_count + start_offset, self._sample_buffer.shape[0]))
-    buf_start = min(max(0, start_offset), self._sample_buffer.shape[0])
+    buf_end = max(0, min(sample_count + start_offset, len(self._samples)))
+    buf_start = min(max(0, start_offset), len(self._samples))
     pad_count = min(max(0, -start_offset), sample_count)
-    result = np.concatenate((self._make_zeros(pad_count), self._sample_buffer[buf_start:buf_end]), axis=0)
-    self._sample_buffer = self._sample_buffer[buf_end:]
+    samples = self._samples.data[buf_start:buf_end]
+    assert pad_count + samples.shape[0] <= sample_count, "more samples than allowed were popped"
+    result[pad_count:pad_count + samples.shape[0]] = samples
+    self._samples.drop(buf_end)
     self._buffer_start_time += Fraction(buf_end, self._sample_rate)
-    assert result.shape[0] <= sample_count, "more samples than allowed were popped"
-    if result.shape[0] < sample_count: result = np.concatenate((result, self._make_zeros(sample_count - result.shape[0])),  axis=0)
     return result
 
   def insert(self, time: Fraction, samples: np.ndarray):
     assert len(samples.shape) == 2, "expected samples to be in shape (time, channels)"
-    assert self._sample_buffer is None or self._sample_buffer.dtype == samples.dtype
-    assert self._sample_buffer is None or self._sample_buffer.shape[1] == samples.shape[1]
+    assert not self.started or self._samples.dtype == samples.dtype
+    assert not self.started or self._samples.sample_shape == samples.shape[1:]
 
-    if self._buffer_start_time is None or self._sample_buffer is None:
-      self._sample_buffer = samples
+    if not self.started:
+      self._samples.push(samples)
       self._buffer_start_time = time
     else:
       self._desync_time += time - self.end_time
-      next_sample_count = self._sample_buffer.shape[0] + samples.shape[0]
+      next_sample_count = len(self._samples) + samples.shape[0]
       desync_sample_count: int = round(abs(self._desync_time) * self._sample_rate)
       if DEBUG_MIXER(): ddebug_value("track desync time", id(self), float(self._desync_time))
       if desync_sample_count > 0:
         if self._desync_time < 0:
-          new_buf_length = self._sample_buffer.shape[0] + samples.shape[0] - desync_sample_count
+          new_buf_length = len(self._samples) + samples.shape[0] - desync_sample_count
           if new_buf_length > 0 and next_sample_count / new_buf_length < self._max_stretch_ratio:
-            self._sample_buffer = np.concatenate((self._sample_buffer, samples), axis=0)
+            self._samples.push(samples)
             self._strech_sample_buffer(new_buf_length)
           else:
-            self._sample_buffer = np.concatenate((self._sample_buffer, samples[desync_sample_count:]), axis=0)
+            self._samples.push(samples[desync_sample_count:])
           self._desync_time += Fraction(min(desync_sample_count, samples.shape[0]), self._sample_rate)
         else:
-          new_buf_length = self._sample_buffer.shape[0] + desync_sample_count + samples.shape[0]
+          new_buf_length = len(self._samples) + desync_sample_count + samples.shape[0]
           if next_sample_count != 0 and new_buf_length / next_sample_count < self._max_stretch_ratio:
-            self._sample_buffer = np.concatenate((self._sample_buffer, samples), axis=0)
+            self._samples.push(samples)
             self._strech_sample_buffer(new_buf_length)
           else:
-            self._sample_buffer = np.concatenate((self._sample_buffer, self._make_zeros(desync_sample_count), samples), axis=0)
+            self._samples.push_zeros(desync_sample_count)
+            self._samples.push(samples)
           self._desync_time -= Fraction(desync_sample_count, self._sample_rate)
-      else: self._sample_buffer = np.concatenate((self._sample_buffer, samples), axis=0)
+      else: self._samples.push(samples)
 
 
   def _strech_sample_buffer(self, new_length: int):
-    assert len(self._sample_buffer.shape) == 2
-    original_indices = np.linspace(0, self._sample_buffer.shape[0] - 1, num=self._sample_buffer.shape[0])
-    new_indices = np.linspace(0, self._sample_buffer.shape[0] - 1, num=new_length)
-    out_array = np.empty_like(self._sample_buffer, shape=(new_length, self._sample_buffer.shape[1]))
-    for i in range(self._sample_buffer.shape[1]):
-      out_array[:, i] = np.interp(new_indices, original_indices, self._sample_buffer[:, i])
-    self._sample_buffer = out_array
-  def _make_zeros(self, sample_count: int) -> np.ndarray: return np.zeros((sample_count, self._sample_buffer.shape[1]), dtype=self._sample_buffer.dtype)
+    samples = self._samples.data
+    assert len(samples.shape) == 2
+    original_indices = np.linspace(0, samples.shape[0] - 1, num=samples.shape[0])
+    new_indices = np.linspace(0, samples.shape[0] - 1, num=new_length)
+    out_array = np.empty_like(samples, shape=(new_length, samples.shape[1]))
+    for i in range(samples.shape[1]):
+      out_array[:, i] = np.interp(new_indices, original_indices, samples[:, i])
+    self._samples.clear()
+    self._samples.push(out_array)
+  def _make_zeros(self, sample_count: int) -> np.ndarray: return np.zeros((sample_count, *self._samples.sample_shape), dtype=self._samples.dtype)
   def _get_start_sample_offset(self, time: Fraction) -> int: return int((time - self._buffer_start_time) * self._sample_rate)
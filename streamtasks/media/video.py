@@ -9,6 +9,7 @@ import av.codec
 import av.video
 import av.video.codeccontext
 import numpy as np
+from streamtasks.media.pool import FrameBufferPool
 from streamtasks.media.codec import CodecInfo, Frame, Reformatter
 from streamtasks.media.util import apply_options_to_codec_context, options_from_codec_context
 from streamtasks.utils import hertz_to_fintervall
@@ -23,8 +24,9 @@ class VideoFrame(Frame[av.VideoFrame]):
   def to_rgb(self):
     return VideoFrame(self.frame.to_rgb())
 
-  def to_ndarray(self):
-    return self.frame.to_ndarray()
+  def to_ndarray(self, pool: FrameBufferPool | None = None):
+    """with a pool, the data is copied into a buffer of the pool, which should be released after use."""
+    return self._to_ndarray(pool)
 
   def convert(self, width: int | None = None, height: int | None = None, pixel_format: str | None = None):
     return VideoFrame(self.frame.reformat(width=width, height=height, format=pixel_format))
@@ -1 +1,4 @@
-def merge_images(images: list[bytes], alpha_front: bool) -> bytes: pass
\ No newline at end of file
+from typing import ByteString
+
+def merge_images(images: list[ByteString], alpha_front: bool) -> bytes: pass
+def composite_images(out: ByteString, images: list[ByteString], alpha_front: bool) -> None: pass
\ No newline at end of file
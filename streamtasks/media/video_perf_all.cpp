@@ -1,68 +1,207 @@
 #include <pybind11/pybind11.h>
 #include <limits>
 #include <pybind11/stl.h>
+#include <algorithm>
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <thread>
+
+#if defined(__SSE2__) || defined(_M_X64) || (defined(_M_IX86_FP) && _M_IX86_FP >= 2)
+#include <emmintrin.h>
+#define USE_SSE2
+#endif
 
 #define ALPHA_PIXEL_SIZE 4
+#define BLEND_BLOCK_PIXELS 16384
 
 namespace py = pybind11;
 
-py::bytes merge_images(std::vector<py::bytes> images, bool alpha_front) {
-    size_t image_count = images.size();
-    assert(image_count > 0);
+// runs the tasks of one job at a time on a fixed set of worker threads, the calling thread helps
+class ThreadPool {
+public:
+    explicit ThreadPool(size_t thread_count) {
+        for (size_t i = 0; i < thread_count; i++) workers.emplace_back([this] { work(); });
+    }
 
-    std::vector<uint8_t*> image_data;
-    size_t image_size = std::numeric_limits<size_t>::max();
-    for (size_t i = 0; i < image_count; i++)
-    {
-        std::basic_string_view<char> v(images[i]);
-        image_size = std::min(image_size, v.size());
-        image_data.push_back((uint8_t*)v.data());
+    void run(size_t task_count, const std::function<void(size_t)>& fn) {
+        std::lock_guard<std::mutex> run_lock(run_mutex);
+        std::unique_lock<std::mutex> lock(mutex);
+        job_fn = &fn;
+        job_count = task_count;
+        next_task = 0;
+        done_count = 0;
+        job_id++;
+        job_cv.notify_all();
+        run_tasks(lock, &fn, task_count);
+
+        // NOTE: fn and the buffers it uses live on the callers stack, no worker may still be in this job when returning
+        done_cv.wait(lock, [&] { return done_count == task_count && active_workers == 0; });
+        job_fn = nullptr;
     }
-    
-    std::string out_str(image_size, '\0');
-    uint8_t* out_data = (uint8_t*)out_str.data();
 
-    for (size_t offset = 0; offset < image_size; offset += ALPHA_PIXEL_SIZE)
-    {
-        uint8_t* out_cv;
-        if (alpha_front) 
-        {
-            out_data[offset] = 255;
-            out_cv = &out_data[offset + 1];
+private:
+    std::vector<std::thread> workers;
+    std::mutex run_mutex;
+    std::mutex mutex;
+    std::condition_variable job_cv;
+    std::condition_variable done_cv;
+    // the job state is only accessed with the mutex held
+    const std::function<void(size_t)>* job_fn = nullptr;
+    size_t job_id = 0;
+    size_t job_count = 0;
+    size_t next_task = 0;
+    size_t done_count = 0;
+    size_t active_workers = 0;
+
+    // claims tasks until none are left, the lock is held when entering and leaving
+    void run_tasks(std::unique_lock<std::mutex>& lock, const std::function<void(size_t)>* fn, size_t count) {
+        while (next_task < count) {
+            size_t task = next_task++;
+            lock.unlock();
+            (*fn)(task);
+            lock.lock();
+            done_count++;
+        }
+    }
+
+    void work() {
+        size_t seen_job_id = 0;
+        std::unique_lock<std::mutex> lock(mutex);
+        while (true) {
+            job_cv.wait(lock, [&] { return job_id != seen_job_id; });
+            // NOTE: a worker waking up late may see a job that is already done, it finds no tasks and leaves it
+            seen_job_id = job_id;
+            const std::function<void(size_t)>* fn = job_fn;
+            size_t count = job_count;
+            active_workers++;
+            run_tasks(lock, fn, count);
+            active_workers--;
+            if (active_workers == 0) done_cv.notify_all();
         }
-        else 
+    }
+};
+
+static ThreadPool& get_thread_pool() {
+    // NOTE: never destroyed, the workers are blocked on the job condition when the process exits
+    static ThreadPool* pool = new ThreadPool(std::max(2u, std::thread::hardware_concurrency()) - 1);
+    return *pool;
+}
+
+// exact floor(x / 255) for x <= 255 * 255
+static inline uint32_t div_255(uint32_t x) { return (x + 1 + (x >> 8)) >> 8; }
+
+template <size_t ALPHA_OFFSET, size_t COLOR_OFFSET>
+static void blend_scalar(uint8_t* out, const std::vector<const uint8_t*>& images, size_t begin, size_t end) {
+    for (size_t offset = begin; offset < end; offset += ALPHA_PIXEL_SIZE)
+    {
+        uint32_t color[ALPHA_PIXEL_SIZE - 1] = { 0 };
+        for (const uint8_t* image : images)
         {
-            out_data[offset + ALPHA_PIXEL_SIZE - 1] = 255;
-            out_cv = &out_data[offset];
+            uint32_t alpha = image[offset + ALPHA_OFFSET];
+            uint32_t alpha_old = 255 - alpha;
+            for (size_t c = 0; c < ALPHA_PIXEL_SIZE - 1; c++) color[c] = div_255(alpha_old * color[c] + alpha * image[offset + COLOR_OFFSET + c]);
         }
+        for (size_t c = 0; c < ALPHA_PIXEL_SIZE - 1; c++) out[offset + COLOR_OFFSET + c] = (uint8_t)color[c];
+        out[offset + ALPHA_OFFSET] = 255;
+    }
+}
+
+#ifdef USE_SSE2
+// blends 4 pixels at a time with 16 bit lanes, the alpha lanes are garbage until they are set to 255 at the end
+template <size_t ALPHA_OFFSET>
+static inline __m128i blend_sse2_half(__m128i out, __m128i image) {
+    const int alpha_shuffle = _MM_SHUFFLE(ALPHA_OFFSET, ALPHA_OFFSET, ALPHA_OFFSET, ALPHA_OFFSET);
+    __m128i alpha = _mm_shufflehi_epi16(_mm_shufflelo_epi16(image, alpha_shuffle), alpha_shuffle);
+    __m128i alpha_old = _mm_sub_epi16(_mm_set1_epi16(255), alpha);
+    __m128i x = _mm_add_epi16(_mm_mullo_epi16(alpha_old, out), _mm_mullo_epi16(alpha, image));
+    return _mm_srli_epi16(_mm_add_epi16(_mm_add_epi16(x, _mm_set1_epi16(1)), _mm_srli_epi16(x, 8)), 8);
+}
 
-        for (size_t i = 0; i < image_count; i++)
+template <size_t ALPHA_OFFSET>
+static size_t blend_sse2(uint8_t* out, const std::vector<const uint8_t*>& images, size_t begin, size_t end) {
+    const __m128i zero = _mm_setzero_si128();
+    const __m128i alpha_mask = _mm_set1_epi32((int)(0xFFu << (ALPHA_OFFSET * 8)));
+    size_t offset = begin;
+    for (; offset + 16 <= end; offset += 16)
+    {
+        __m128i out_lo = zero, out_hi = zero;
+        for (const uint8_t* image : images)
         {
-            uint8_t* frame_cv;
-            uint16_t alpha;
-
-            if (alpha_front) 
-            {
-                alpha = image_data[i][offset];
-                frame_cv = &image_data[i][offset + 1];
-            }
-            else 
-            {
-                alpha = image_data[i][offset + ALPHA_PIXEL_SIZE - 1];
-                frame_cv = &image_data[i][offset];
-            }
-
-            uint16_t alpha_old = 255 - alpha;
-            for (size_t c = 0; c < ALPHA_PIXEL_SIZE - 1; c++)
-            {
-                out_cv[c] = (uint8_t)((alpha_old * out_cv[c] + alpha * frame_cv[c]) / 255);
-            }
+            __m128i pixels = _mm_loadu_si128((const __m128i*)(image + offset));
+            out_lo = blend_sse2_half<ALPHA_OFFSET>(out_lo, _mm_unpacklo_epi8(pixels, zero));
+            out_hi = blend_sse2_half<ALPHA_OFFSET>(out_hi, _mm_unpackhi_epi8(pixels, zero));
         }
+        _mm_storeu_si128((__m128i*)(out + offset), _mm_or_si128(_mm_packus_epi16(out_lo, out_hi), alpha_mask));
+    }
+    return offset;
+}
+#endif
+
+template <size_t ALPHA_OFFSET, size_t COLOR_OFFSET>
+static void blend_block(uint8_t* out, const std::vector<const uint8_t*>& images, size_t begin, size_t end) {
+#ifdef USE_SSE2
+    begin = blend_sse2<ALPHA_OFFSET>(out, images, begin, end);
+#endif
+    blend_scalar<ALPHA_OFFSET, COLOR_OFFSET>(out, images, begin, end);
+}
+
+static void composite(uint8_t* out, const std::vector<const uint8_t*>& images, size_t size, bool alpha_front) {
+    size_t block_size = BLEND_BLOCK_PIXELS * ALPHA_PIXEL_SIZE;
+    size_t block_count = (size + block_size - 1) / block_size;
+    std::function<void(size_t)> blend = [&](size_t block) {
+        size_t begin = block * block_size;
+        size_t end = std::min(size, begin + block_size);
+        if (alpha_front) blend_block<0, 1>(out, images, begin, end);
+        else blend_block<ALPHA_PIXEL_SIZE - 1, 0>(out, images, begin, end);
+    };
+    if (block_count <= 1) { for (size_t block = 0; block < block_count; block++) blend(block); }
+    else get_thread_pool().run(block_count, blend);
+}
+
+static size_t acquire_images(std::vector<py::buffer>& images, std::vector<py::buffer_info>& image_infos, std::vector<const uint8_t*>& image_data) {
+    if (images.size() == 0) throw std::invalid_argument("at least one image is required");
+    size_t image_size = std::numeric_limits<size_t>::max();
+    image_infos.reserve(images.size());
+    for (py::buffer& image : images)
+    {
+        image_infos.push_back(image.request());
+        py::buffer_info& info = image_infos.back();
+        image_size = std::min(image_size, (size_t)(info.size * info.itemsize));
+        image_data.push_back((const uint8_t*)info.ptr);
     }
+    return image_size - image_size % ALPHA_PIXEL_SIZE;
+}
+
+void composite_images(py::buffer out, std::vector<py::buffer> images, bool alpha_front) {
+    std::vector<py::buffer_info> image_infos; // keeps the buffers acquired while blending
+    std::vector<const uint8_t*> image_data;
+    size_t image_size = acquire_images(images, image_infos, image_data);
+
+    py::buffer_info out_info = out.request(true);
+    if (out_info.readonly) throw std::invalid_argument("the output buffer must be writable");
+    size_t size = std::min(image_size, (size_t)(out_info.size * out_info.itemsize));
+
+    py::gil_scoped_release release;
+    composite((uint8_t*)out_info.ptr, image_data, size - size % ALPHA_PIXEL_SIZE, alpha_front);
+}
+
+py::bytes merge_images(std::vector<py::buffer> images, bool alpha_front) {
+    std::vector<py::buffer_info> image_infos;
+    std::vector<const uint8_t*> image_data;
+    size_t image_size = acquire_images(images, image_infos, image_data);
 
-    return py::bytes(out_str);
+    PyObject* out = PyBytes_FromStringAndSize(nullptr, image_size);
+    if (out == nullptr) throw py::error_already_set();
+    uint8_t* out_data = (uint8_t*)PyBytes_AS_STRING(out);
+    {
+        py::gil_scoped_release release;
+        composite(out_data, image_data, image_size, alpha_front);
+    }
+    return py::reinterpret_steal<py::bytes>(out);
 }
 
 PYBIND11_MODULE(video_perf, m) {
     m.def("merge_images", &merge_images);
-}
\ No newline at end of file
+    m.def("composite_images", &composite_images, py::arg("out"), py::arg("images"), py::arg("alpha_front"));
+}
@@ -0,0 +1,43 @@
+import dataclasses
+import typing
+from typing import Any, Callable, Generic, TypeVar
+from pydantic import BaseModel, TypeAdapter
+from streamtasks.message.types import NumberMessage, TextMessage, TimestampChuckMessage, TimestampSharedChuckMessage
+
+T = TypeVar("T")
+
+def _get_field_types(message_type: type) -> dict[str, type]:
+  type_hints = typing.get_type_hints(message_type)
+  if issubclass(message_type, BaseModel): return { name: type_hints[name] for name in message_type.model_fields.keys() }
+  if dataclasses.is_dataclass(message_type): return { field.name: type_hints[field.name] for field in dataclasses.fields(message_type) }
+  raise TypeError(f"Unsupported message type {message_type}!")
+
+def _is_message_type(field_type: Any): return isinstance(field_type, type) and (issubclass(field_type, BaseModel) or dataclasses.is_dataclass(field_type))
+
+class MessageCodec(Generic[T]):
+  """
+  Decodes and encodes data messages of a pydantic model or a dataclass.
+  Decoding calls the compiled pydantic validator directly and encoding copies the fields,
+  instead of going through model_validate and model_dump, which cost about twice as much per message.
+  """
+  def __init__(self, message_type: type[T]):
+    self.message_type = message_type
+    if issubclass(message_type, BaseModel): self._validate = message_type.__pydantic_validator__.validate_python
+    else: self._validate = TypeAdapter(message_type).validate_python
+
+    self._nested: list[tuple[str, Callable[[Any], dict[str, Any]]]] = [
+      (name, MessageCodec(field_type).encode) for name, field_type in _get_field_types(message_type).items() if _is_message_type(field_type) ]
+
+  def decode(self, data: Any) -> T:
+    """Raises a pydantic ValidationError, like model_validate."""
+    return self._validate(data)
+
+  def encode(self, message: T) -> dict[str, Any]:
+    result = dict(message.__dict__)
+    for name, encode in self._nested: result[name] = encode(result[name])
+    return result
+
+TimestampChuckMessageCodec = MessageCodec(TimestampChuckMessage)
+TimestampSharedChuckMessageCodec = MessageCodec(TimestampSharedChuckMessage)
+NumberMessageCodec = MessageCodec(NumberMessage)
+TextMessageCodec = MessageCodec(TextMessage)
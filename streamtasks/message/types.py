@@ -19,3 +19,12 @@ class NumberMessage(TimestampMessage):
 class TextMessage(TimestampMessage):
   timestamp: int
   value: str
+
+class SharedMemoryHandle(BaseModel):
+  name: str
+  slot: int
+  generation: int
+  size: int
+
+class TimestampSharedChuckMessage(TimestampMessage):
+  handle: SharedMemoryHandle
@@ -1,11 +1,12 @@
 from streamtasks.net.serialization import RawData
 
 def get_timestamp_from_message(data: RawData) -> int:
-  content = data.data
-  timestamp = None
-  if isinstance(content, dict) and "timestamp" in content: timestamp = content["timestamp"]
-  elif hasattr(content, "timestamp") and isinstance(content.timestamp, int): timestamp = content.timestamp
-  else: raise ValueError(f"could not get timestamp from message: {data}")
+  # NOTE: only the timestamp is decoded, the rest of a message (like a video frame) stays serialized
+  try: timestamp = data.get("timestamp")
+  except KeyError:
+    content = data.data
+    if hasattr(content, "timestamp") and isinstance(content.timestamp, int): timestamp = content.timestamp
+    else: raise ValueError(f"could not get timestamp from message: {data}")
   if isinstance(timestamp, int): return timestamp
   if isinstance(timestamp, float): return int(timestamp)
   raise ValueError(f"could not get timestamp from message: {data}")
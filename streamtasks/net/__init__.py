@@ -1,9 +1,9 @@
-from typing import Any, Callable, Union
+from typing import Any, Callable, Iterable, Union
 from streamtasks.env import DEBUG_SER
 from streamtasks.net.helpers import PricedIdTracker
 from streamtasks.net.serialization import RawData
 from streamtasks.net.serialization import serialize_message, deserialize_message
-from streamtasks.utils import IdTracker
+from streamtasks.utils import FlowControlPolicy, FlowControlQueue, IdTracker
 from abc import ABC, abstractmethod
 import logging
 import asyncio
@@ -51,9 +51,8 @@ class Link(ABC):
   def close(self):
     if self._closed: return
     self._closed = True
-    if self._receiver is not None:
-      try: self._receiver.cancel(ConnectionClosedError())
-      except asyncio.InvalidStateError: pass
+    # NOTE: interrupts a pending recv, unless its task is being cancelled already
+    if self._receiver is not None and self._receiver.cancelling() == 0: self._receiver.cancel(ConnectionClosedError())
     for handler in self.on_closed: handler()
     self.on_closed.clear()
 
@@ -87,16 +86,20 @@ class Link(ABC):
   async def recv(self) -> Message:
     if self._closed: raise ConnectionClosedError()
     message = None
-    while message is None:
-      self._receiver = asyncio.create_task(self._recv())
-      try:
-        message = await self._receiver
+    # NOTE: _recv runs in the calling task, to avoid creating a task per message. close cancels this task while it waits.
+    receiver = self._receiver = asyncio.current_task()
+    try:
+      while message is None:
+        message = await self._recv()
+        await asyncio.sleep(0) # NOTE: yield once per message, so that a busy link does not starve the other tasks
         message = _transform_message(message)
         message = self._process_recv_message(message)
-      except asyncio.CancelledError as e:
-        if len(e.args) > 0 and isinstance(e.args[0], ConnectionClosedError): raise e.args[0]
-        else: raise e
-      finally: self._receiver = None
+    except asyncio.CancelledError as e:
+      if len(e.args) > 0 and isinstance(e.args[0], ConnectionClosedError):
+        receiver.uncancel()
+        raise e.args[0]
+      else: raise e
+    finally: self._receiver = None
     return message
 
   @abstractmethod
@@ -132,56 +135,83 @@ class Link(ABC):
 
     return message
 
-class TopicRemappingLink(Link): # NOTE: maybe this should just inherit a specific link...
+def _remap_id_set(ids: set[int], topic_id_map: dict[int, int]):
+  return ids if topic_id_map.keys().isdisjoint(ids) else set(topic_id_map.get(t, t) for t in ids)
+def _remap_priced_id_set(ids: set[PricedId], topic_id_map: dict[int, int]):
+  if all(pid.id not in topic_id_map for pid in ids): return ids
+  return set(PricedId(topic_id_map.get(pid.id, pid.id), pid.cost) for pid in ids)
+
+def _remap_topic_message(message: TopicMessage, topic_id_map: dict[int, int]):
+  topic = topic_id_map.get(message.topic)
+  if topic is None: return message
+  # NOTE: copies the fields with only the topic replaced, which skips the slow __init__ of the frozen dataclass
+  remapped = object.__new__(type(message))
+  fields = remapped.__dict__
+  fields.update(message.__dict__)
+  fields["topic"] = topic
+  return remapped
+
+def _remap_in_topics_changed(message: InTopicsChangedMessage, topic_id_map: dict[int, int]):
+  add, remove = _remap_id_set(message.add, topic_id_map), _remap_id_set(message.remove, topic_id_map)
+  return message if add is message.add and remove is message.remove else InTopicsChangedMessage(add, remove)
+def _remap_out_topics_changed(message: OutTopicsChangedMessage, topic_id_map: dict[int, int]):
+  add, remove = _remap_priced_id_set(message.add, topic_id_map), _remap_id_set(message.remove, topic_id_map)
+  return message if add is message.add and remove is message.remove else OutTopicsChangedMessage(add, remove)
+def _remap_out_topics_changed_recv(message: OutTopicsChangedRecvMessage, topic_id_map: dict[int, int]):
+  add, remove = _remap_priced_id_set(message.add, topic_id_map), _remap_priced_id_set(message.remove, topic_id_map)
+  return message if add is message.add and remove is message.remove else OutTopicsChangedRecvMessage(add, remove)
+
+_TOPIC_REMAPPERS: dict[type[Message], Callable[[Message, dict[int, int]], Message]] = {
+  TopicDataMessage: _remap_topic_message,
+  TopicControlMessage: _remap_topic_message,
+  InTopicsChangedMessage: _remap_in_topics_changed,
+  OutTopicsChangedMessage: _remap_out_topics_changed,
+  OutTopicsChangedRecvMessage: _remap_out_topics_changed_recv,
+}
+
+class TopicRemappingLink(Link):
+  """
+  Translates topic ids between an internal and an external topic space.
+  The remappers are looked up by message type and return the message itself if none of its topics is mapped.
+  Messages are never changed in place, since the switch shares them between links.
+  """
   def __init__(self, link: Link, topic_id_map: dict[int, int]):
     super().__init__()
     self.on_closed.append(link.close)
     link.on_closed.append(self.close)
     self._link = link
-    self._topic_id_map = topic_id_map # internal -> external
+    self._topic_id_map = dict(topic_id_map) # internal -> external
     self._rev_topic_id_map = {v:k for k, v in topic_id_map.items() } # external -> internal
 
   async def _recv(self) -> Message: return self._remap_message(await self._link.recv(), self._rev_topic_id_map)
   async def _send(self, message: Message): await self._link.send(self._remap_message(message, self._topic_id_map))
 
   def _remap_message(self, message: Message, topic_id_map: dict[int, int]):
-    if isinstance(message, TopicDataMessage):
-      message = TopicDataMessage(topic_id_map.get(message.topic, message.topic), message.data)
-    elif isinstance(message, TopicControlMessage):
-      message = TopicControlMessage(topic_id_map.get(message.topic, message.topic), message.paused)
-    elif isinstance(message, InTopicsChangedMessage):
-      message = InTopicsChangedMessage(self._remap_id_set(message.add, topic_id_map), self._remap_id_set(message.remove, topic_id_map))
-    elif isinstance(message, OutTopicsChangedRecvMessage):
-      message = OutTopicsChangedRecvMessage(self._remap_priced_id_set(message.add, topic_id_map), self._remap_priced_id_set(message.remove, topic_id_map))
-    elif isinstance(message, OutTopicsChangedMessage):
-      message = OutTopicsChangedMessage(self._remap_priced_id_set(message.add, topic_id_map), self._remap_id_set(message.remove, topic_id_map))
-    return message
-
-  def _remap_id_set(self, ids: set[int], topic_id_map: dict[int, int]): return set(topic_id_map.get(t, t) for t in ids)
-  def _remap_priced_id_set(self, ids: set[PricedId], topic_id_map: dict[int, int]): return set(PricedId(topic_id_map.get(t.id, t.id), t.cost) for t in ids)
+    remap = _TOPIC_REMAPPERS.get(type(message))
+    return message if remap is None else remap(message, topic_id_map)
 
 
 class QueueLink(Link):
-  def __init__(self, out_messages: asyncio.Queue[Message], in_messages: asyncio.Queue[Message]):
+  def __init__(self, out_messages: FlowControlQueue, in_messages: FlowControlQueue):
     super().__init__()
     self.out_messages = out_messages
     self.in_messages = in_messages
+    self.topic_policies: dict[int, FlowControlPolicy] = {}
+
+  def get_policy(self, message: Message):
+    # NOTE: only stream data may be dropped, everything else waits for space in the queue
+    if isinstance(message, TopicDataMessage): return self.topic_policies.get(message.topic, self.out_messages.policy)
+    return FlowControlPolicy.BLOCK
 
-  async def _send(self, message: Message): await self.out_messages.put(message)
-  async def _recv(self) -> Message:
-    result = await self.in_messages.get()
-    self.in_messages.task_done()
-    return result
+  async def _send(self, message: Message): await self.out_messages.put(message, self.get_policy(message))
+  async def _recv(self) -> Message: return await self.in_messages.get()
 
 class RawQueueLink(QueueLink):
-  async def _send(self, message: Message): await self.out_messages.put(serialize_message(message))
-  async def _recv(self) -> Message:
-    result = await self.in_messages.get()
-    self.in_messages.task_done()
-    return deserialize_message(result)
-
-def create_queue_connection(raw: bool = False) -> tuple[Link, Link]:
-  queue_a, queue_b = asyncio.Queue(), asyncio.Queue()
+  async def _send(self, message: Message): await self.out_messages.put(serialize_message(message), self.get_policy(message))
+  async def _recv(self) -> Message: return deserialize_message(await self.in_messages.get())
+
+def create_queue_connection(raw: bool = False, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK) -> tuple[Link, Link]:
+  queue_a, queue_b = FlowControlQueue(max_size, policy), FlowControlQueue(max_size, policy)
   if raw: link_a, link_b = RawQueueLink(queue_a, queue_b), RawQueueLink(queue_b, queue_a)
   else: link_a, link_b = QueueLink(queue_a, queue_b), QueueLink(queue_b, queue_a)
   link_a.on_closed.append(link_b.close)
@@ -209,6 +239,7 @@ class Switch:
     self.out_topics = PricedIdTracker()
     self.addresses = PricedIdTracker()
     self.stream_controls: dict[int, TopicControlData] = {}
+    self._topic_links: dict[int, tuple[Link, ...]] = {} # topic -> links with the topic in their in_topics
   def __del__(self): self.link_manager.cancel_all()
 
   async def add_local_connection(self) -> Link:
@@ -229,12 +260,14 @@ class Switch:
     if len(added_addresses) > 0: await self.broadcast(AddressesChangedMessage(added_addresses, set()))
 
     added_in_topics = self.in_topics.add_many(link.in_topics)
+    self._update_topic_links(link, link.in_topics, ())
     if len(added_in_topics) > 0: await self.request_in_topics_change(added_in_topics, set())
 
     self.link_manager.accept_link(link, asyncio.create_task(self._run_link_receiving(link)))
 
   async def remove_link(self, link: Link):
     self.link_manager.remove_link(link)
+    self._update_topic_links(link, (), link.in_topics)
 
     recv_topics = link.recv_topics
     removed_topics, updated_topics = self.out_topics.remove_many(link.get_priced_out_topics())
@@ -251,9 +284,12 @@ class Switch:
       await self.broadcast(AddressesChangedMessage(updated_addresses, removed_addresses))
 
   def stop_receiving(self): self.link_manager.cancel_all()
-  async def send_to(self, message: Message, links: list[Link]):
-    for link in links: await link.send(message)
-  async def broadcast(self, message: Message): await self.send_to(message, self.link_manager.links)
+  async def send_to(self, message: Message, links: Iterable[Link]):
+    for link in links:
+      # NOTE: closed links are removed by their receiving task, until then they must not stop the delivery to the other links
+      try: await link.send(message)
+      except ConnectionClosedError: pass
+  async def broadcast(self, message: Message): await self.send_to(message, tuple(self.link_manager.links))
 
   async def send_remove_in_topic(self, topic: int):
     await self.send_to(InTopicsChangedMessage(set(), set([topic])), [ conn for conn in self.link_manager.links if topic in conn.recv_topics ])
@@ -281,6 +317,7 @@ class Switch:
     # todo: control stream
     final_add = self.in_topics.add_many(message.add)
     final_remove = self.in_topics.remove_many(message.remove)
+    self._update_topic_links(origin, message.add, message.remove)
 
     for control_message in [ self.stream_controls[topic].to_message(topic) for topic in message.add if topic in self.stream_controls ]:
       await origin.send(control_message)
@@ -294,7 +331,7 @@ class Switch:
     if found_conn is not None: await found_conn.send(message)
 
   async def on_stream_message(self, message: TopicMessage, origin: Link):
-    await self.send_to(message, [ link for link in self.link_manager.links if link != origin and message.topic in link.in_topics])
+    await self.send_to(message, [ link for link in self._topic_links.get(message.topic, ()) if link is not origin ])
 
   async def on_out_topics_changed(self, message: OutTopicsChangedRecvMessage, origin: Link):
     out_topics_added, out_topics_removed = self.out_topics.change_many(message.add, message.remove)
@@ -330,6 +367,16 @@ class Switch:
     else:
       logging.warning(f"Unhandled message {message}")
 
+  def _update_topic_links(self, link: Link, add_topics: Iterable[int], remove_topics: Iterable[int]):
+    # the tuples are replaced rather than mutated, so a fan-out in progress is never affected by a concurrent change
+    for topic in add_topics:
+      links = self._topic_links.get(topic, ())
+      if link not in links: self._topic_links[topic] = links + (link,)
+    for topic in remove_topics:
+      links = tuple(other for other in self._topic_links.get(topic, ()) if other is not link)
+      if len(links) == 0: self._topic_links.pop(topic, None)
+      else: self._topic_links[topic] = links
+
   async def _run_link_receiving(self, link: Link):
     try:
       while True:
@@ -1,4 +1,5 @@
 import streamtasks.net.messages as messages
+import struct
 from typing import Any, ByteString
 import msgpack
 
@@ -25,6 +26,74 @@ if __debug__:
     if data is None: return True
     return isinstance(data, (str, int, float, bytes, bytearray, memoryview, bool, dict, list, tuple, datetime, msgpack.ext.ExtType, msgpack.ext.Timestamp))
 
+# sizes of the msgpack types with a fixed size, without the type byte
+_MSGPACK_FIXED_SIZES = {
+  0xc0: 0, 0xc2: 0, 0xc3: 0, # nil, false, true
+  0xca: 4, 0xcb: 8, # float
+  0xcc: 1, 0xcd: 2, 0xce: 4, 0xcf: 8, # uint
+  0xd0: 1, 0xd1: 2, 0xd2: 4, 0xd3: 8, # int
+  0xd4: 2, 0xd5: 3, 0xd6: 5, 0xd7: 9, 0xd8: 17, # fixext, including the ext type
+}
+# msgpack types followed by a length: (length format, extra bytes before the payload)
+_MSGPACK_LENGTH_TYPES = {
+  0xc4: (">B", 0), 0xc5: (">H", 0), 0xc6: (">I", 0), # bin
+  0xd9: (">B", 0), 0xda: (">H", 0), 0xdb: (">I", 0), # str
+  0xc7: (">B", 1), 0xc8: (">H", 1), 0xc9: (">I", 1), # ext
+}
+_MSGPACK_STR_TYPES = { 0xd9: ">B", 0xda: ">H", 0xdb: ">I" }
+
+def _msgpack_read_count(raw: ByteString, pos: int, fmt: str): return struct.unpack_from(fmt, raw, pos)[0], pos + struct.calcsize(fmt)
+
+def _msgpack_skip(raw: ByteString, pos: int) -> int:
+  """Returns the position after the msgpack value at pos, without decoding it."""
+  t = raw[pos]
+  if t <= 0x7f or t >= 0xe0: return pos + 1 # fixint
+  if 0xa0 <= t <= 0xbf: return pos + 1 + (t & 0x1f) # fixstr
+  if 0x80 <= t <= 0x9f: # fixmap and fixarray
+    count = (t & 0x0f) * 2 if t <= 0x8f else t & 0x0f
+    return _msgpack_skip_many(raw, pos + 1, count)
+  if t in _MSGPACK_FIXED_SIZES: return pos + 1 + _MSGPACK_FIXED_SIZES[t]
+  if t in _MSGPACK_LENGTH_TYPES:
+    fmt, extra = _MSGPACK_LENGTH_TYPES[t]
+    length, pos = _msgpack_read_count(raw, pos + 1, fmt)
+    return pos + extra + length
+  if t in (0xdc, 0xdd): # array
+    count, pos = _msgpack_read_count(raw, pos + 1, ">H" if t == 0xdc else ">I")
+    return _msgpack_skip_many(raw, pos, count)
+  if t in (0xde, 0xdf): # map
+    count, pos = _msgpack_read_count(raw, pos + 1, ">H" if t == 0xde else ">I")
+    return _msgpack_skip_many(raw, pos, count * 2)
+  raise ValueError(f"Invalid msgpack type {t}")
+
+def _msgpack_skip_many(raw: ByteString, pos: int, count: int):
+  for _ in range(count): pos = _msgpack_skip(raw, pos)
+  return pos
+
+def _msgpack_str_start(raw: ByteString, pos: int) -> int | None:
+  t = raw[pos]
+  if 0xa0 <= t <= 0xbf: return pos + 1
+  if t in _MSGPACK_STR_TYPES: return pos + 1 + struct.calcsize(_MSGPACK_STR_TYPES[t])
+  return None
+
+def find_map_value(raw: ByteString, key: str) -> Any:
+  """
+  Decodes the value of a key in a msgpack map, the other values are skipped without decoding them.
+  Raises a KeyError if the key is missing and a ValueError if the data is not a map.
+  """
+  t = raw[0]
+  if 0x80 <= t <= 0x8f: count, pos = t & 0x0f, 1
+  elif t in (0xde, 0xdf): count, pos = _msgpack_read_count(raw, 1, ">H" if t == 0xde else ">I")
+  else: raise ValueError("The data is not a map!")
+
+  key_bytes = key.encode("utf-8")
+  for _ in range(count):
+    key_end = _msgpack_skip(raw, pos)
+    key_start = _msgpack_str_start(raw, pos)
+    value_end = _msgpack_skip(raw, key_end)
+    if key_start is not None and raw[key_start:key_end] == key_bytes: return msgpack.unpackb(raw[key_end:value_end])
+    pos = value_end
+  raise KeyError(key)
+
 class RawData:
   def __init__(self, data: ByteString | Any):
     assert data is not None, "None not allowed as RawData!"
@@ -38,6 +107,14 @@ class RawData:
   def deserialize(self) -> Any:
     if self._data is None: self._data = msgpack.unpackb(self._raw)
     return self._data
+  def get(self, key: str) -> Any:
+    """Reads a single value of map data. Raw data is not deserialized for this, which saves decoding large values."""
+    if self._data is None:
+      try: return find_map_value(self._raw, key)
+      except (ValueError, IndexError, struct.error): pass # NOTE: not a map or invalid, let msgpack handle it
+    data = self.deserialize()
+    if not isinstance(data, dict): raise KeyError(key)
+    return data[key]
   def update(self):
     self.deserialize()
     self._raw = None
@@ -1,24 +1,113 @@
-import copy
+import json
 import os
-from typing import Generic, Iterable, TypeVar
+from typing import Any, Generic, Hashable, Iterable, TypeVar
 from pydantic import BaseModel, TypeAdapter
 
 T = TypeVar("T", bound=BaseModel)
 
+def _fsync_directory(path: str):
+  if os.name != "posix": return # NOTE: directories can not be opened for syncing on windows
+  fd = os.open(path, os.O_RDONLY)
+  try: os.fsync(fd)
+  finally: os.close(fd)
+
 class PydanticDB(Generic[T]):
-  def __init__(self, model: type[T], filename: str) -> None:
+  """
+  Stores models by a key field, with optional indexes on other fields.
+  The entries are stored in a snapshot file (a json list) and changes are appended to a journal file next to it (json lines).
+  Once the journal grows larger than the snapshot, both are compacted into a new snapshot.
+  Stored entries are never changed in place, put copies them and readers get the stored entries without a copy.
+  Readers must not change the entries they get, they put a changed copy instead.
+  """
+  def __init__(self, model: type[T], filename: str, key: str = "id", indexes: Iterable[str] = ()) -> None:
+    self._model = model
     self._list_model = TypeAdapter(list[model])
-    self._entries: list[T] = []
+    self._key_model = TypeAdapter(model.model_fields[key].annotation)
+    self._key = key
+    self._entries: dict[Hashable, T] = {}
+    self._snapshot: tuple[T, ...] | None = None
+    self._indexes: dict[str, dict[Hashable, dict[Hashable, None]]] = { field: {} for field in indexes }
     self._filename = filename
-    if os.path.exists(filename): self.load()
+    self._journal_filename = filename + ".journal"
+    self._journal_length = 0
+    self.load()
 
   @property
-  def entries(self): return copy.deepcopy(self._entries)
+  def entries(self) -> tuple[T, ...]:
+    if self._snapshot is None: self._snapshot = tuple(self._entries.values())
+    return self._snapshot
+
+  def __contains__(self, key: Hashable): return key in self._entries
+  def __len__(self): return len(self._entries)
+
+  def get(self, key: Hashable) -> T: return self._entries[key]
+  def find(self, field: str, value: Hashable) -> list[T]:
+    """finds all entries with a value in an indexed field."""
+    return [ self._entries[key] for key in self._indexes[field].get(value, ()) ]
+
+  def put(self, entry: T):
+    entry = entry.model_copy(deep=True) # NOTE: the caller may keep changing its entry
+    self._put(entry)
+    self._append_journal(b'{"put":' + entry.model_dump_json().encode("utf-8") + b'}\n')
 
-  def save(self):
-    with open(self._filename, "wb") as fd: fd.write(self._list_model.dump_json(self._entries))
+  def delete(self, key: Hashable):
+    if key not in self._entries: return
+    self._delete(key)
+    self._append_journal(b'{"delete":' + self._key_model.dump_json(key) + b'}\n')
 
   def load(self):
-    with open(self._filename, "rb") as fd: self._entries = self._list_model.validate_json(fd.read())
+    self._entries.clear()
+    self._snapshot = None
+    for index in self._indexes.values(): index.clear()
+    if os.path.exists(self._filename):
+      with open(self._filename, "rb") as fd:
+        for entry in self._list_model.validate_json(fd.read()): self._put(entry)
+    self._journal_length = 0
+    if os.path.exists(self._journal_filename):
+      with open(self._journal_filename, "rb") as fd: lines = fd.read().splitlines()
+      for idx, line in enumerate(lines):
+        try: record = json.loads(line)
+        except ValueError:
+          if idx == len(lines) - 1: break # NOTE: the last record may be incomplete, if the process crashed while writing it
+          raise
+        self._apply_journal_record(record)
+        self._journal_length += 1
+    if os.path.exists(self._journal_filename): self.compact() # NOTE: this also drops an incomplete record, which the next record would be appended to
+
+  def compact(self):
+    # NOTE: the snapshot is replaced before the journal is removed. A crash in between replays the journal on the new snapshot, which changes nothing.
+    # Both are synced to disk first, so that a power loss can not leave an incomplete snapshot without the journal.
+    temp_filename = self._filename + ".tmp"
+    with open(temp_filename, "wb") as fd:
+      fd.write(self._list_model.dump_json(list(self._entries.values())))
+      fd.flush()
+      os.fsync(fd.fileno())
+    os.replace(temp_filename, self._filename)
+    _fsync_directory(os.path.dirname(os.path.abspath(self._filename)))
+    if os.path.exists(self._journal_filename): os.remove(self._journal_filename)
+    self._journal_length = 0
+
+  def _apply_journal_record(self, record: dict[str, Any]):
+    if "put" in record: self._put(self._model.model_validate(record["put"]))
+    else: self._delete(self._key_model.validate_python(record["delete"]))
+
+  def _append_journal(self, record: bytes):
+    with open(self._journal_filename, "ab") as fd: fd.write(record)
+    self._journal_length += 1
+    if self._journal_length > max(64, len(self._entries)): self.compact()
+
+  def _put(self, entry: T):
+    key = getattr(entry, self._key)
+    self._delete(key)
+    self._entries[key] = entry
+    self._snapshot = None
+    for field, index in self._indexes.items(): index.setdefault(getattr(entry, field), {})[key] = None
 
-  def update(self, entries: Iterable[T]): self._entries = list(entries)
+  def _delete(self, key: Hashable):
+    entry = self._entries.pop(key, None)
+    if entry is None: return
+    self._snapshot = None
+    for field, index in self._indexes.items():
+      keys = index[getattr(entry, field)]
+      keys.pop(key)
+      if len(keys) == 0: index.pop(getattr(entry, field))
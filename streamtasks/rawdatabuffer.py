@@ -1,40 +1,104 @@
-import dbm
-import os
+from bisect import bisect_left
+import mmap
 import tempfile
+from typing import Iterator, Optional
+from streamtasks.message.utils import get_timestamp_from_message
 from streamtasks.net.serialization import RawData
 
 class RawDataBuffer:
-  def __init__(self) -> None:
-    self._key_counter: int = 0
-    self._db_file = tempfile.mktemp(".db")
-    self._db = dbm.open(self._db_file, "c")
-    self._index_map: list[str] = []
+  """
+  A fixed capacity ring buffer of messages stored in a memory mapped temporary file.
+  When the capacity is exceeded, the oldest messages are dropped.
+  """
+  def __init__(self, capacity: int = 1 << 28) -> None:
+    self._capacity = capacity
+    self._file = tempfile.TemporaryFile()
+    self._file.truncate(capacity)
+    self._mm = mmap.mmap(self._file.fileno(), capacity)
+    self._write_pos = 0
+    self._first_id = 0 # sequence id of the oldest message, stays valid across evictions
+    self._start = 0 # index of the oldest message in the lists below
+    self._records: list[tuple[int, int]] = [] # (offset, size)
+    self._timestamps: list[int] = []
 
-  def __del__(self):
-    self._db.close()
-    os.remove(self._db_file)
+  def __del__(self): self.close()
+
+  @property
+  def capacity(self): return self._capacity
+
+  def close(self):
+    if self._mm.closed: return
+    self._mm.close()
+    self._file.close()
 
   def clear(self):
-    self._db.clear()
-    self._index_map.clear()
+    self._first_id += len(self)
+    self._start = 0
+    self._write_pos = 0
+    self._records.clear()
+    self._timestamps.clear()
 
   def append(self, data: RawData):
-    self._index_map.append(str(self._key_counter))
-    self._key_counter += 1
-    self._db[self._index_map[-1]] = bytes(data.serialize())
-
-  def popleft(self): return self.pop(0)
-  def pop(self, index: int = -1):
-    key = self._index_map.pop(index)
-    data = RawData(self._db[key])
-    del self._db[key]
+    raw = data.serialize()
+    size = len(raw)
+    if size > self._capacity: raise ValueError("message is larger than the buffer capacity")
+    pos = self._write_pos
+    if pos + size > self._capacity:
+      # NOTE: the messages between the write position and the end are the oldest, they are dropped when wrapping around
+      while len(self) > 0 and self._records[self._start][0] >= pos: self._drop_oldest()
+      pos = 0
+    while len(self) > 0 and self._overlaps_oldest(pos, size): self._drop_oldest()
+
+    self._mm[pos:pos + size] = raw
+    self._write_pos = pos + size
+    self._records.append((pos, size))
+    # NOTE: messages without a timestamp inherit the last one, to keep the index sorted for monotonic streams
+    try: timestamp = get_timestamp_from_message(data)
+    except ValueError: timestamp = self._timestamps[-1] if len(self) > 0 else 0
+    self._timestamps.append(timestamp)
+
+  def popleft(self):
+    if len(self) == 0: raise IndexError("pop from an empty buffer")
+    data = self[0]
+    self._drop_oldest()
     return data
 
-  def __iter__(self):
-    for key in self._index_map: yield RawData(self._db[key])
-  def __len__(self): return len(self._index_map)
-  def __getitem__(self, key: int): return RawData(self._db[self._index_map[key]])
-  def __setitem__(self, key: int, value: RawData): self._db[self._index_map[key]] = bytes(value.serialize())
-  def __delitem__(self, key: int):
-    del self._db[self._index_map[key]]
-    del self._index_map[key]
+  def seek(self, timestamp: int) -> int:
+    """Returns the index of the first message with a timestamp not lower than the given timestamp."""
+    return bisect_left(self._timestamps, timestamp, lo=self._start) - self._start
+
+  def range(self, start_timestamp: int, end_timestamp: Optional[int] = None) -> Iterator[RawData]:
+    for data, timestamp in self._iter_from(self._first_id + self.seek(start_timestamp)):
+      if end_timestamp is not None and timestamp >= end_timestamp: break
+      yield data
+
+  def __iter__(self) -> Iterator[RawData]:
+    for data, _ in self._iter_from(self._first_id): yield data
+  def __len__(self): return len(self._records) - self._start
+  def __getitem__(self, index: int) -> RawData:
+    if index < 0: index += len(self)
+    if index < 0 or index >= len(self): raise IndexError("buffer index out of range")
+    offset, size = self._records[self._start + index]
+    return RawData(self._mm[offset:offset + size])
+
+  def _iter_from(self, seq_id: int) -> Iterator[tuple[RawData, int]]:
+    # NOTE: iterates by sequence id, so that appending and dropping messages while iterating is safe
+    while True:
+      seq_id = max(seq_id, self._first_id)
+      index = seq_id - self._first_id
+      if index >= len(self): return
+      yield self[index], self._timestamps[self._start + index]
+      seq_id += 1
+
+  def _overlaps_oldest(self, pos: int, size: int):
+    offset, old_size = self._records[self._start]
+    return offset < pos + size and pos < offset + old_size
+
+  def _drop_oldest(self):
+    self._start += 1
+    self._first_id += 1
+    if self._start == len(self._records): self.clear()
+    elif self._start > 1024 and self._start * 2 > len(self._records):
+      del self._records[:self._start]
+      del self._timestamps[:self._start]
+      self._start = 0
@@ -1,4 +1,6 @@
+import os
 from typing import Any
+from pydantic import BaseModel
 from streamtasks.client.broadcast import BroadcastingServer
 from streamtasks.client.signal import SignalServer
 from streamtasks.services.constants import NetworkAddresses, NetworkTopics
@@ -11,15 +13,25 @@ from streamtasks.client.discovery import DiscoveryConstants, AddressNameAssignme
 import logging
 import asyncio
 
+class DiscoveryState(BaseModel):
+  address_counter: int = NetworkAddresses.COUNTER_INIT
+  topics_counter: int = NetworkTopics.COUNTER_INIT
+  topic_space_id_counter: int = 0
+  topic_spaces: dict[int, dict[int, int]] = {}
+
 class DiscoveryWorker(Worker):
-  def __init__(self):
+  """
+  With a state filename, the topic spaces and counters are stored and restored on restart.
+  The counters are stored ahead of the ids that were handed out (see COUNTER_RESERVE), so that a restart never hands out an id twice.
+  Address names are not stored, their owners may be gone after a restart and must register them again.
+  """
+  COUNTER_RESERVE = 1024
+
+  def __init__(self, state_filename: str | None = None):
     super().__init__()
-    self._address_counter = NetworkAddresses.COUNTER_INIT
-    self._topics_counter = NetworkTopics.COUNTER_INIT
-    self._topic_space_id_counter = 0
-    self._address_map: dict[str, int] = {}
-    self._topic_spaces: dict[int, dict[int, int]] = {}
+    self._state_filename = state_filename
     self._bc_server: BroadcastingServer
+    self._load_state()
 
   async def run(self):
     client = await self.create_client()
@@ -36,9 +48,7 @@ class DiscoveryWorker(Worker):
           self._bc_server.run(),
         )
     finally:
-      self._address_counter = NetworkAddresses.COUNTER_INIT
-      self._topics_counter = NetworkTopics.COUNTER_INIT
-      self._address_map = {}
+      self._load_state()
       await self.shutdown()
 
   async def _run_lighthouse(self, client: Client):
@@ -88,6 +98,7 @@ class DiscoveryWorker(Worker):
       self._topic_space_id_counter += 1
       topic_id_map = { k: v for k, v in zip(message.topic_ids, new_topic_ids) }
       self._topic_spaces[self._topic_space_id_counter] = topic_id_map
+      self._save_state()
       await req.respond(TopicSpaceResponseMessage(id=self._topic_space_id_counter, topic_id_map=list(topic_id_map.items())).model_dump())
 
     @server.route(DiscoveryConstants.FD_GET_TOPIC_SPACE_TRANSLATION)
@@ -113,6 +124,7 @@ class DiscoveryWorker(Worker):
       try:
         request = TopicSpaceRequestMessage.model_validate(req.body)
         self._topic_spaces.pop(request.id)
+        self._save_state()
         await req.respond("OK")
       except KeyError as e:
         await req.respond_error(new_fetch_body_bad_request(str(e)))
@@ -143,9 +155,41 @@ class DiscoveryWorker(Worker):
   def generate_topic_ids(self, count: int) -> set[int]:
     res = set(self._topics_counter + i for i in range(count))
     self._topics_counter += count
+    self._reserve_counters()
     return res
 
   def generate_addresses(self, count: int) -> set[int]:
     res = set(self._address_counter + i for i in range(count))
     self._address_counter += count
+    self._reserve_counters()
     return res
+
+  def _reserve_counters(self):
+    if self._address_counter > self._reserved_state.address_counter or self._topics_counter > self._reserved_state.topics_counter:
+      self._save_state()
+
+  def _load_state(self):
+    state = DiscoveryState()
+    if self._state_filename is not None and os.path.exists(self._state_filename):
+      with open(self._state_filename, "rb") as fd: state = DiscoveryState.model_validate_json(fd.read())
+    self._address_counter = state.address_counter
+    self._topics_counter = state.topics_counter
+    self._topic_space_id_counter = state.topic_space_id_counter
+    self._address_map: dict[str, int] = {}
+    self._topic_spaces: dict[int, dict[int, int]] = state.topic_spaces
+    self._reserved_state = state
+
+  def _save_state(self):
+    if self._state_filename is None: return
+    self._reserved_state = DiscoveryState(
+      address_counter=self._address_counter + self.COUNTER_RESERVE,
+      topics_counter=self._topics_counter + self.COUNTER_RESERVE,
+      topic_space_id_counter=self._topic_space_id_counter,
+      topic_spaces=self._topic_spaces)
+    # NOTE: replace the file at once, so that a crash while saving keeps the previous state
+    temp_filename = self._state_filename + ".tmp"
+    with open(temp_filename, "wb") as fd:
+      fd.write(self._reserved_state.model_dump_json().encode("utf-8"))
+      fd.flush()
+      os.fsync(fd.fileno())
+    os.replace(temp_filename, self._state_filename)
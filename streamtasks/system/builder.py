@@ -1,9 +1,11 @@
 import asyncio
 import functools
+import os
 from streamtasks.asgi import HTTPServerOverASGI
 from streamtasks.client import Client
 from streamtasks.client.discovery import wait_for_topic_signal
 from streamtasks.connection import AutoReconnector, connect, create_server
+from streamtasks.env import get_data_sub_dir
 from streamtasks.net import Switch
 from streamtasks.services.discovery import DiscoveryWorker
 from streamtasks.services.constants import NetworkAddressNames, NetworkTopics
@@ -41,7 +43,7 @@ class SystemBuilder:
     await self.start_secret_manager()
     await self.start_task_system()
 
-  async def start_discovery(self): await self._start_worker(DiscoveryWorker(), TaskPriorities.Infra)
+  async def start_discovery(self): await self._start_worker(DiscoveryWorker(os.path.join(get_data_sub_dir("user-data"), "discovery.json")), TaskPriorities.Infra)
   async def start_connector(self, url: str | None = None): await self._start_worker(AutoReconnector(functools.partial(connect, url=url)), TaskPriorities.Network)
   async def start_server(self, url: str | None = None): await self._start_worker(create_server(url), TaskPriorities.Network)
   async def start_node_server(self): await self.start_server()
@@ -80,7 +82,7 @@ class SystemBuilder:
   async def stop(self): await self.tasks.cancel_all("Stopped")
 
   async def _start_worker(self, worker: Worker, priority: int = 0):
-    await self.switch.add_link(await worker.create_link())
+    worker.attach(self.switch)
     self.tasks.create(worker.run(), priority)
 
   async def _wait_discovery(self):
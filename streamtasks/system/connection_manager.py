@@ -216,10 +216,10 @@ class ConnectionManager(TaskWebPathHandler):
 
   async def create_connection_url_data(self, url: str):
     w = AutoReconnector(connect_fn=functools.partial(connect, url=url))
-    await self.switch.add_link(await w.create_link())
+    w.attach(self.switch)
     return ConnectionUrlData(url=url, worker=w, change_trigger=self._change_trigger_connections)
 
   async def create_server_url_data(self, url: str):
     w = create_server(url)
-    await self.switch.add_link(await w.create_link())
+    w.attach(self.switch)
     return ServerUrlData(url=url, worker=w, change_trigger=self._change_trigger_servers)
@@ -366,7 +366,7 @@ class FnTaskContext:
   async def run(self, to: Link | str | None = None, register_endpoits: list[EndpointOrAddress] = [NetworkAddressNames.TASK_MANAGER]):
     switch = Switch()
     task_host = self.TaskHost(register_endpoits=register_endpoits)
-    await switch.add_link(await task_host.create_link())
+    task_host.attach(switch)
 
     if isinstance(to, Link):
       await switch.add_link(to)
@@ -375,11 +375,11 @@ class FnTaskContext:
       tasks = AsyncTaskManager(default_frozen=True)
       logging.info("connecting" + ("!" if to is None else " to " + to))
       reconnector = AutoReconnector(functools.partial(connect, url=to))
+      reconnector.attach(switch)
       tasks.create(reconnector.run(), priority=1)
       await reconnector.wait_connected()
       logging.info("connected" + ("!" if to is None else " to " + to))
 
-      await switch.add_link(await reconnector.create_link())
       tasks.create(task_host.run())
       await tasks.wait(return_when="FIRST_COMPLETED")
 
@@ -28,7 +28,7 @@ NamedTopicListModel = TypeAdapter(list[NamedTopicModel])
 class NamedTopicManager(TaskWebPathHandler):
   def __init__(self, register_endpoits: list[EndpointOrAddress] = [NetworkAddressNames.TASK_MANAGER_WEB]):
     super().__init__("/named-topics/", PathRegistrationFrontend(path="std:namedtopicmanager", label="Named Topic Manager"), register_endpoits)
-    self.db = PydanticDB(NamedTopicModel, os.path.join(get_data_sub_dir("user-data"), "named-topics.json"))
+    self.db = PydanticDB(NamedTopicModel, os.path.join(get_data_sub_dir("user-data"), "named-topics.json"), key="name")
     self.topic_map: dict[str, int] = {}
 
   async def run_inner(self):
@@ -39,33 +39,31 @@ class NamedTopicManager(TaskWebPathHandler):
     server = FetchServer(self.client)
 
     @server.route("list_named_topics")
-    async def _(req: FetchRequest): await req.respond(NamedTopicListModel.dump_python(self.db.entries))
+    async def _(req: FetchRequest): await req.respond(NamedTopicListModel.dump_python(list(self.db.entries)))
 
     @server.route("get_named_topic")
     async def _(req: FetchRequest):
       try:
         data = NamedTopicRequestModel.model_validate(req.body)
-        await req.respond(next(e for e in self.db.entries if e.name == data.name).model_dump())
-      except StopIteration: await req.respond_error(new_fetch_body_not_found("named topic not found!"))
+        await req.respond(self.db.get(data.name).model_dump())
+      except KeyError: await req.respond_error(new_fetch_body_not_found("named topic not found!"))
 
     @server.route("put_named_topic")
     async def _(req: FetchRequest):
       data = NamedTopicModel.model_validate(req.body)
-      self.db.update([e for e in self.db.entries if e.name != data.name] + [data])
-      self.db.save()
+      self.db.put(data)
       await req.respond(data.model_dump())
 
     @server.route("delete_named_topic")
     async def _(req: FetchRequest):
       data = NamedTopicRequestModel.model_validate(req.body)
-      self.db.update(e for e in self.db.entries if e.name != data.name)
-      self.db.save()
+      self.db.delete(data.name)
       await req.respond(None)
 
     @server.route("resolve_named_topic")
     async def _(req: FetchRequest):
       data = NamedTopicRequestModel.model_validate(req.body)
-      if next((1 for e in self.db.entries if e.name == data.name), None) is None: self.db.update(self.db.entries + [ NamedTopicModel(name=data.name, metadata={}) ])
+      if data.name not in self.db: self.db.put(NamedTopicModel(name=data.name, metadata={}))
       if data.name not in self.topic_map: self.topic_map[data.name] = (await self.client.request_topic_ids(1))[0]
       await req.respond(NamedTopicResolvedResponseModel(topic=self.topic_map[data.name]).model_dump())
 
@@ -85,14 +83,13 @@ class NamedTopicManager(TaskWebPathHandler):
 
     @router.get("/api/named-topics")
     @http_context_handler
-    async def _(ctx: HTTPContext): await ctx.respond_json_raw(NamedTopicListModel.dump_json(self.db.entries))
+    async def _(ctx: HTTPContext): await ctx.respond_json_raw(NamedTopicListModel.dump_json(list(self.db.entries)))
 
     @router.put("/api/named-topic")
     @http_context_handler
     async def _(ctx: HTTPContext):
       data = NamedTopicModel.model_validate_json(await ctx.receive_json_raw())
-      self.db.update([e for e in self.db.entries if e.name != data.name] + [data])
-      self.db.save()
+      self.db.put(data)
       await ctx.respond_json(data.model_dump())
 
     @router.get("/api/named-topic/{name}")
@@ -100,15 +97,14 @@ class NamedTopicManager(TaskWebPathHandler):
     async def _(ctx: HTTPContext):
       try:
         name = unquote(ctx.params["name"])
-        await ctx.respond_json(next(e for e in self.db.entries if e.name == name).model_dump())
-      except StopIteration: await ctx.respond_status(404)
+        await ctx.respond_json(self.db.get(name).model_dump())
+      except KeyError: await ctx.respond_status(404)
 
     @router.delete("/api/named-topic/{name}")
     @http_context_handler
     async def _(ctx: HTTPContext):
       name = unquote(ctx.params["name"])
-      self.db.update(e for e in self.db.entries if e.name != name)
-      self.db.save()
+      self.db.delete(name)
       await ctx.respond_status(200)
 
     await ASGIAppRunner(self.client, app).run()
@@ -38,21 +38,19 @@ class SecretManager(TaskWebPathHandler):
     async def _(req: FetchRequest):
       try:
         data = SecretRequestModel.model_validate(req.body)
-        await req.respond(next(e for e in self.db.entries if e.id == data.id).model_dump())
+        await req.respond(self.db.get(data.id).model_dump())
       except KeyError: await req.respond_error(new_fetch_body_not_found("secret not found!"))
 
     @server.route("put_secret")
     async def _(req: FetchRequest):
       data = SecretModel.model_validate(req.body)
-      self.db.update([e for e in self.db.entries if e.id != data.id] + [data])
-      self.db.save()
+      self.db.put(data)
       await req.respond(data.model_dump())
 
     @server.route("delete_secret")
     async def _(req: FetchRequest):
       data = SecretRequestModel.model_validate(req.body)
-      self.db.update(e for e in self.db.entries if e.id != data.id)
-      self.db.save()
+      self.db.delete(data.id)
       await req.respond(None)
 
     await server.run()
@@ -73,8 +71,7 @@ class SecretManager(TaskWebPathHandler):
     @http_context_handler
     async def _(ctx: HTTPContext):
       data = SecretModel.model_validate_json(await ctx.receive_json_raw())
-      self.db.update([e for e in self.db.entries if e.id != data.id] + [data])
-      self.db.save()
+      self.db.put(data)
       await ctx.respond_status(200)
 
     @router.delete("/api/secret/{id}")
@@ -82,8 +79,7 @@ class SecretManager(TaskWebPathHandler):
     async def _(ctx: HTTPContext):
       try:
         id = UUID(ctx.params["id"])
-        self.db.update(e for e in self.db.entries if e.id != id)
-        self.db.save()
+        self.db.delete(id)
         await ctx.respond_status(200)
       except KeyError: await ctx.respond_status(404)
 
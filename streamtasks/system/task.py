@@ -11,7 +11,7 @@ from streamtasks.asgiserver import ASGIRouter, ASGIServer
 from streamtasks.client import Client
 import asyncio
 from streamtasks.client.broadcast import BroadcastReceiver, BroadcastingServer
-from streamtasks.client.discovery import address_name_context, get_topic_space, wait_for_topic_signal
+from streamtasks.client.discovery import DiscoveryLeases, address_name_context, get_topic_space, wait_for_topic_signal
 from streamtasks.client.fetch import FetchError, FetchErrorStatusCode, FetchRequest, FetchServer, new_fetch_body_bad_request, new_fetch_body_general_error, new_fetch_body_not_found
 from streamtasks.client.signal import SignalServer, send_signal
 from streamtasks.client.topic import OutTopic
@@ -20,7 +20,7 @@ from streamtasks.net.serialization import RawData
 from streamtasks.net.utils import endpoint_to_str
 from streamtasks.services.constants import NetworkAddressNames, NetworkPorts, NetworkTopics
 from streamtasks.env import NODE_NAME
-from streamtasks.utils import get_node_name_id
+from streamtasks.utils import SyncQueue, get_node_name_id
 from streamtasks.worker import Worker
 
 MetadataDict = dict[str, int|float|str|bool]
@@ -38,6 +38,10 @@ class SyncTask(Task):
     super().__init__(client)
     self.loop = asyncio.get_running_loop()
     self.stop_event = threading.Event()
+    self._queues: list[SyncQueue] = []
+    self._send_lock = threading.Lock()
+    self._send_buffer: list[tuple[OutTopic, RawData]] = []
+    self._send_scheduled = False
 
   async def run(self):
     fut: None | asyncio.Future = None
@@ -47,6 +51,7 @@ class SyncTask(Task):
         await asyncio.shield(fut)
       finally:
         self.stop_event.set()
+        for queue in self._queues: queue.close()
         if fut: await fut
 
   @abstractmethod
@@ -55,7 +60,31 @@ class SyncTask(Task):
   @abstractmethod
   def run_sync(self): pass
 
-  def send_data(self, topic: OutTopic, data: RawData): asyncio.run_coroutine_threadsafe(topic.send(data), self.loop)
+  def create_queue(self, max_size: int = 0) -> SyncQueue:
+    """creates a queue for passing data to run_sync, it is closed when the task stops."""
+    queue = SyncQueue(max_size)
+    self._queues.append(queue)
+    return queue
+
+  def send_data(self, topic: OutTopic, data: RawData):
+    with self._send_lock:
+      self._send_buffer.append((topic, data))
+      if self._send_scheduled: return # NOTE: the pending send picks this up as well
+      self._send_scheduled = True
+    asyncio.run_coroutine_threadsafe(self._send_buffered(), self.loop)
+
+  async def _send_buffered(self):
+    try:
+      while True:
+        with self._send_lock:
+          sends, self._send_buffer = self._send_buffer, []
+          if len(sends) == 0:
+            self._send_scheduled = False
+            return
+        for topic, data in sends: await topic.send(data)
+    except BaseException:
+      with self._send_lock: self._send_scheduled = False
+      raise
 
 class ModelWithId(BaseModel):
   id: UUID4
@@ -75,6 +104,9 @@ class TaskStartResponse(ModelWithId):
   error: Optional[str]
   metadata: MetadataDict
 
+TaskStartRequestList = TypeAdapter(list[TaskStartRequest])
+TaskStartResponseList = TypeAdapter(list[TaskStartResponse])
+
 TaskCancelRequest = ModelWithId
 
 class TaskStatus(Enum):
@@ -107,6 +139,13 @@ class TMTaskScheduleRequest(BaseModel):
 class TMTaskStartRequest(ModelWithId):
   config: Any
 
+class TMTaskScheduleStartRequest(TMTaskScheduleRequest):
+  config: Any
+
+TMTaskScheduleRequestList = TypeAdapter(list[TMTaskScheduleRequest])
+TMTaskStartRequestList = TypeAdapter(list[TMTaskStartRequest])
+TMTaskScheduleStartRequestList = TypeAdapter(list[TMTaskScheduleStartRequest])
+
 TMTaskRequestBase = ModelWithId
 
 class TaskInstance(ModelWithId):
@@ -119,6 +158,8 @@ class TaskInstance(ModelWithId):
   @field_serializer("status")
   def serialize_status(self, status: TaskStatus): return status.value
 
+TaskInstanceList = TypeAdapter(list[TaskInstance])
+
 class TaskConstants:
   # fetch descriptors
   FD_REGISTER_TASK_HOST = "register_task_host"
@@ -129,10 +170,14 @@ class TaskConstants:
   FD_TM_TASK_SCHEDULE = "schedule_task"
   FD_TM_TASK_START = "start_task"
   FD_TM_TASK_CANCEL = "cancel_task"
+  FD_TM_TASKS_SCHEDULE = "schedule_tasks"
+  FD_TM_TASKS_START = "start_tasks"
+  FD_TM_TASKS_SCHEDULE_START = "schedule_start_tasks"
 
   FD_TMW_REGISTER_PATH = "register_path"
 
   FD_TASK_START = "start"
+  FD_TASKS_START = "start_many"
   FD_TASK_CANCEL = "cancel"
 
   # signal descriptors
@@ -162,19 +207,32 @@ class TaskHost(Worker):
     self.id = task_host_id_from_name(self.__class__.__name__)
     self._base_metadata = { "nodename": NODE_NAME() }
     self._registered_at_endpoints: list[EndpointOrAddress] = []
+    self._leases: DiscoveryLeases | None = None
+    self._topic_spaces: dict[int, asyncio.Task[dict[int, int]]] = {}
 
   @property
   def metadata(self) -> MetadataDict: return {}
 
-  async def create_client(self, topic_space_id: int | None = None) -> Client: return Client(await self.create_link(topic_space_id))
+  async def create_client(self, topic_space_id: int | None = None) -> Client: return Client(await self.create_link(topic_space_id), self._leases)
   async def create_link(self, topic_space_id: int | None = None) -> Link:
     a, b = create_queue_connection()
     if topic_space_id is not None:
-      topic_map = await get_topic_space(self.client, topic_space_id)
+      topic_map = await self.get_topic_space(topic_space_id)
       b = TopicRemappingLink(b, topic_map)
-    await self.switch.add_link(a)
+    await self.add_link(a)
     return b
 
+  async def get_topic_space(self, topic_space_id: int) -> dict[int, int]:
+    # NOTE: the tasks of a deployment share one topic space, fetch it only once
+    task = self._topic_spaces.get(topic_space_id, None)
+    if task is None:
+      task = self._topic_spaces[topic_space_id] = asyncio.create_task(get_topic_space(self.client, topic_space_id))
+      while len(self._topic_spaces) > 32: self._topic_spaces.pop(next(iter(self._topic_spaces)))
+    try: return await asyncio.shield(task)
+    except BaseException:
+      if task.done() and self._topic_spaces.get(topic_space_id, None) is task: self._topic_spaces.pop(topic_space_id)
+      raise
+
   async def register(self, endpoint: EndpointOrAddress = NetworkAddressNames.TASK_MANAGER):
     if not hasattr(self, "client"): raise ValueError("Client not created yet!")
     if self.client.address is None: raise ValueError("Client had no address!")
@@ -192,6 +250,7 @@ class TaskHost(Worker):
       self.client.start()
       await wait_for_topic_signal(self.client, NetworkTopics.DISCOVERY_SIGNAL)
       await self.client.request_address()
+      self._leases = DiscoveryLeases(self.client)
       futs: list[asyncio.Future] = []
 
       asgi_router = ASGIRouter()
@@ -217,11 +276,20 @@ class TaskHost(Worker):
       for task in self.tasks.values(): task.cancel()
       if len(shutdown_tasks) > 0: await asyncio.wait(shutdown_tasks, timeout=1) # NOTE: make configurable
       await self.shutdown()
+      self._leases = None
+      self._topic_spaces.clear()
       self.ready.clear()
 
   async def register_routes(self, router: ASGIRouter): pass
   @abstractmethod
   async def create_task(self, config: Any, topic_space_id: int | None) -> Task: pass
+  async def start_task(self, request: TaskStartRequest) -> TaskStartResponse:
+    try:
+      task = await self.create_task(request.config, request.topic_space_id)
+      metadata = await asyncio.wait_for(task.setup(), 1) # NOTE: make this configurable
+      self.tasks[request.id] = asyncio.create_task(self.run_task(request.id, task, request.report_address))
+      return TaskStartResponse(id=request.id, metadata=metadata, error=None)
+    except BaseException as e: return TaskStartResponse(id=request.id, error=str(e), metadata={})
   async def run_task(self, id: UUID4, task: Task, report_address: int):
     error_text = None
     status = TaskStatus.running
@@ -244,13 +312,14 @@ class TaskHost(Worker):
     @fetch_server.route(TaskConstants.FD_TASK_START)
     async def _(req: FetchRequest):
       body = TaskStartRequest.model_validate(req.body)
+      await req.respond((await self.start_task(body)).model_dump())
+
+    @fetch_server.route(TaskConstants.FD_TASKS_START)
+    async def _(req: FetchRequest):
       try:
-        task = await self.create_task(body.config, body.topic_space_id)
-        metadata = await asyncio.wait_for(task.setup(), 1) # NOTE: make this configurable
-        self.tasks[body.id] = asyncio.create_task(self.run_task(body.id, task, body.report_address))
-        await req.respond(TaskStartResponse(id=body.id, metadata=metadata, error=None))
-      except BaseException as e:
-        await req.respond(TaskStartResponse(id=body.id, error=str(e), metadata={}))
+        requests = TaskStartRequestList.validate_python(req.body)
+        await req.respond(TaskStartResponseList.dump_python(await asyncio.gather(*(self.start_task(request) for request in requests))))
+      except ValidationError as e: await req.respond_error(new_fetch_body_bad_request(str(e)))
 
     @fetch_server.route(TaskConstants.FD_TASK_CANCEL)
     async def _(req: FetchRequest):
@@ -312,7 +381,7 @@ class TaskManager(Worker):
     await server.run()
 
   async def run_fetch_api(self):
-    server = FetchServer(self.client)
+    server = FetchServer(self.client, max_concurrency=32)
 
     @server.route(TaskConstants.FD_REGISTER_TASK_HOST)
     async def _(req: FetchRequest):
@@ -348,18 +417,7 @@ class TaskManager(Worker):
     async def _(req: FetchRequest):
       try:
         body = TMTaskScheduleRequest.model_validate(req.body)
-
-        task_instance = TaskInstance(
-          id=uuid4(),
-          host_id=body.host_id,
-          topic_space_id=body.topic_space_id,
-          metadata={},
-          error=None,
-          status=TaskStatus.scheduled
-        )
-        self.tasks[task_instance.id] = task_instance
-
-        await req.respond(task_instance.model_dump())
+        await req.respond(self.schedule_task(body).model_dump())
       except KeyError as e: await req.respond_error(new_fetch_body_not_found(str(e)))
       except ValidationError as e: await req.respond_error(new_fetch_body_bad_request(str(e)))
 
@@ -367,26 +425,36 @@ class TaskManager(Worker):
     async def _(req: FetchRequest):
       try:
         body = TMTaskStartRequest.model_validate(req.body)
-        task_instance = self.tasks[body.id]
-        task_host = self.task_hosts[task_instance.host_id]
-
-        task_start_request = TaskStartRequest(
-          id=task_instance.id,
-          topic_space_id=task_instance.topic_space_id,
-          report_address=self.client.address,
-          config=body.config
-        )
-
-        task_start_result = await self.client.fetch(task_host.address, TaskConstants.FD_TASK_START, task_start_request.model_dump())
-        task_start_result: TaskStartResponse = TaskStartResponse.model_validate(task_start_result)
+        task_instance, = await self.start_tasks([ body ])
+        await req.respond(task_instance.model_dump())
+      except KeyError as e: await req.respond_error(new_fetch_body_not_found(str(e)))
+      except ValidationError as e: await req.respond_error(new_fetch_body_bad_request(str(e)))
 
-        task_instance.metadata=task_start_result.metadata
-        task_instance.error=task_start_result.error
-        task_instance.status=TaskStatus.running if task_start_result.error is None else TaskStatus.failed
+    @server.route(TaskConstants.FD_TM_TASKS_SCHEDULE)
+    async def _(req: FetchRequest):
+      try:
+        requests = TMTaskScheduleRequestList.validate_python(req.body)
+        for request in requests: self.task_hosts[request.host_id] # NOTE: validate all requests before scheduling any task
+        await req.respond(TaskInstanceList.dump_python([ self.schedule_task(request) for request in requests ]))
+      except KeyError as e: await req.respond_error(new_fetch_body_not_found(str(e)))
+      except ValidationError as e: await req.respond_error(new_fetch_body_bad_request(str(e)))
 
-        if task_instance.status == TaskStatus.failed: self.tasks.pop(task_instance.id)
+    @server.route(TaskConstants.FD_TM_TASKS_START)
+    async def _(req: FetchRequest):
+      try:
+        requests = TMTaskStartRequestList.validate_python(req.body)
+        await req.respond(TaskInstanceList.dump_python(await self.start_tasks(requests)))
+      except KeyError as e: await req.respond_error(new_fetch_body_not_found(str(e)))
+      except ValidationError as e: await req.respond_error(new_fetch_body_bad_request(str(e)))
 
-        await req.respond(task_instance.model_dump())
+    @server.route(TaskConstants.FD_TM_TASKS_SCHEDULE_START)
+    async def _(req: FetchRequest):
+      try:
+        requests = TMTaskScheduleStartRequestList.validate_python(req.body)
+        for request in requests: self.task_hosts[request.host_id]
+        task_instances = [ self.schedule_task(request) for request in requests ]
+        start_requests = [ TMTaskStartRequest(id=task_instance.id, config=request.config) for task_instance, request in zip(task_instances, requests) ]
+        await req.respond(TaskInstanceList.dump_python(await self.start_tasks(start_requests)))
       except KeyError as e: await req.respond_error(new_fetch_body_not_found(str(e)))
       except ValidationError as e: await req.respond_error(new_fetch_body_bad_request(str(e)))
 
@@ -405,6 +473,51 @@ class TaskManager(Worker):
 
     await server.run()
 
+  def schedule_task(self, request: TMTaskScheduleRequest):
+    task_instance = TaskInstance(
+      id=uuid4(),
+      host_id=request.host_id,
+      topic_space_id=request.topic_space_id,
+      metadata={},
+      error=None,
+      status=TaskStatus.scheduled
+    )
+    self.tasks[task_instance.id] = task_instance
+    return task_instance
+
+  async def start_tasks(self, requests: list[TMTaskStartRequest]) -> list[TaskInstance]:
+    """starts scheduled tasks with one request per task host, the task hosts are asked in parallel."""
+    task_instances = [ self.tasks[request.id] for request in requests ]
+    if len(set(request.id for request in requests)) != len(requests): raise ValueError("A task can only be started once!")
+    host_requests: dict[str, list[TaskStartRequest]] = {}
+    for task_instance in task_instances:
+      self.task_hosts[task_instance.host_id] # NOTE: validate all requests before starting any task
+      if task_instance.status is not TaskStatus.scheduled: raise ValueError(f"The task {task_instance.id} was already started!")
+    for request, task_instance in zip(requests, task_instances):
+      task_instance.status = TaskStatus.running # NOTE: requests are handled concurrently, a concurrent request must not start the task again
+      host_requests.setdefault(task_instance.host_id, []).append(TaskStartRequest(
+        id=task_instance.id,
+        topic_space_id=task_instance.topic_space_id,
+        report_address=self.client.address,
+        config=request.config
+      ))
+
+    host_responses = await asyncio.gather(*(self._start_host_tasks(host_id, host_request) for host_id, host_request in host_requests.items()))
+    responses = { response.id: response for responses in host_responses for response in responses }
+    for task_instance in task_instances:
+      response = responses.get(task_instance.id, None)
+      task_instance.metadata = {} if response is None else response.metadata
+      task_instance.error = "The task host did not start the task!" if response is None else response.error
+      task_instance.status = TaskStatus.running if task_instance.error is None else TaskStatus.failed
+      if task_instance.status == TaskStatus.failed: self.tasks.pop(task_instance.id, None)
+    return task_instances
+
+  async def _start_host_tasks(self, host_id: str, requests: list[TaskStartRequest]) -> list[TaskStartResponse]:
+    try:
+      result = await self.client.fetch(self.task_hosts[host_id].address, TaskConstants.FD_TASKS_START, TaskStartRequestList.dump_python(requests))
+      return TaskStartResponseList.validate_python(result)
+    except (FetchError, ValidationError, KeyError) as e: return [ TaskStartResponse(id=request.id, error=str(e), metadata={}) for request in requests ]
+
 class TaskBroadcastReceiver(BroadcastReceiver[TaskInstance]):
   def transform_data(self, _: str, data: RawData) -> TaskInstance:
     return TaskInstance.model_validate(data.data)
@@ -438,9 +551,18 @@ class TaskManagerClient:
     result = await self.client.fetch(self.address_name, TaskConstants.FD_TM_TASK_START, TMTaskStartRequest(id=id, config=config).model_dump())
     return TaskInstance.model_validate(result)
   async def schedule_start_task(self, host_id: str, config: Any, topic_space_id: int | None = None):
-    task_instance = await self.schedule_task(host_id=host_id, topic_space_id=topic_space_id)
-    task_instance = await self.start_task(id=task_instance.id, config=config)
+    task_instance, = await self.schedule_start_tasks([ TMTaskScheduleStartRequest(host_id=host_id, config=config, topic_space_id=topic_space_id) ])
     return task_instance
+  async def schedule_tasks(self, requests: list[TMTaskScheduleRequest]):
+    result = await self.client.fetch(self.address_name, TaskConstants.FD_TM_TASKS_SCHEDULE, TMTaskScheduleRequestList.dump_python(requests))
+    return TaskInstanceList.validate_python(result)
+  async def start_tasks(self, requests: list[TMTaskStartRequest]):
+    result = await self.client.fetch(self.address_name, TaskConstants.FD_TM_TASKS_START, TMTaskStartRequestList.dump_python(requests))
+    return TaskInstanceList.validate_python(result)
+  async def schedule_start_tasks(self, requests: list[TMTaskScheduleStartRequest]):
+    """schedules and starts tasks in one request, the returned task instances report which tasks failed."""
+    result = await self.client.fetch(self.address_name, TaskConstants.FD_TM_TASKS_SCHEDULE_START, TMTaskScheduleStartRequestList.dump_python(requests))
+    return TaskInstanceList.validate_python(result)
   async def cancel_task(self, task_id: UUID4):
     await self.client.fetch(self.address_name, TaskConstants.FD_TM_TASK_CANCEL, TMTaskRequestBase(id=task_id).model_dump())
   async def cancel_task_wait(self, task_id: UUID4):
@@ -6,7 +6,7 @@ import logging
 import mimetypes
 import os
 import re
-from typing import Any, Literal
+from typing import Any, Literal, TypeVar
 from typing_extensions import TypedDict
 from uuid import UUID, uuid4
 from pydantic import UUID4, BaseModel, Field, TypeAdapter, field_serializer, field_validator
@@ -24,7 +24,7 @@ from streamtasks.net.serialization import RawData
 from streamtasks.net.utils import str_to_endpoint
 from streamtasks.pydanticdb import PydanticDB
 from streamtasks.services.constants import NetworkAddressNames
-from streamtasks.system.task import ModelWithStrId, TaskConstants, MetadataDict, MetadataFields, ModelWithId, TaskHostRegistration, TaskHostRegistrationList, TaskInstance, TaskManagerClient, TaskNotFoundError
+from streamtasks.system.task import ModelWithStrId, TaskConstants, MetadataDict, MetadataFields, ModelWithId, TaskHostRegistration, TaskHostRegistrationList, TaskInstance, TaskManagerClient, TaskNotFoundError, TMTaskScheduleRequest, TMTaskStartRequest
 from streamtasks.utils import get_node_name_id, make_json_serializable, wait_with_dependencies
 from streamtasks.worker import Worker
 import importlib.resources
@@ -130,67 +130,62 @@ class TaskWebPathHandler(Worker):
   @abstractmethod
   async def run_inner(self): pass
 
+TModel = TypeVar("TModel", bound=BaseModel)
+
+def extend_entry(model: type[TModel], entry: BaseModel) -> TModel:
+  """creates a model from a stored entry of a base model. The field values are shared with the entry, so only the new fields may be changed."""
+  return model.model_construct(_fields_set=entry.model_fields_set, **dict(entry))
+
 class TaskWebBackendStore:
   def __init__(self) -> None:
     self.running_deployments: dict[UUID4, RunningDeployment] = {}
 
     data_dir = get_data_sub_dir("user-data")
     self.deployments = PydanticDB(DeploymentBase, os.path.join(data_dir, "deployments.json"))
-    self.tasks = PydanticDB(StoredTask, os.path.join(data_dir, "tasks.json"))
-    self.dashboards = PydanticDB(DeploymentDashboard, os.path.join(data_dir, "dashboards.json"))
+    self.tasks = PydanticDB(StoredTask, os.path.join(data_dir, "tasks.json"), indexes=["deployment_id"])
+    self.dashboards = PydanticDB(DeploymentDashboard, os.path.join(data_dir, "dashboards.json"), indexes=["deployment_id"])
 
   def set_running_deployment(self, deployment: RunningDeployment): self.running_deployments[deployment.id] = deployment
   def get_running_deployment(self, deployment_id: UUID4): return self.running_deployments[deployment_id]
   def delete_running_deployment(self, deployment_id: UUID4): return self.running_deployments.pop(deployment_id)
 
-  async def all_dashboards(self) -> list[DeploymentDashboard]: return self.dashboards.entries
-  async def all_dashboards_in_deployment(self, deployment_id: UUID4) -> list[DeploymentDashboard]: return [ db for db in self.dashboards.entries if db.deployment_id == deployment_id ]
+  async def all_dashboards(self) -> list[DeploymentDashboard]: return list(self.dashboards.entries)
+  async def all_dashboards_in_deployment(self, deployment_id: UUID4) -> list[DeploymentDashboard]: return self.dashboards.find("deployment_id", deployment_id)
   async def get_dashboard(self, id: UUID4) -> DeploymentDashboard:
-    try: return next(d for d in self.dashboards.entries if d.id == id)
-    except StopIteration: raise ValueError("Invalid id!")
-  async def create_or_update_dashboard(self, db: DeploymentDashboard) -> DeploymentDashboard:
-    self.dashboards.update([d for d in self.dashboards.entries if d.id != db.id] + [db])
-    self.dashboards.save()
-  async def delete_dashboard(self, id: UUID4):
-    self.dashboards.update([d for d in self.dashboards.entries if d.id != id])
-    self.dashboards.save()
-
-  async def all_deployments(self) -> list[FullDeployment]: return [ self.deployment_apply_running(FullDeployment.model_validate(d.model_dump())) for d in self.deployments.entries ]
+    try: return self.dashboards.get(id)
+    except KeyError: raise ValueError("Invalid id!")
+  async def create_or_update_dashboard(self, db: DeploymentDashboard) -> DeploymentDashboard: self.dashboards.put(db)
+  async def delete_dashboard(self, id: UUID4): self.dashboards.delete(id)
+
+  async def all_deployments(self) -> list[FullDeployment]: return [ self.deployment_apply_running(extend_entry(FullDeployment, d)) for d in self.deployments.entries ]
   async def get_deployment(self, id: UUID4) -> FullDeployment:
-    try: return self.deployment_apply_running(FullDeployment.model_validate(next(d for d in self.deployments.entries if d.id == id).model_dump()))
-    except StopIteration: raise ValueError("Invalid id!")
+    try: return self.deployment_apply_running(extend_entry(FullDeployment, self.deployments.get(id)))
+    except KeyError: raise ValueError("Invalid id!")
   async def create_deployment(self, deployment: DeploymentBase):
-    if next((True for d in self.deployments.entries if d.id == deployment.id), None) is not None: raise ValueError("Deployment already exists!")
-    self.deployments.update(self.deployments.entries + [deployment])
-    self.deployments.save()
+    if deployment.id in self.deployments: raise ValueError("Deployment already exists!")
+    self.deployments.put(deployment)
   async def update_deployment(self, deployment: DeploymentBase):
     if deployment.id in self.running_deployments: raise ValueError("Deployment is running!")
-    if next((True for d in self.deployments.entries if d.id == deployment.id), None) is None: raise ValueError("Deployment does not exists!")
-    self.deployments.update([d for d in self.deployments.entries if d.id != deployment.id] + [deployment])
-    self.deployments.save()
+    if deployment.id not in self.deployments: raise ValueError("Deployment does not exists!")
+    self.deployments.put(deployment)
   async def delete_deployment(self, id: UUID4):
     if id in self.running_deployments: raise ValueError("Deployment is running!")
-    self.deployments.update([d for d in self.deployments.entries if d.id != id])
-    self.deployments.save()
+    self.deployments.delete(id)
 
-  async def all_tasks(self) -> list[FullTask]: return [self.task_apply_instance(FullTask.model_validate(v.model_dump())) for v in self.tasks.entries]
-  async def all_tasks_in_deployment(self, deployment_id: UUID4) -> list[FullTask]: return [ task for task in await self.all_tasks() if task.deployment_id == deployment_id ]
+  async def all_tasks(self) -> list[FullTask]: return [self.task_apply_instance(extend_entry(FullTask, v)) for v in self.tasks.entries]
+  async def all_tasks_in_deployment(self, deployment_id: UUID4) -> list[FullTask]:
+    return [ self.task_apply_instance(extend_entry(FullTask, v)) for v in self.tasks.find("deployment_id", deployment_id) ]
   async def get_task(self, id: UUID4) -> FullTask:
-    try: return self.task_apply_instance(FullTask.model_validate(next(t for t in self.tasks.entries if t.id == id).model_dump()))
-    except StopIteration: raise ValueError("Invalid id!")
+    try: return self.task_apply_instance(extend_entry(FullTask, self.tasks.get(id)))
+    except KeyError: raise ValueError("Invalid id!")
   async def create_or_update_task(self, task: StoredTask) -> StoredTask:
     if task.deployment_id in self.running_deployments: raise ValueError("Deployment is running!")
-    try:
-      existing_task = await self.get_task(task.id)
-      if existing_task.deployment_id in self.running_deployments: raise ValueError("Deployment is running!")
-      self.tasks.update([t for t in self.tasks.entries if t.id != task.id] + [task])
-    except: self.tasks.update(self.tasks.entries + [task])
-    self.tasks.save()
+    if task.id in self.tasks and self.tasks.get(task.id).deployment_id in self.running_deployments: raise ValueError("Deployment is running!")
+    self.tasks.put(task)
   async def delete_task(self, id: UUID4):
     task = await self.get_task(id)
     if task.deployment_id in self.running_deployments: raise ValueError("Deployment is running!")
-    self.tasks.update([t for t in self.tasks.entries if t.id != id])
-    self.tasks.save()
+    self.tasks.delete(id)
 
   def deployment_apply_running(self, deployment: FullDeployment):
     if (running_deployment := self.running_deployments.get(deployment.id, None)) is not None: deployment.status = "running" if running_deployment.started else "scheduled"
@@ -225,7 +220,7 @@ class TaskWebBackend(Worker):
       await self.shutdown()
 
   async def run_fetch_api(self):
-    server = FetchServer(self.client)
+    server = FetchServer(self.client, max_concurrency=32)
 
     @server.route(TaskConstants.FD_TMW_REGISTER_PATH)
     async def _(req: FetchRequest):
@@ -274,11 +269,10 @@ class TaskWebBackend(Worker):
       running_deployment = RunningDeployment(id=deployment_id, topic_space_id=topic_space_id, task_instances={}, task_instance_configs={})
       self.store.set_running_deployment(running_deployment)
 
-      async def schedule_task(task: FullTask):
-        task_instance = await self.tm_client.schedule_task(task.task_host_id, topic_space_id)
+      task_instances = await self.tm_client.schedule_tasks([ TMTaskScheduleRequest(host_id=task.task_host_id, topic_space_id=topic_space_id) for task in tasks ])
+      for task, task_instance in zip(tasks, task_instances):
         running_deployment.task_instances[task.id] = task_instance
         running_deployment.task_instance_configs[task_instance.id] = task.config
-      await asyncio.gather(*(schedule_task(task) for task in tasks))
 
       self.deployment_task_listeners[deployment_id] = asyncio.create_task(self.run_deployment_task_listener(running_deployment))
       await ctx.respond_json_string((await self.store.get_deployment(deployment_id)).model_dump_json())
@@ -289,12 +283,15 @@ class TaskWebBackend(Worker):
       deployment_id = UUID(ctx.params.get("id", ""))
       running_deployment = self.store.get_running_deployment(deployment_id)
 
-      async def start_task(task_id: UUID, task_instance: TaskInstance):
-        new_task_instance = await self.tm_client.start_task(task_instance.id, running_deployment.task_instance_configs.get(task_instance.id, None))
-        running_deployment.task_instances[task_id] = new_task_instance
-      await asyncio.gather(*(start_task(task_id, task_instance) for (task_id, task_instance) in running_deployment.task_instances.items()))
+      task_ids = list(running_deployment.task_instances.keys())
+      task_instances = await self.tm_client.start_tasks([
+        TMTaskStartRequest(id=task_instance.id, config=running_deployment.task_instance_configs.get(task_instance.id, None))
+        for task_instance in running_deployment.task_instances.values()
+      ])
+      running_deployment.task_instances.update(zip(task_ids, task_instances))
 
       running_deployment.task_instance_configs = None
+      running_deployment.started = True
       await ctx.respond_json_string((await self.store.get_deployment(deployment_id)).model_dump_json())
 
     @router.post("/api/deployment/{id}/stop")
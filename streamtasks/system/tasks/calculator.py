@@ -9,7 +9,7 @@ from streamtasks.message.types import NumberMessage
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.task import Task, TaskHost
 from pydantic import BaseModel, ValidationError, model_validator
-from typing import Any
+from typing import Any, Callable, Iterable
 import math
 from lark import Lark, ParseTree, Transformer
 import re
@@ -132,6 +132,71 @@ class CalculatorEvalTransformer(Transformer):
   def eq(self, args): return 1.0 if args[0] == args[1] else 0.0
   def ne(self, args): return 1.0 if args[0] != args[1] else 0.0
   def inline_if(self, args): return args[1] if args[0] > 0.5 else args[2]
+  # NOTE: rules named after python keywords (not, and, or) are handled by the methods with a trailing underscore
+  def __default__(self, data, children, meta): return getattr(self, f"{data}_")(children)
+
+
+# compiles the parse tree to the source of a python expression, evaluated with the variables in "v"
+# NOTE: only numbers and validated names from the grammar end up in the source
+
+def float_to_source(value: float):
+  # NOTE: repr gives inf and nan for non-finite floats, which are not defined without builtins. 1e309 overflows to inf.
+  if math.isnan(value): return "(1e309 - 1e309)"
+  if math.isinf(value): return "1e309" if value > 0 else "(-1e309)"
+  return repr(value)
+
+
+class CalculatorCompiler(Transformer):
+  def __init__(self):
+    super().__init__()
+    self.func_names: set[str] = set()
+
+  def start(self, args): return args[0]
+  def number(self, args): return float_to_source(float(args[0]))
+  def variable(self, args):
+    name = str(args[0])
+    if name in CalculatorEvalContext.default_input_map: return float_to_source(CalculatorEvalContext.default_input_map[name])
+    return f"v[{name!r}]"
+  def neg(self, args): return f"(-{args[0]})"
+  def pos(self, args): return args[0]
+  def not_(self, args): return f"(0.0 if {args[0]} > 0.5 else 1.0)"
+  def group(self, args): return args[0]
+  def func(self, args):
+    name = str(args[0])
+    if re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", name) is None: raise ValueError(f"Invalid function name: {name}")
+    self.func_names.add(name)
+    return f"f_{name}({', '.join(arg for arg in args[1:] if arg is not None)})"
+  def add(self, args): return f"({args[0]} + {args[1]})"
+  def sub(self, args): return f"({args[0]} - {args[1]})"
+  def mul(self, args): return f"({args[0]} * {args[1]})"
+  def div(self, args): return f"({args[0]} / {args[1]})"
+  def mod(self, args): return f"({args[0]} % {args[1]})"
+  def pow(self, args): return f"({args[0]} ** {args[1]})"
+  def and_(self, args): return f"(1.0 if {args[0]} > 0.5 and {args[1]} > 0.5 else 0.0)"
+  def or_(self, args): return f"(1.0 if {args[0]} > 0.5 or {args[1]} > 0.5 else 0.0)"
+  def xor(self, args): return f"(1.0 if {args[0]} > 0.5 != {args[1]} > 0.5 else 0.0)"
+  def gt(self, args): return f"(1.0 if {args[0]} > {args[1]} else 0.0)"
+  def lt(self, args): return f"(1.0 if {args[0]} < {args[1]} else 0.0)"
+  def ge(self, args): return f"(1.0 if {args[0]} >= {args[1]} else 0.0)"
+  def le(self, args): return f"(1.0 if {args[0]} <= {args[1]} else 0.0)"
+  def eq(self, args): return f"(1.0 if {args[0]} == {args[1]} else 0.0)"
+  def ne(self, args): return f"(1.0 if {args[0]} != {args[1]} else 0.0)"
+  def inline_if(self, args): return f"({args[1]} if {args[0]} > 0.5 else {args[2]})"
+  def __default__(self, data, children, meta): return getattr(self, f"{data}_")(children)
+
+
+class CalculatorExpression:
+  def __init__(self, ast: ParseTree):
+    compiler = CalculatorCompiler()
+    source = compiler.transform(ast)
+    context = CalculatorEvalContext({})
+    namespace = { "__builtins__": {}, **{ f"f_{name}": getattr(context, name) for name in compiler.func_names } }
+    self._func: Callable[[dict[str, float]], float] = eval(compile(f"lambda v: {source}", "<calculator>", "eval"), namespace)
+
+  def evaluate(self, values: dict[str, float]) -> float: return self._func(values)
+  def evaluate_batch(self, values: Iterable[dict[str, float]]) -> list[float]:
+    func = self._func
+    return [ func(v) for v in values ]
 
 
 class CalculatorNameExtractor(Transformer):
@@ -193,7 +258,7 @@ class CalculatorConfig(CalculatorConfigBase):
 class CalculatorTask(Task):
   def __init__(self, client: Client, config: CalculatorConfig):
     super().__init__(client)
-    self.formula_ast = config.formula_ast
+    self.expression = CalculatorExpression(config.formula_ast)
     self.out_topic = self.client.out_topic(config.out_topic)
     self.var_values = { input_var.name: input_var.default_value for input_var in config.variable_tracks }
 
@@ -236,7 +301,7 @@ class CalculatorTask(Task):
         except ValidationError: pass
 
   async def send_value(self, timestamp: int):
-    result: float = CalculatorEvalTransformer(CalculatorEvalContext(self.var_values)).transform(self.formula_ast)
+    result = self.expression.evaluate(self.var_values)
     await self.out_topic.send(RawData(NumberMessage(timestamp=timestamp,value=result).model_dump()))
 
 class CalculatorTaskHost(TaskHost):
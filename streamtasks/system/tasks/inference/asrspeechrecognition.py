@@ -1,11 +1,11 @@
 from contextlib import asynccontextmanager
-import queue
 from typing import Any
 from pydantic import BaseModel, ValidationError
 from streamtasks.media.audio import audio_buffer_to_ndarray
 from streamtasks.media.util import AudioChunker
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TextMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.configurators import EditorFields, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
@@ -15,7 +15,7 @@ from speechbrain.utils.dynamic_chunk_training import DynChunkTrainConfig
 import torch
 
 from streamtasks.system.tasks.inference.utils import get_model_data_dir
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 
 _SAMPLE_RATE = 16000
 
@@ -35,7 +35,7 @@ class ASRSpeechRecognitionTask(SyncTask):
     self.in_topic = self.client.in_topic(config.in_topic)
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TimestampChuckMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -48,7 +48,7 @@ class ASRSpeechRecognitionTask(SyncTask):
       try:
         data = await self.in_topic.recv_data_control()
         if isinstance(data, TopicControlData): await self.out_topic.set_paused(data.paused)
-        else: self.message_queue.put(TimestampChuckMessage.model_validate(data.data))
+        else: self.message_queue.put(TimestampChuckMessageCodec.decode(data.data))
       except (ValidationError, ValueError): pass
 
   def run_sync(self):
@@ -59,14 +59,11 @@ class ASRSpeechRecognitionTask(SyncTask):
       streaming_context = model.make_streaming_context(DynChunkTrainConfig(chunk_size=self.config.chunk_size, left_context_size=self.config.left_context_size))
       chunker = AudioChunker(self.config.chunk_size * 320, _SAMPLE_RATE) # BUG: this is to prevent an assertion error in speechbrain about the chunk size
 
-      while not self.stop_event.is_set():
-        try:
-          message = self.message_queue.get(timeout=0.5)
-          for chunk, timestamp in chunker.next(audio_buffer_to_ndarray(message.data, "flt")[0], message.timestamp):
-            samples = torch.from_numpy(chunk.reshape((1, -1)).copy())
-            result: list[str] = model.transcribe_chunk(streaming_context, samples)
-            if len(result[0]) > 0: self.send_data(self.out_topic, RawData(TextMessage(timestamp=timestamp, value=result[0].lower()).model_dump()))
-        except queue.Empty: pass
+      for message in self.message_queue:
+        for chunk, timestamp in chunker.next(audio_buffer_to_ndarray(message.data, "flt")[0], message.timestamp):
+          samples = torch.from_numpy(chunk.reshape((1, -1)).copy())
+          result: list[str] = model.transcribe_chunk(streaming_context, samples)
+          if len(result[0]) > 0: self.send_data(self.out_topic, RawData(TextMessage(timestamp=timestamp, value=result[0].lower()).model_dump()))
     finally:
       if model: del model
 
@@ -1,11 +1,11 @@
 from contextlib import asynccontextmanager
-import queue
 import re
 from typing import Any
 import numpy as np
 from pydantic import BaseModel, ValidationError
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TextMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.configurators import EditorFields, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
@@ -13,7 +13,7 @@ from streamtasks.client import Client
 from speechbrain.inference.TTS import FastSpeech2
 from speechbrain.inference.vocoders import HIFIGAN
 from streamtasks.system.tasks.inference.utils import get_model_data_dir
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 
 _REGEX_SENTENCE_ENDINGS = re.compile(r'[.!?]\s+')
 
@@ -52,7 +52,7 @@ class FastSpeech2TTSTask(SyncTask):
     self.in_topic = self.client.in_topic(config.in_topic)
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
-    self.message_queue: queue.Queue[TextMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TextMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -74,16 +74,15 @@ class FastSpeech2TTSTask(SyncTask):
     fastspeech2 = FastSpeech2.from_hparams(self.config.source, savedir=get_model_data_dir(self.config.source), run_opts={ "device":self.config.device })
     if fastspeech2 is None: raise FileNotFoundError("Did not find FastSpeech2!")
 
-    while not self.stop_event.is_set():
+    for message in self.message_queue:
       try:
-        message = self.message_queue.get(timeout=0.5)
         current_timestamp = message.timestamp
         for sentence in split_sentences(message.value, 200):
           mel_output, _, _, _ = fastspeech2.encode_text([sentence], pace=self.config.pace, pitch_rate=self.config.pitch, energy_rate=1.0)
           samples: np.ndarray = hifi_gan.decode_batch(mel_output).cpu().numpy().flatten()
-          self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=message.timestamp, data=samples.tobytes("C")).model_dump()))
+          self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=message.timestamp, data=samples.tobytes("C")))))
           current_timestamp += samples.size * 1000 / _SAMPLE_RATE
-      except (queue.Empty, RuntimeError): pass
+      except RuntimeError: pass
 
 class FastSpeech2TTSTaskHost(TaskHost):
   @property
@@ -1,6 +1,5 @@
 from contextlib import asynccontextmanager
 import logging
-import queue
 from typing import Any
 from pydantic import BaseModel, ValidationError
 from streamtasks.net.serialization import RawData
@@ -9,7 +8,7 @@ from streamtasks.net.messages import TopicControlData
 from streamtasks.system.configurators import EditorFields, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 from llama_cpp import ChatCompletionRequestMessage, Llama
 
 class LLamaCppChatConfigBase(BaseModel):
@@ -29,7 +28,7 @@ class LLamaCppChatTask(SyncTask):
     self.in_topic = self.client.in_topic(config.in_topic)
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
-    self.message_queue: queue.Queue[TextMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TextMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -51,29 +50,26 @@ class LLamaCppChatTask(SyncTask):
     if self.config.system_message: messages.append({ "role": "system", "content": self.config.system_message })
     messages_start_index = len(messages)
 
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=0.5)
-        messages.append({ "role": "user", "content": message.value })
+    for message in self.message_queue:
+      messages.append({ "role": "user", "content": message.value })
 
-        while True:
-          end_of_context = False
-          result = None
-          try:
-            result = model.create_chat_completion(messages, max_tokens=self.config.max_tokens or None)
-            end_of_context = result["usage"]["total_tokens"] == model.n_ctx()
-          except ValueError: end_of_context = True
+      while True:
+        end_of_context = False
+        result = None
+        try:
+          result = model.create_chat_completion(messages, max_tokens=self.config.max_tokens or None)
+          end_of_context = result["usage"]["total_tokens"] == model.n_ctx()
+        except ValueError: end_of_context = True
 
-          if end_of_context and len(messages) > (messages_start_index + 1):
-            messages.pop(messages_start_index)
-            logging.info("llama.cpp: Removed message from context, to make room for more.")
-          elif result is not None:
-            amessage = result["choices"][0]["message"]
-            messages.append(amessage)
-            self.send_data(self.out_topic, RawData(TextMessage(timestamp=message.timestamp, value=amessage["content"]).model_dump()))
-            break
-          else: raise ValueError("Failed to create response.")
-      except queue.Empty: pass
+        if end_of_context and len(messages) > (messages_start_index + 1):
+          messages.pop(messages_start_index)
+          logging.info("llama.cpp: Removed message from context, to make room for more.")
+        elif result is not None:
+          amessage = result["choices"][0]["message"]
+          messages.append(amessage)
+          self.send_data(self.out_topic, RawData(TextMessage(timestamp=message.timestamp, value=amessage["content"]).model_dump()))
+          break
+        else: raise ValueError("Failed to create response.")
 
 class LLamaCppChatTaskHost(TaskHost):
   @property
@@ -1,5 +1,4 @@
 from contextlib import asynccontextmanager
-import queue
 from typing import Any
 import numpy as np
 from pydantic import BaseModel, ValidationError
@@ -7,11 +6,12 @@ from streamtasks.media.audio import audio_buffer_to_ndarray
 from streamtasks.media.util import AudioSmoother, PaddedAudioChunker
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.configurators import EditorFields, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.system.tasks.inference.utils import get_model_data_dir
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 from streamtasks.client import Client
 from speechbrain.inference.enhancement import WaveformEnhancement
 import torch
@@ -39,7 +39,7 @@ class WaveformSpeechEnhancementTask(SyncTask):
     self.in_topic = self.client.in_topic(config.in_topic)
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TimestampChuckMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -52,7 +52,7 @@ class WaveformSpeechEnhancementTask(SyncTask):
       try:
         data = await self.in_topic.recv_data_control()
         if isinstance(data, TopicControlData): await self.out_topic.set_paused(data.paused)
-        else: self.message_queue.put(TimestampChuckMessage.model_validate(data.data))
+        else: self.message_queue.put(TimestampChuckMessageCodec.decode(data.data))
       except (ValidationError, ValueError): pass
 
   def run_sync(self):
@@ -61,16 +61,13 @@ class WaveformSpeechEnhancementTask(SyncTask):
     chunker = PaddedAudioChunker(self.config.buffer_size, _SAMPLE_RATE, self.config.buffer_padding)
     decracker = AudioSmoother(self.config.buffer_padding * 2)
 
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=0.5)
-        for chunk, timestamp in chunker.next(audio_buffer_to_ndarray(message.data, "flt")[0], message.timestamp):
-          samples = torch.from_numpy(chunk.reshape((1, -1)).copy())
-          result: torch.Tensor = model.enhance_batch(samples, torch.tensor([1.])).flatten()
-          result = result * (np.abs(chunk).mean() / result.abs().mean().item()) # scale to prevent volume changes
-          out_samples: np.ndarray = chunker.strip_padding(decracker.smooth(result.cpu().numpy()))
-          self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=timestamp, data=out_samples.tobytes("C")).model_dump()))
-      except queue.Empty: pass
+    for message in self.message_queue:
+      for chunk, timestamp in chunker.next(audio_buffer_to_ndarray(message.data, "flt")[0], message.timestamp):
+        samples = torch.from_numpy(chunk.reshape((1, -1)).copy())
+        result: torch.Tensor = model.enhance_batch(samples, torch.tensor([1.])).flatten()
+        result = result * (np.abs(chunk).mean() / result.abs().mean().item()) # scale to prevent volume changes
+        out_samples: np.ndarray = chunker.strip_padding(decracker.smooth(result.cpu().numpy()))
+        self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=timestamp, data=out_samples.tobytes("C")))))
 
 class WaveformSpeechEnhancementTaskHost(TaskHost):
   @property
@@ -5,7 +5,8 @@ from streamtasks.env import DEBUG_MEDIA
 from streamtasks.media.audio import AudioCodecInfo, AudioFrame
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
-from streamtasks.media.packet import MediaMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
+from streamtasks.media.packet import MediaMessageCodec
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import Task, TaskHost
 from streamtasks.client import Client
@@ -47,13 +48,13 @@ class AudioDecoderTask(Task):
         while True:
           try:
             data = await self.in_topic.recv_data()
-            message = MediaMessage.model_validate(data.data)
+            message = MediaMessageCodec.decode(data.data)
             if self.t0 is None: self.t0 = message.timestamp - int(message.packet.dts * self.time_base * 1000)
             frames: list[AudioFrame] = await self.decoder.decode(message.packet)
             frames = await self.resampler.reformat_all(frames)
             for frame in frames: # TODO: endianness
               if DEBUG_MEDIA(): ddebug_value("decoder dtime", float(frame.dtime))
-              await self.out_topic.send(RawData(TimestampChuckMessage(timestamp=self.t0 + int(frame.dtime * 1000), data=frame.to_ndarray().tobytes("C")).model_dump()))
+              await self.out_topic.send(RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=self.t0 + int(frame.dtime * 1000), data=frame.to_ndarray().tobytes("C")))))
           except ValidationError: pass
     finally:
       self.decoder.close()
@@ -1,17 +1,17 @@
 from contextlib import asynccontextmanager
 from fractions import Fraction
-import queue
 from typing import Any
 from pydantic import BaseModel, ValidationError
 from streamtasks.media.audio import AudioCodecInfo, AudioFrame
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
-from streamtasks.media.packet import MediaMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
+from streamtasks.media.packet import MediaMessage, MediaMessageCodec
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
-from streamtasks.utils import context_task, hertz_to_fintervall
+from streamtasks.utils import FlowControlPolicy, SyncQueue, context_task, hertz_to_fintervall
 
 class AudioEncoderConfigBase(BaseModel):
   in_sample_format: IOTypes.SampleFormat = "s16"
@@ -21,6 +21,7 @@ class AudioEncoderConfigBase(BaseModel):
   codec: IOTypes.CodecName = "aac"
   rate: IOTypes.SampleRate = 32000
   codec_options: dict[str, str] = {}
+  max_queued_frames: int = 0 # NOTE: 0 keeps every frame, otherwise the oldest frames are dropped, which leaves gaps in the encoded audio
 
 class AudioEncoderConfig(AudioEncoderConfigBase):
   out_topic: int
@@ -30,7 +31,8 @@ class AudioEncoderTask(SyncTask):
   def __init__(self, client: Client, config: AudioEncoderConfig):
     super().__init__(client)
     self.out_topic = self.client.out_topic(config.out_topic)
-    self.in_topic = self.client.in_topic(config.in_topic)
+    in_policy = FlowControlPolicy.DROP_OLDEST if config.max_queued_frames > 0 else FlowControlPolicy.BLOCK
+    self.in_topic = self.client.in_topic(config.in_topic, max_size=config.max_queued_frames, policy=in_policy)
     self.config = config
 
     self.time_base = hertz_to_fintervall(config.rate)
@@ -39,7 +41,7 @@ class AudioEncoderTask(SyncTask):
     codec_info = AudioCodecInfo(codec=config.encoder, sample_rate=config.rate, sample_format=config.out_sample_format, channels=config.channels, options=config.codec_options)
     self.encoder = codec_info.get_encoder()
 
-    self.frame_data_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.frame_data_queue: SyncQueue[TimestampChuckMessage] = self.create_queue(config.max_queued_frames)
 
   @asynccontextmanager
   async def init(self):
@@ -54,22 +56,17 @@ class AudioEncoderTask(SyncTask):
     while True:
       try:
         data = await self.in_topic.recv_data()
-        self.frame_data_queue.put(TimestampChuckMessage.model_validate(data.data))
+        self.frame_data_queue.put(TimestampChuckMessageCodec.decode(data.data))
       except ValidationError: pass
 
   def run_sync(self):
-    timeout = 0.5
-    while not self.stop_event.is_set():
-      try:
-        message = self.frame_data_queue.get(timeout=timeout)
-        if self.t0 is None: self.t0 = message.timestamp
-        frame = AudioFrame.from_buffer(message.data, self.config.in_sample_format, self.config.channels, self.config.rate)
-        frame.set_ts(Fraction(message.timestamp - self.t0, 1000), self.time_base)
-        packets = self.encoder.encode_sync(frame)
-        for packet in packets:
-          self.send_data(self.out_topic, RawData(MediaMessage(timestamp=int(self.t0 + packet.dts * self.time_base * 1000), packet=packet).model_dump()))
-        self.frame_data_queue.task_done()
-      except queue.Empty: pass
+    for message in self.frame_data_queue:
+      if self.t0 is None: self.t0 = message.timestamp
+      frame = AudioFrame.from_buffer(message.data, self.config.in_sample_format, self.config.channels, self.config.rate)
+      frame.set_ts(Fraction(message.timestamp - self.t0, 1000), self.time_base)
+      packets = self.encoder.encode_sync(frame)
+      for packet in packets:
+        self.send_data(self.out_topic, RawData(MediaMessageCodec.encode(MediaMessage(timestamp=int(self.t0 + packet.dts * self.time_base * 1000), packet=packet))))
 
 class AudioEncoderTaskHost(TaskHost):
   @property
@@ -87,6 +84,7 @@ class AudioEncoderTaskHost(TaskHost):
       MediaEditorFields.channel_count(),
       MediaEditorFields.sample_rate(),
       EditorFields.options("codec_options"),
+      EditorFields.integer("max_queued_frames", min_value=0),
     ]
   )
   async def create_task(self, config: Any, topic_space_id: int | None):
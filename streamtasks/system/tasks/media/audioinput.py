@@ -5,6 +5,7 @@ from streamtasks.asgiserver import ASGIRouter, HTTPContext, http_context_handler
 from streamtasks.media.audio import get_audio_bytes_per_time_sample
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
@@ -53,7 +54,7 @@ class AudioInputTask(SyncTask):
       timestamp = max(get_timestamp_ms(), min_next_timestamp)
       frame_duration = len(data) * 1000 // self.bytes_per_second
       min_next_timestamp = timestamp + frame_duration
-      self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=timestamp, data=data).model_dump()))
+      self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=timestamp, data=data))))
 
     stream.close()
 
@@ -12,6 +12,7 @@ from streamtasks.media.audio import audio_buffer_to_ndarray
 from streamtasks.media.util import AudioSequencer, list_sample_formats
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import EditorFields, IOTypes, multitrackio_configurator, static_configurator
@@ -85,7 +86,7 @@ class AudioMixerTask(Task):
           t0 = None
           sample_count = 0
         else:
-          message = TimestampChuckMessage.model_validate(data.data)
+          message = TimestampChuckMessageCodec.decode(data.data)
           samples = audio_buffer_to_ndarray(message.data, self.config.sample_format)[0].reshape((-1, self.config.channels))
           if t0 is None: t0 = message.timestamp - 1
           sample_count += samples.shape[0]
@@ -117,7 +118,7 @@ class AudioMixerTask(Task):
       if track.is_paused: track.sequencer.reset()
 
     if result.size != 0:
-      await self.out_topic.send(RawData(TimestampChuckMessage(timestamp=round(target_time * 1000), data=result.tobytes("C")).model_dump()))
+      await self.out_topic.send(RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=round(target_time * 1000), data=result.tobytes("C")))))
 
 class AudioMixerTaskHost(TaskHost):
   @property
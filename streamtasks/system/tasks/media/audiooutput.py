@@ -1,9 +1,9 @@
 from contextlib import asynccontextmanager
-import queue
 from typing import Any
 from pydantic import BaseModel, ValidationError
 from streamtasks.asgiserver import ASGIRouter, HTTPContext, http_context_handler
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
@@ -11,7 +11,7 @@ from streamtasks.system.tasks.media.pa_utils import SAMPLE_FORMAT_2_PA_TYPE
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 import sounddevice
 
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 
 class AudioOutputConfigBase(BaseModel):
   sample_format: IOTypes.SampleFormat = "s16"
@@ -28,7 +28,7 @@ class AudioOutputTask(SyncTask):
     super().__init__(client)
     self.in_topic = self.client.in_topic(config.in_topic)
     self.config = config
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TimestampChuckMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -40,7 +40,7 @@ class AudioOutputTask(SyncTask):
     while True:
       try:
         data = await self.in_topic.recv_data()
-        self.message_queue.put(TimestampChuckMessage.model_validate(data.data))
+        self.message_queue.put(TimestampChuckMessageCodec.decode(data.data))
       except ValidationError: pass
 
   def run_sync(self):
@@ -53,11 +53,8 @@ class AudioOutputTask(SyncTask):
       dtype=SAMPLE_FORMAT_2_PA_TYPE[self.config.sample_format])
     stream.start()
     try:
-      while not self.stop_event.is_set():
-        try:
-          message = self.message_queue.get(timeout=0.5)
-          stream.write(message.data)
-        except queue.Empty: pass
+      for message in self.message_queue:
+        stream.write(message.data)
     finally: stream.close()
 
 class AudioOutputTaskHost(TaskHost):
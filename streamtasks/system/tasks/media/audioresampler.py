@@ -4,6 +4,7 @@ from pydantic import BaseModel, ValidationError
 from streamtasks.media.audio import AudioFrame, AudioResampler, AudioResamplerInfo
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import IOTypes, static_configurator
@@ -43,12 +44,12 @@ class AudioResamplerTask(Task):
           data = await self.in_topic.recv_data_control()
           if isinstance(data, TopicControlData): await self.out_topic.set_paused(data.paused)
           else:
-            message = TimestampChuckMessage.model_validate(data.data)
+            message = TimestampChuckMessageCodec.decode(data.data)
             if t0 is None: t0 = message.timestamp
             frame = AudioFrame.from_buffer(message.data, self.config.in_sample_format, self.config.in_channels, self.config.in_rate)
             frame.set_ts(Fraction(message.timestamp - t0, 1000), Fraction(1, self.config.in_rate))
             for nframe in await self.resampler.reformat(frame):
-              await self.out_topic.send(RawData(TimestampChuckMessage(timestamp=int(nframe.dtime * 1000) + t0, data=nframe.to_bytes()).model_dump()))
+              await self.out_topic.send(RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=int(nframe.dtime * 1000) + t0, data=nframe.to_bytes()))))
         except (ValidationError, ValueError): pass
 
 class AudioResamplerTaskHost(TaskHost):
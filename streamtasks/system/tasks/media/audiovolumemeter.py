@@ -1,18 +1,18 @@
 from contextlib import asynccontextmanager
-import queue
 from typing import Any
 from pydantic import BaseModel, ValidationError
 from streamtasks.media.audio import audio_buffer_to_ndarray, sample_format_to_dtype
 from streamtasks.media.util import AudioChunker
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import NumberMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
 import numpy as np
-from streamtasks.utils import TimeSynchronizer, context_task
+from streamtasks.utils import SyncQueue, TimeSynchronizer, context_task
 
 class AudioVolumeMeterConfigBase(BaseModel):
   sample_format: IOTypes.SampleFormat = "s16"
@@ -36,7 +36,7 @@ class AudioVolumeMeterTask(SyncTask):
     self.config = config
     sample_dtype = sample_format_to_dtype(self.config.sample_format)
     self.max_value = float(max_dtype_value(sample_dtype))
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TimestampChuckMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -53,19 +53,16 @@ class AudioVolumeMeterTask(SyncTask):
           if data.paused: await self.out_topic.send(RawData(NumberMessage(timestamp=sync.time, value=0).model_dump()))
           await self.out_topic.set_paused(data.paused)
         else:
-          message = TimestampChuckMessage.model_validate(data.data)
+          message = TimestampChuckMessageCodec.decode(data.data)
           sync.update(message.timestamp)
           self.message_queue.put(message)
       except (ValidationError, ValueError): pass
 
   def run_sync(self):
     chunker = AudioChunker(self.config.rate * self.config.time_window // 1000, self.config.rate)
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=0.5)
-        for chunk, timestamp in chunker.next(audio_buffer_to_ndarray(message.data, self.config.sample_format)[0], message.timestamp):
-          self.send_data(self.out_topic, RawData(NumberMessage(timestamp=timestamp, value=np.sqrt(np.mean(np.abs(chunk) / self.max_value))).model_dump()))
-      except queue.Empty: pass
+    for message in self.message_queue:
+      for chunk, timestamp in chunker.next(audio_buffer_to_ndarray(message.data, self.config.sample_format)[0], message.timestamp):
+        self.send_data(self.out_topic, RawData(NumberMessage(timestamp=timestamp, value=np.sqrt(np.mean(np.abs(chunk) / self.max_value))).model_dump()))
 
 class AudioVolumeMeterTaskHost(TaskHost):
   @property
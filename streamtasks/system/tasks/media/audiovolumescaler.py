@@ -1,5 +1,4 @@
 from contextlib import AsyncExitStack, asynccontextmanager
-import queue
 from typing import Any
 import numpy as np
 from pydantic import BaseModel, ValidationError
@@ -7,12 +6,13 @@ from streamtasks.client.topic import SequentialInTopicSynchronizer
 from streamtasks.media.audio import audio_buffer_to_samples, sample_format_to_dtype
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import NumberMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 
 def get_dtype_min_max(dtype: np.dtype):
   if np.issubdtype(dtype, np.integer):
@@ -46,7 +46,7 @@ class AudioVolumeScalerTask(SyncTask):
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
     self.scale = config.default_scale
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TimestampChuckMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -69,13 +69,10 @@ class AudioVolumeScalerTask(SyncTask):
     samples_dtype = sample_format_to_dtype(self.config.sample_format)
     samples_dtype_min_max = get_dtype_min_max(samples_dtype)
 
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=0.5)
-        samples = audio_buffer_to_samples(message.data, sample_format=self.config.sample_format, channels=self.config.channels)
-        samples = np.clip(samples * self.scale, samples_dtype_min_max[0], samples_dtype_min_max[1]).astype(samples_dtype)
-        self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=message.timestamp, data=samples.tobytes("C")).model_dump()))
-      except queue.Empty: pass
+    for message in self.message_queue:
+      samples = audio_buffer_to_samples(message.data, sample_format=self.config.sample_format, channels=self.config.channels)
+      samples = np.clip(samples * self.scale, samples_dtype_min_max[0], samples_dtype_min_max[1]).astype(samples_dtype)
+      self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=message.timestamp, data=samples.tobytes("C")))))
 
   async def _run_recv_scale(self):
     while True:
@@ -93,7 +90,7 @@ class AudioVolumeScalerTask(SyncTask):
       try:
         data = await self.in_topic.recv_data_control()
         if isinstance(data, TopicControlData): await self.out_topic.set_paused(data.paused)
-        else: self.message_queue.put(TimestampChuckMessage.model_validate(data.data))
+        else: self.message_queue.put(TimestampChuckMessageCodec.decode(data.data))
       except (ValidationError, ValueError): pass
 
 class AudioVolumeScalerTaskHost(TaskHost):
@@ -5,6 +5,7 @@ from typing import Any
 from pydantic import BaseModel, field_validator
 from streamtasks.media.util import list_pil_pixel_formats, pixel_format_to_pil_mode
 from streamtasks.message.types import TextMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.serialization import RawData
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import Task, TaskHost
@@ -41,7 +42,7 @@ class ImageRendererTask(Task):
     async with self.out_topic, self.out_topic.RegisterContext():
       self.client.start()
       while True:
-        await self.out_topic.send(RawData(TimestampChuckMessage(timestamp=get_timestamp_ms(), data=img_data).model_dump()))
+        await self.out_topic.send(RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=get_timestamp_ms(), data=img_data))))
         await asyncio.sleep(self.config.repeat_interval)
 
   def load_image_data(self):
@@ -9,7 +9,7 @@ from streamtasks.media.container import AVInputStream, InputContainer
 from streamtasks.media.video import VideoCodecInfo
 from streamtasks.net.serialization import RawData
 from streamtasks.system.configurators import EditorFields, IOTypes, multitrackio_configurator, static_configurator
-from streamtasks.media.packet import MediaMessage
+from streamtasks.media.packet import MediaMessage, MediaMessageCodec
 from streamtasks.system.secret_manager import SecretManagerClient
 from streamtasks.system.task import Task, TaskHost
 from streamtasks.client import Client
@@ -76,7 +76,7 @@ class InputContainerTask(Task):
             if self.config.real_time:
               current_timestamp = get_timestamp_ms()
               await asyncio.sleep(max(0, (timestamp - current_timestamp - offset) / 1000))
-            await out_topic.send(RawData(MediaMessage(timestamp=timestamp, packet=packet).model_dump()))
+            await out_topic.send(RawData(MediaMessageCodec.encode(MediaMessage(timestamp=timestamp, packet=packet))))
             offset += get_timestamp_ms() - timestamp
     except EOFError: pass
 
@@ -1,7 +1,7 @@
 from typing import Any
 from pydantic import ValidationError
 from streamtasks.client.topic import InTopic
-from streamtasks.media.packet import MediaMessage
+from streamtasks.media.packet import MediaMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.task import TaskHost
 from streamtasks.client import Client
@@ -20,7 +20,7 @@ class MediaSwitchTask(SwitchTask):
         if not isinstance(data, TopicControlData):
           if idx != self._active_index:
             try:
-              message = MediaMessage.model_validate(data.data)
+              message = MediaMessageCodec.decode(data.data)
               if message.packet.is_keyframe: self._active_index = idx
             except ValidationError: pass
           if idx == self._active_index:
@@ -9,7 +9,7 @@ from streamtasks.media.audio import AudioCodecInfo
 from streamtasks.media.container import AVOutputStream, OutputContainer
 from streamtasks.media.video import VideoCodecInfo
 from streamtasks.system.configurators import EditorFields, IOTypes, multitrackio_configurator, static_configurator
-from streamtasks.media.packet import MediaMessage
+from streamtasks.media.packet import MediaMessageCodec
 from streamtasks.system.secret_manager import SecretManagerClient
 from streamtasks.system.task import Task, TaskHost
 from streamtasks.client import Client
@@ -122,12 +122,14 @@ class OutputContainerTask(Task):
     self._t0: int | None = None
 
   async def _run_stream(self, stream: AVOutputStream, in_topic_id: int):
+    # NOTE: the packets are not bounded, the synchronizer holds them back while other streams catch up.
+    # Dropping packets would corrupt the recording until the next keyframe, blocking would stall the other streams on this client.
     in_topic = self.client.sync_in_topic(in_topic_id, self.sync)
     async with in_topic, in_topic.RegisterContext():
       while True:
         try:
           data = await in_topic.recv_data()
-          message = MediaMessage.model_validate(data.data)
+          message = MediaMessageCodec.decode(data.data)
           if DEBUG_MEDIA(): ddebug_value("out", stream._stream.type, message.timestamp)
           if self._t0 is None: self._t0 = message.timestamp
           await stream.mux(message.packet)
@@ -4,6 +4,7 @@ import numpy as np
 from pydantic import BaseModel
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
@@ -49,7 +50,7 @@ class ScreenCaptureTask(SyncTask):
         if self.config.set_alpha != 0:
           arr = np.ndarray((self.config.height* self.config.width, 4), dtype=np.uint8, buffer=memoryview(img.raw))
           arr[:,3] = self.config.set_alpha
-        self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=get_timestamp_ms(), data=img.raw).model_dump()))
+        self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=get_timestamp_ms(), data=img.raw))))
         frame_count += 1
 
 class ScreenCaptureTaskHost(TaskHost):
@@ -2,18 +2,18 @@ from contextlib import asynccontextmanager
 import glob
 import os
 import platform
-import queue
 from typing import Any
 from pydantic import BaseModel, ValidationError, field_validator
 from streamtasks.media.util import list_pil_pixel_formats, pixel_format_to_pil_mode
 from streamtasks.message.types import TextMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.net.serialization import RawData
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
 from streamtasks.system.tasks.media.utils import MediaEditorFields
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 from PIL import Image, ImageDraw, ImageFont
 
 def list_ttf_files():
@@ -60,7 +60,7 @@ class TextRendererTask(SyncTask):
     self.out_topic = self.client.out_topic(config.out_topic)
     self.in_topic = self.client.in_topic(config.in_topic)
     self.config = config
-    self.message_queue: queue.Queue[TextMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TextMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -79,14 +79,11 @@ class TextRendererTask(SyncTask):
   def run_sync(self):
     pil_mode = pixel_format_to_pil_mode(self.config.pixel_format)
     font = ImageFont.truetype(self.config.font, size=self.config.font_size)
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=0.5)
-        image = Image.new(pil_mode, (self.config.width, self.config.height))
-        draw = ImageDraw.Draw(image)
-        draw.text((self.config.x, self.config.y), message.value, font=font, fill=self.config.font_color)
-        self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=message.timestamp, data=image.tobytes()).model_dump()))
-      except queue.Empty: pass
+    for message in self.message_queue:
+      image = Image.new(pil_mode, (self.config.width, self.config.height))
+      draw = ImageDraw.Draw(image)
+      draw.text((self.config.x, self.config.y), message.value, font=font, fill=self.config.font_color)
+      self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=message.timestamp, data=image.tobytes()))))
 
 class TextRendererTaskHost(TaskHost):
   @property
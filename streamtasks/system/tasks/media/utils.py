@@ -2,6 +2,9 @@ from typing import Literal
 from streamtasks.media.util import list_pixel_formats, list_sample_formats, list_sorted_available_codecs
 from streamtasks.system.configurators import EditorFields
 
+# NOTE: raw video inputs keep at most this many frames and drop the oldest ones, so that a stalled encoder does not buffer frames without bound
+MEDIA_IN_QUEUE_SIZE = 32
+
 class MediaEditorFields:
   def pixel_format(key: str = "pixel_format", label: str | None = None, allowed_values: set[str] | None = None):
     return EditorFields.select(key=key, label=label,
@@ -1,18 +1,18 @@
 from contextlib import asynccontextmanager
-import queue
 from typing import Any
 import numpy as np
 from pydantic import BaseModel, ValidationError
 from streamtasks.media.video import video_buffer_to_ndarray
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import NumberMessage, TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.configurators import IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
 
 from streamtasks.system.tasks.media.utils import MediaEditorFields
-from streamtasks.utils import TimeSynchronizer, context_task
+from streamtasks.utils import SyncQueue, TimeSynchronizer, context_task
 
 class VideoActivityMeterConfigBase(BaseModel):
   pixel_format: IOTypes.PixelFormat = "bgr24"
@@ -30,7 +30,7 @@ class VideoActivityMeterTask(SyncTask):
     self.out_topic = self.client.out_topic(config.out_topic)
     self.in_topic = self.client.in_topic(config.in_topic)
     self.config = config
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[TimestampChuckMessage] = self.create_queue()
 
   @asynccontextmanager
   async def init(self):
@@ -47,22 +47,18 @@ class VideoActivityMeterTask(SyncTask):
           if data.paused: await self.out_topic.send(RawData(NumberMessage(timestamp=sync.time, value=0).model_dump()))
           await self.out_topic.set_paused(data.paused)
         else:
-          message = TimestampChuckMessage.model_validate(data.data)
+          message = TimestampChuckMessageCodec.decode(data.data)
           sync.update(message.timestamp)
           self.message_queue.put(message)
       except (ValidationError, ValueError): pass
 
   def run_sync(self):
     last_bitmap: None | np.ndarray = None
-    timeout = 2 / self.config.rate
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=timeout)
-        bitmap = video_buffer_to_ndarray(message.data, self.config.width, self.config.height)
-        if last_bitmap is not None:
-          self.send_data(self.out_topic, RawData(NumberMessage(timestamp=message.timestamp, value=np.abs(last_bitmap - bitmap).flatten().mean()).model_dump()))
-        last_bitmap = bitmap
-      except queue.Empty: pass
+    for message in self.message_queue:
+      bitmap = video_buffer_to_ndarray(message.data, self.config.width, self.config.height)
+      if last_bitmap is not None:
+        self.send_data(self.out_topic, RawData(NumberMessage(timestamp=message.timestamp, value=np.abs(last_bitmap - bitmap).flatten().mean()).model_dump()))
+      last_bitmap = bitmap
 
 class VideoActivityMeterTaskHost(TaskHost):
   @property
@@ -1,8 +1,11 @@
+import functools
 from typing import Any
 from pydantic import BaseModel, ValidationError
+from streamtasks.media.pool import copy_to_buffer
+from streamtasks.media.shm import SharedFramePool
 from streamtasks.media.video import VideoCodecInfo, VideoFrame
 from streamtasks.net.serialization import RawData
-from streamtasks.media.packet import MediaMessage
+from streamtasks.media.packet import MediaMessageCodec
 from streamtasks.message.types import TimestampChuckMessage
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import Task, TaskHost
@@ -19,6 +22,7 @@ class VideoDecoderConfigBase(BaseModel):
   height: IOTypes.Height = 720
   rate: IOTypes.FrameRate = 30
   codec_options: dict[str, str] = {}
+  shared_memory: bool = False
 
 class VideoDecoderConfig(VideoDecoderConfigBase):
   out_topic: int
@@ -41,6 +45,7 @@ class VideoDecoderTask(Task):
       pixel_format=config.out_pixel_format,
       codec=config.decoder, options=config.codec_options)
     self.decoder = codec_info.get_decoder()
+    self.frame_pool = SharedFramePool() if config.shared_memory else None
 
   async def run(self):
     try:
@@ -49,15 +54,19 @@ class VideoDecoderTask(Task):
         while True:
           try:
             data = await self.in_topic.recv_data()
-            message = MediaMessage.model_validate(data.data)
+            message = MediaMessageCodec.decode(data.data)
             if self.t0 is None: self.t0 = message.timestamp - int(message.packet.dts * self.time_base * 1000)
             frames: list[VideoFrame] = await self.decoder.decode(message.packet)
             for frame in frames: # TODO: endianness
               bitmap = frame.convert(width=self.config.width, height=self.config.height, pixel_format=self.config.out_pixel_format).to_ndarray()
-              await self.out_topic.send(RawData(TimestampChuckMessage(timestamp=self.t0 + int(frame.dtime * 1000), data=bitmap.tobytes("C")).model_dump()))
+              timestamp = self.t0 + int(frame.dtime * 1000)
+              if self.frame_pool is None: out_message = TimestampChuckMessage(timestamp=timestamp, data=bitmap.tobytes("C"))
+              else: out_message = self.frame_pool.create_message_with(timestamp, bitmap.nbytes, functools.partial(copy_to_buffer, bitmap)) # NOTE: no contiguous copy of the bitmap is needed
+              await self.out_topic.send(RawData(out_message.model_dump()))
           except ValidationError: pass
     finally:
       self.decoder.close()
+      if self.frame_pool is not None: self.frame_pool.close()
 
 class VideoDecoderTaskHost(TaskHost):
   @property
@@ -76,6 +85,7 @@ class VideoDecoderTaskHost(TaskHost):
       MediaEditorFields.pixel_size("height"),
       MediaEditorFields.frame_rate(),
       EditorFields.options("codec_options"),
+      EditorFields.boolean("shared_memory", "shared memory output"),
     ]
   )
   async def create_task(self, config: Any, topic_space_id: int | None):
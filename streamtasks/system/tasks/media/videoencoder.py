@@ -1,18 +1,17 @@
 from contextlib import asynccontextmanager
 from fractions import Fraction
 from typing import Any
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel
+from streamtasks.media.shm import SharedFrame, SharedFrameReader
 from streamtasks.media.video import VideoCodecInfo, VideoFrame, video_buffer_to_ndarray
 from streamtasks.net.serialization import RawData
-from streamtasks.media.packet import MediaMessage
-from streamtasks.message.types import TimestampChuckMessage
-from streamtasks.system.tasks.media.utils import MediaEditorFields
+from streamtasks.media.packet import MediaMessage, MediaMessageCodec
+from streamtasks.system.tasks.media.utils import MEDIA_IN_QUEUE_SIZE, MediaEditorFields
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
-import queue
 
-from streamtasks.utils import context_task, hertz_to_fintervall
+from streamtasks.utils import FlowControlPolicy, SyncQueue, context_task, hertz_to_fintervall
 
 class VideoEncoderConfigBase(BaseModel):
   in_pixel_format: IOTypes.PixelFormat = "bgr24"
@@ -32,7 +31,7 @@ class VideoEncoderTask(SyncTask):
   def __init__(self, client: Client, config: VideoEncoderConfig):
     super().__init__(client)
     self.out_topic = self.client.out_topic(config.out_topic)
-    self.in_topic = self.client.in_topic(config.in_topic)
+    self.in_topic = self.client.in_topic(config.in_topic, max_size=MEDIA_IN_QUEUE_SIZE, policy=FlowControlPolicy.DROP_OLDEST)
     self.config = config
 
     self.time_base = hertz_to_fintervall(config.rate)
@@ -46,7 +45,8 @@ class VideoEncoderTask(SyncTask):
       codec=config.encoder, options=config.codec_options)
     self.encoder = codec_info.get_encoder()
 
-    self.frame_data_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.frame_reader = SharedFrameReader()
+    self.frame_data_queue: SyncQueue[SharedFrame] = self.create_queue(MEDIA_IN_QUEUE_SIZE)
 
   @asynccontextmanager
   async def init(self):
@@ -56,28 +56,25 @@ class VideoEncoderTask(SyncTask):
         yield
     finally:
       self.encoder.close()
+      self.frame_reader.close()
 
   async def _run_receiver(self):
     while True:
       try:
         data = await self.in_topic.recv_data()
-        self.frame_data_queue.put(TimestampChuckMessage.model_validate(data.data))
-      except ValidationError: pass
+        self.frame_data_queue.put(self.frame_reader.read_message(data.data))
+      except ValueError: pass
 
   def run_sync(self):
-    timeout = 2 / self.config.rate
-    while not self.stop_event.is_set():
-      try:
-        message = self.frame_data_queue.get(timeout=timeout)
-        if self.t0 is None: self.t0 = message.timestamp
-        bitmap = video_buffer_to_ndarray(message.data, self.config.width, self.config.height)
-        frame = VideoFrame.from_ndarray(bitmap, self.config.in_pixel_format)
+    for message in self.frame_data_queue:
+      if self.t0 is None: self.t0 = message.timestamp
+      bitmap = video_buffer_to_ndarray(message.data, self.config.width, self.config.height)
+      frame = VideoFrame.from_ndarray(bitmap, self.config.in_pixel_format)
+      if self.frame_reader.is_valid(message): # NOTE: a shared frame may have been overwritten while it was copied
         frame.set_ts(Fraction(message.timestamp - self.t0, 1000), self.time_base)
         packets = self.encoder.encode_sync(frame)
         for packet in packets:
-          self.send_data(self.out_topic, RawData(MediaMessage(timestamp=int(self.t0 + packet.dts * self.time_base * 1000), packet=packet).model_dump()))
-        self.frame_data_queue.task_done()
-      except queue.Empty: pass
+          self.send_data(self.out_topic, RawData(MediaMessageCodec.encode(MediaMessage(timestamp=int(self.t0 + packet.dts * self.time_base * 1000), packet=packet))))
 
 class VideoEncoderTaskHost(TaskHost):
   @property
@@ -3,6 +3,7 @@ from typing import Any
 from pydantic import BaseModel, field_validator
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
@@ -63,7 +64,7 @@ class VideoInputTask(SyncTask):
         if not result: raise Exception("Failed to read image!")
         frame = cv2.resize(frame, (self.config.width, self.config.height))
         for clr_coversion in VideoInputTask._COLOR_FORMAT2CV_MAP[self.config.pixel_format]: frame = cv2.cvtColor(frame, clr_coversion)
-        self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=timestamp, data=frame.tobytes()).model_dump()))
+        self.send_data(self.out_topic, RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=timestamp, data=frame.tobytes()))))
     finally:
       vc.release()
 
@@ -1,19 +1,20 @@
 from contextlib import asynccontextmanager
-import queue
 from typing import Any, Self
 import cv2
 import numpy as np
-from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from pydantic import BaseModel, field_validator, model_validator
+from streamtasks.media.pool import FrameBufferPool
+from streamtasks.media.shm import SharedFrame, SharedFramePool, SharedFrameReader
 from streamtasks.media.video import video_buffer_to_ndarray
 from streamtasks.media.util import TRANSPARENT_PXL_FORMATS
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.tasks.media.utils import MediaEditorFields
-from streamtasks.system.configurators import IOTypes, static_configurator
+from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
-from streamtasks.utils import context_task
+from streamtasks.utils import SyncQueue, context_task
 
 class VideoLayoutConfigBase(BaseModel):
   pixel_format: IOTypes.PixelFormat = "bgra"
@@ -29,6 +30,8 @@ class VideoLayoutConfigBase(BaseModel):
   out_width: IOTypes.Width = 1280
   out_height: IOTypes.Height = 720
 
+  shared_memory: bool = False
+
   @property
   def apply_width(self): return min(self.place_width, self.out_width - self.place_left_offset)
 
@@ -57,13 +60,20 @@ class VideoLayoutTask(SyncTask):
     self.in_topic = self.client.in_topic(config.in_topic)
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
-    self.message_queue: queue.Queue[TimestampChuckMessage] = queue.Queue()
+    self.message_queue: SyncQueue[SharedFrame] = self.create_queue()
+    self.frame_reader = SharedFrameReader()
+    self.frame_pool = SharedFramePool() if config.shared_memory else None
+    self.buffer_pool = FrameBufferPool(max_free=1)
 
   @asynccontextmanager
   async def init(self):
-    async with self.in_topic, self.in_topic.RegisterContext(), self.out_topic, self.out_topic.RegisterContext(), context_task(self._run_receiver()):
-      self.client.start()
-      yield
+    try:
+      async with self.in_topic, self.in_topic.RegisterContext(), self.out_topic, self.out_topic.RegisterContext(), context_task(self._run_receiver()):
+        self.client.start()
+        yield
+    finally:
+      self.frame_reader.close()
+      if self.frame_pool is not None: self.frame_pool.close()
 
   async def _run_receiver(self):
     while True:
@@ -72,23 +82,22 @@ class VideoLayoutTask(SyncTask):
         if isinstance(data, TopicControlData):
           await self.out_topic.set_paused(data.paused)
         else:
-          message = TimestampChuckMessage.model_validate(data.data)
-          self.message_queue.put(message)
-      except (ValidationError, ValueError): pass
+          self.message_queue.put(self.frame_reader.read_message(data.data))
+      except ValueError: pass
 
   def run_sync(self):
-    timeout = 2 / self.config.rate
-    while not self.stop_event.is_set():
-      try:
-        message = self.message_queue.get(timeout=timeout)
-        arr = video_buffer_to_ndarray(message.data, self.config.in_width, self.config.in_height)
-        arr = cv2.resize(arr, (self.config.place_width, self.config.place_height), interpolation=cv2.INTER_LINEAR)
+    for message in self.message_queue:
+      arr = video_buffer_to_ndarray(message.data, self.config.in_width, self.config.in_height)
+      with self.buffer_pool.borrow((self.config.place_height, self.config.place_width, arr.shape[2])) as resized, self.buffer_pool.borrow((self.config.out_height, self.config.out_width, 4)) as out_data:
+        arr = cv2.resize(arr, (self.config.place_width, self.config.place_height), dst=resized, interpolation=cv2.INTER_LINEAR)
         arr = arr[:self.config.apply_height,:self.config.apply_width,:]
         assert arr.dtype == np.uint8, "not uint8"
-        out_data = np.zeros((self.config.out_height, self.config.out_width, 4), dtype=np.uint8)
+        if not self.frame_reader.is_valid(message): continue
+        # NOTE: the image is always placed in the same area, so the rest of a reused buffer is still zeroed
         out_data[self.config.place_top_offset:self.config.place_top_offset + arr.shape[0], self.config.place_left_offset:self.config.place_left_offset + arr.shape[1]] = arr
-        self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=message.timestamp, data=out_data.tobytes("C")).model_dump()))
-      except queue.Empty: pass
+        if self.frame_pool is None: out_message = TimestampChuckMessage(timestamp=message.timestamp, data=out_data.tobytes("C"))
+        else: out_message = self.frame_pool.create_message(message.timestamp, out_data)
+      self.send_data(self.out_topic, RawData(out_message.model_dump()))
 
 class VideoLayoutTaskHost(TaskHost):
   @property
@@ -110,6 +119,7 @@ class VideoLayoutTaskHost(TaskHost):
       MediaEditorFields.pixel_size(key="in_height", label="input height"),
       MediaEditorFields.pixel_size(key="out_width", label="output width"),
       MediaEditorFields.pixel_size(key="out_height", label="output height"),
+      EditorFields.boolean("shared_memory", "shared memory output"),
     ]
   )
   async def create_task(self, config: Any, topic_space_id: int | None):
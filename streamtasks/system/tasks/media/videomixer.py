@@ -1,12 +1,12 @@
 from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
 from functools import cached_property
-import queue
 import re
 from typing import Any
 import numpy as np
-from pydantic import BaseModel, ValidationError, field_validator
+from pydantic import BaseModel, field_validator
 from streamtasks.client.topic import InTopic, SequentialInTopicSynchronizer
+from streamtasks.media.shm import SharedFrame, SharedFramePool, SharedFrameReader
 from streamtasks.media.util import TRANSPARENT_PXL_FORMATS
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
@@ -15,8 +15,8 @@ from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import EditorFields, IOTypes, multitrackio_configurator, static_configurator
 from streamtasks.system.task import SyncTask, TaskHost
 from streamtasks.client import Client
-from streamtasks.utils import context_task
-from streamtasks.media.video_perf import merge_images
+from streamtasks.utils import SyncQueue, context_task
+from streamtasks.media.video_perf import composite_images, merge_images
 
 class VideoTrackBase(BaseModel):
   label: str = "video track"
@@ -32,6 +32,7 @@ class VideoMixerConfigBase(BaseModel):
   rate: IOTypes.FrameRate = 30
   bgcolor_hex: str = "#000000"
   synchronized: bool = True
+  shared_memory: bool = False
 
   @field_validator("pixel_format")
   @classmethod
@@ -62,12 +63,12 @@ class VideoMixerConfig(VideoMixerConfigBase):
 @dataclass
 class VideoTrackContext:
   topic: InTopic
-  last_message: TimestampChuckMessage | None
+  last_message: SharedFrame | None
 
 @dataclass
 class MixingJob:
   timestamp: int
-  frames: list[bytes]
+  frames: list[SharedFrame]
 
 class VideoMixerTask(SyncTask):
   def __init__(self, client: Client, config: VideoMixerConfig):
@@ -82,11 +83,16 @@ class VideoMixerTask(SyncTask):
     self.out_topic = self.client.out_topic(config.out_topic)
     self.config = config
     self.frame_count = 0
-    self.job_queue: queue.Queue[MixingJob] = queue.Queue()
+    self.job_queue: SyncQueue[MixingJob] = self.create_queue()
+    self.frame_reader = SharedFrameReader()
+    self.frame_pool = SharedFramePool() if config.shared_memory else None
 
   @asynccontextmanager
   async def init(self):
     async with AsyncExitStack() as exit_stack:
+      exit_stack.callback(self.frame_reader.close)
+      if self.frame_pool is not None: exit_stack.callback(self.frame_pool.close)
+
       await exit_stack.enter_async_context(self.out_topic)
       await exit_stack.enter_async_context(self.out_topic.RegisterContext())
 
@@ -106,9 +112,9 @@ class VideoMixerTask(SyncTask):
         if isinstance(data, TopicControlData): track.last_message = None
         else:
           if last_frame_count == self.frame_count: self.submit_job()
-          track.last_message = TimestampChuckMessage.model_validate(data.data)
+          track.last_message = self.frame_reader.read_message(data.data)
           last_frame_count = self.frame_count
-      except ValidationError: pass
+      except ValueError: pass
 
   def submit_job(self):
     self.frame_count += 1
@@ -116,17 +122,22 @@ class VideoMixerTask(SyncTask):
     if len(messages) == 0: return
     self.job_queue.put(MixingJob(
       timestamp=min(m.timestamp for m in messages),
-      frames=[ m.data for m in messages ]
+      frames=messages
     ))
 
   def run_sync(self):
-    timeout = 2 / self.config.rate
-    while not self.stop_event.is_set():
-      try:
-        job = self.job_queue.get(timeout=timeout)
-        result = merge_images([ frame for frame in job.frames ], self.config.alpha_front)
-        self.send_data(self.out_topic, RawData(TimestampChuckMessage(timestamp=job.timestamp, data=result).model_dump()))
-      except queue.Empty: pass
+    for job in self.job_queue:
+      if not all(self.frame_reader.is_valid(frame) for frame in job.frames): continue # NOTE: skip the job before it takes a slot of the pool
+      images = [ frame.data for frame in job.frames ]
+      if self.frame_pool is None:
+        out_message = TimestampChuckMessage(timestamp=job.timestamp, data=merge_images(images, self.config.alpha_front))
+      else:
+        size = min(memoryview(image).nbytes for image in images)
+        out_message = self.frame_pool.create_message_with(job.timestamp, size, lambda buf: composite_images(buf, images, self.config.alpha_front))
+      if not all(self.frame_reader.is_valid(frame) for frame in job.frames): # NOTE: an input was overwritten while compositing
+        if self.frame_pool is not None: self.frame_pool.discard(out_message.handle)
+        continue
+      self.send_data(self.out_topic, RawData(out_message.model_dump()))
 
 class VideoMixerTaskHost(TaskHost):
   @property
@@ -142,6 +153,7 @@ class VideoMixerTaskHost(TaskHost):
       MediaEditorFields.pixel_size(key="height"),
       EditorFields.text(key="bgcolor_hex", label="background hex color"),
       EditorFields.boolean(key="synchronized"),
+      EditorFields.boolean(key="shared_memory", label="shared memory output"),
     ]
   ),
   **multitrackio_configurator(is_input=True, track_configs=[{
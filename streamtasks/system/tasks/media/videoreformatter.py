@@ -4,6 +4,7 @@ from pydantic import BaseModel, ValidationError
 from streamtasks.media.video import VideoFrame, VideoReformatter, VideoReformatterInfo
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.net.messages import TopicControlData
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.configurators import IOTypes, static_configurator
@@ -45,12 +46,12 @@ class VideoReformatterTask(Task):
           data = await self.in_topic.recv_data_control()
           if isinstance(data, TopicControlData): await self.out_topic.set_paused(data.paused)
           else:
-            message = TimestampChuckMessage.model_validate(data.data)
+            message = TimestampChuckMessageCodec.decode(data.data)
             if t0 is None: t0 = message.timestamp
             frame = VideoFrame.from_buffer(message.data, self.config.in_width, self.config.in_height, self.config.in_pixel_format)
             frame.set_ts(Fraction(message.timestamp - t0, 1000), Fraction(1, self.config.in_rate))
             for nframe in await self.reformatter.reformat(frame):
-              await self.out_topic.send(RawData(TimestampChuckMessage(timestamp=int(nframe.dtime * 1000) + t0, data=nframe.to_bytes()).model_dump()))
+              await self.out_topic.send(RawData(TimestampChuckMessageCodec.encode(TimestampChuckMessage(timestamp=int(nframe.dtime * 1000) + t0, data=nframe.to_bytes()))))
         except (ValidationError, ValueError): pass
 
 class VideoReformatterTaskHost(TaskHost):
@@ -12,6 +12,7 @@ from streamtasks.client import Client
 
 class ReplayBufferConfigBase(BaseModel):
   loop: bool = False
+  buffer_size: int = 256
 
 class ReplayBufferConfig(ReplayBufferConfigBase):
   out_topic: int
@@ -26,7 +27,7 @@ class ReplayBufferTask(Task):
     self.play_topic = self.client.in_topic(config.play_topic)
     self.config = config
     self.sync = TimeSynchronizer()
-    self.buffer = RawDataBuffer()
+    self.buffer = RawDataBuffer(config.buffer_size << 20)
     self.playing = False
     self.play_task: asyncio.Task | None = None
 
@@ -98,7 +99,8 @@ class ReplayBufferTaskHost(TaskHost):
     default_config=ReplayBufferConfigBase().model_dump(),
     io_mirror=[("in_topic", 0)],
     editor_fields=[
-      EditorFields.boolean(key="loop")
+      EditorFields.boolean(key="loop"),
+      EditorFields.integer(key="buffer_size", label="buffer size", unit="MB", min_value=1),
     ]
   )
   async def create_task(self, config: Any, topic_space_id: int | None):
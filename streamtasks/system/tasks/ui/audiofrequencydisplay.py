@@ -8,7 +8,7 @@ from streamtasks.media.util import AudioChunker
 from streamtasks.system.configurators import EditorFields, IOTypes, static_configurator
 from streamtasks.system.tasks.media.utils import MediaEditorFields
 from streamtasks.system.tasks.ui.controlbase import UIBaseTask, UIControlBaseTaskConfig
-from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.message.codec import TimestampChuckMessageCodec
 from streamtasks.system.task import TaskHost
 from streamtasks.client import Client
 
@@ -40,7 +40,7 @@ class AudioFrequencyDisplayTask(UIBaseTask[AudioFrequencyDisplayConfig, AudioFre
     while True:
       try:
         data = await self.in_topic.recv_data()
-        message = TimestampChuckMessage.model_validate(data.data)
+        message = TimestampChuckMessageCodec.decode(data.data)
         new_samples = audio_buffer_to_ndarray(message.data, self.config.sample_format)[0]
         for chunk, _ in chunker.next(new_samples, 0):
           freqs = np.abs(np.fft.fft(chunk)[:chunk.size // 2])
@@ -13,7 +13,7 @@ from streamtasks.net.utils import endpoint_to_str
 from streamtasks.services.constants import NetworkPorts
 from streamtasks.system.configurators import IOTypes, static_configurator
 from streamtasks.system.tasks.media.utils import MediaEditorFields
-from streamtasks.media.packet import MediaMessage
+from streamtasks.media.packet import MediaMessageCodec
 from streamtasks.system.task import MetadataFields, Task, TaskHost
 from streamtasks.client import Client
 from streamtasks.utils import wait_with_dependencies
@@ -69,7 +69,7 @@ class VideoViewerTask(Task):
           while ctx.connected:
             try:
               data: RawData = await wait_with_dependencies(in_topic.recv_data(), [receive_disconnect_task])
-              message = MediaMessage.model_validate(data.data)
+              message = MediaMessageCodec.decode(data.data)
               await video_stream.mux(message.packet)
               if buffer.tell() > 0:
                 chunk = buffer.getvalue()
@@ -1,9 +1,13 @@
 from abc import abstractmethod
 from collections import deque
 from contextlib import asynccontextmanager
+from enum import Enum
 from fractions import Fraction
 import hashlib
+import heapq
+import itertools
 import math
+import queue
 import threading
 from types import CoroutineType
 from typing import Any, Awaitable, Generic, Iterable, Optional, TypeVar
@@ -111,6 +115,66 @@ class AsyncTrigger:
     self._futs.clear()
 
 
+class FlowControlPolicy(Enum):
+  BLOCK = "block"
+  DROP_OLDEST = "drop_oldest"
+  DROP_NEWEST = "drop_newest"
+
+
+T2 = TypeVar("T2")
+class FlowControlQueue(Generic[T2]):
+  """
+  A queue with an optional size limit. When the queue is full, items are handled according to the policy they were put with.
+  Items put with BLOCK are never dropped, put waits for space, put_nowait exceeds the limit.
+  """
+  def __init__(self, max_size: int = 0, policy: FlowControlPolicy = FlowControlPolicy.BLOCK) -> None:
+    self.max_size = max_size
+    self.policy = policy
+    self.dropped_count = 0
+    self._items: deque[tuple[T2, bool]] = deque() # (item, droppable)
+    self._put_trigger = AsyncTrigger()
+    self._get_trigger = AsyncTrigger()
+
+  def qsize(self): return len(self._items)
+  def empty(self): return len(self._items) == 0
+  def full(self): return self.max_size > 0 and len(self._items) >= self.max_size
+
+  async def put(self, item: T2, policy: FlowControlPolicy | None = None):
+    if (policy or self.policy) == FlowControlPolicy.BLOCK: await self.wait_writable()
+    return self.put_nowait(item, policy)
+
+  def put_nowait(self, item: T2, policy: FlowControlPolicy | None = None) -> bool:
+    policy = policy or self.policy
+    if self.full():
+      if policy == FlowControlPolicy.DROP_NEWEST:
+        self.dropped_count += 1
+        return False
+      if policy == FlowControlPolicy.DROP_OLDEST: self._drop_oldest()
+    self._items.append((item, policy != FlowControlPolicy.BLOCK))
+    self._put_trigger.trigger()
+    return True
+
+  async def get(self) -> T2:
+    while len(self._items) == 0: await self._put_trigger.wait()
+    return self.get_nowait()
+
+  def get_nowait(self) -> T2:
+    if len(self._items) == 0: raise asyncio.QueueEmpty()
+    item, _ = self._items.popleft()
+    self._get_trigger.trigger()
+    return item
+
+  async def wait_writable(self):
+    while self.full(): await self._get_trigger.wait()
+
+  def _drop_oldest(self):
+    for idx, (_, droppable) in enumerate(self._items):
+      if droppable:
+        del self._items[idx]
+        self.dropped_count += 1
+        return
+
+
 class AsyncBool:
   def __init__(self, initial_value: bool = False) -> None:
     self._value = initial_value
@@ -158,6 +222,58 @@ class AsyncObservableDict:
       self._data[key] = value
       self._change_trigger.trigger()
 
+K3 = TypeVar("K3")
+class AsyncMinTracker(Generic[K3]):
+  """
+  Tracks the minimum of the values of some keys with O(log n) updates.
+  Waiting for the minimum to reach a value is heap based as well, all waiters that are ready are released at once.
+  """
+  def __init__(self, empty_min: Any = 0) -> None:
+    self.empty_min = empty_min
+    self._values: dict[K3, Any] = {}
+    self._heap: list[tuple[Any, int, K3]] = [] # NOTE: may contain outdated entries, which are dropped when they reach the top
+    self._waiters: list[tuple[Any, int, asyncio.Future]] = []
+    self._counter = itertools.count()
+
+  @property
+  def min(self):
+    heap, values = self._heap, self._values
+    while len(heap) > 0 and values.get(heap[0][2], heap) != heap[0][0]: heapq.heappop(heap)
+    return heap[0][0] if len(heap) > 0 else self.empty_min
+
+  def __len__(self): return len(self._values)
+  def __contains__(self, key: K3): return key in self._values
+  def get(self, key: K3, default: Any = None): return self._values.get(key, default)
+  def items(self): return self._values.items()
+
+  def set(self, key: K3, value: Any):
+    if self._values.get(key, self._heap) == value: return
+    self._values[key] = value
+    heapq.heappush(self._heap, (value, next(self._counter), key))
+    if len(self._heap) > 2 * len(self._values) + 64: self._compact()
+    self._release()
+
+  def remove(self, key: K3):
+    if self._values.pop(key, self._heap) is not self._heap: self._release()
+
+  def wait_min(self, value: Any) -> asyncio.Future:
+    """Waits until the minimum is not lower than the value."""
+    fut = asyncio.get_running_loop().create_future()
+    if self.min >= value: fut.set_result(None)
+    else: heapq.heappush(self._waiters, (value, next(self._counter), fut))
+    return fut
+
+  def _release(self):
+    if len(self._waiters) == 0: return
+    min_value = self.min
+    while len(self._waiters) > 0 and self._waiters[0][0] <= min_value:
+      fut = heapq.heappop(self._waiters)[2]
+      if not fut.done(): fut.set_result(None)
+
+  def _compact(self):
+    self._heap = [ (value, next(self._counter), key) for key, value in self._values.items() ]
+    heapq.heapify(self._heap)
+
 T0 = TypeVar("T0")
 class AsyncProducer(Generic[T0]):
   def __init__(self) -> None:
@@ -280,6 +396,61 @@ class AsyncConsumer(Generic[T1]):
 
   def test_message(self, message: T1) -> bool: return True
 
+T4 = TypeVar("T4")
+class SyncQueue(Generic[T4]):
+  """
+  Hands items from the event loop to a worker thread.
+  Getters wake up as soon as an item is put or the queue is closed, so they do not need to poll with a timeout.
+  With a max_size, putting into a full queue drops the oldest item.
+  """
+  def __init__(self, max_size: int = 0) -> None:
+    self._items: deque[T4] = deque(maxlen=max_size or None)
+    self._cond = threading.Condition()
+    self._closed = False
+    self.dropped_count = 0
+
+  @property
+  def closed(self): return self._closed
+
+  def qsize(self): return len(self._items)
+
+  def put(self, item: T4):
+    with self._cond:
+      if len(self._items) == self._items.maxlen: self.dropped_count += 1
+      self._items.append(item)
+      self._cond.notify()
+
+  def close(self):
+    with self._cond:
+      self._closed = True
+      self._cond.notify_all()
+
+  def get(self, timeout: float | None = None) -> T4:
+    """raises queue.Empty when the timeout expired and EOFError when the queue was closed."""
+    with self._cond:
+      self._wait(timeout)
+      return self._items.popleft()
+
+  def get_all(self, timeout: float | None = None) -> list[T4]:
+    """takes all queued items at once, waits like get if there are none."""
+    with self._cond:
+      self._wait(timeout)
+      items = list(self._items)
+      self._items.clear()
+      return items
+
+  def __iter__(self):
+    try:
+      while True:
+        for item in self.get_all():
+          if self._closed: return
+          yield item
+    except EOFError: pass
+
+  def _wait(self, timeout: float | None):
+    if not self._cond.wait_for(lambda: self._closed or len(self._items) > 0, timeout): raise queue.Empty()
+    if self._closed: raise EOFError()
+
 RT = TypeVar('RT')
 
 async def wait_with_dependencies(main: Awaitable[RT], deps: Iterable[asyncio.Future]):
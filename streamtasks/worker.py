@@ -1,13 +1,36 @@
 from abc import abstractmethod
+import weakref
 from streamtasks.client import Client
-from streamtasks.net import Switch
+from streamtasks.net import Link, Switch, create_queue_connection
 
 class Worker:
-  def __init__(self): self.switch = Switch()
+  def __init__(self):
+    self.switch = Switch()
+    self._shared_switch = False
+    self._links: weakref.WeakSet[Link] = weakref.WeakSet()
 
-  async def create_link(self): return await self.switch.add_local_connection()
+  def attach(self, switch: Switch):
+    """
+    Routes the worker through a switch of the same process instead of its own one.
+    Messages between co-located workers then pass a single switch instead of a chain of switches and queues.
+    Must be called before the worker creates any links.
+    """
+    self.switch = switch
+    self._shared_switch = True
+
+  async def add_link(self, link: Link):
+    self._links.add(link)
+    await self.switch.add_link(link)
+  async def create_link(self):
+    a, b = create_queue_connection()
+    await self.add_link(a)
+    return b
   async def create_client(self): return Client(await self.create_link())
 
   @abstractmethod
   async def run(self): pass
-  async def shutdown(self): self.switch.stop_receiving()
+  async def shutdown(self):
+    if self._shared_switch:
+      # NOTE: the shared switch keeps running, only the links of this worker are closed
+      for link in list(self._links): link.close()
+    else: self.switch.stop_receiving()
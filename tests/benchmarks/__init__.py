@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+import statistics
+import time
+from typing import Awaitable, Callable
+
+
+class BenchmarkTimer:
+  """Measures the time spent inside its context, so that setup and teardown are excluded."""
+  def __init__(self) -> None:
+    self.elapsed = 0.0
+    self._start = 0.0
+  def __enter__(self):
+    self._start = time.perf_counter()
+    return self
+  def __exit__(self, *_): self.elapsed += time.perf_counter() - self._start
+
+BenchmarkFunction = Callable[[BenchmarkTimer, int], Awaitable[None]]
+
+@dataclass
+class Benchmark:
+  name: str
+  func: BenchmarkFunction
+  ops: int # operations per run at scale 1
+  unit: str
+
+@dataclass
+class BenchmarkResult:
+  name: str
+  ops: int
+  unit: str
+  durations: list[float]
+
+  @property
+  def best(self): return min(self.durations)
+  @property
+  def median(self): return statistics.median(self.durations)
+  @property
+  def ops_per_second(self): return self.ops / self.median if self.median > 0 else float("inf")
+
+  def as_dict(self): return {
+    "name": self.name,
+    "ops": self.ops,
+    "unit": self.unit,
+    "durations": self.durations,
+    "best": self.best,
+    "median": self.median,
+    "ops_per_second": self.ops_per_second,
+  }
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+def benchmark(name: str, ops: int, unit: str = "ops"):
+  def decorator(func: BenchmarkFunction):
+    BENCHMARKS[name] = Benchmark(name=name, func=func, ops=ops, unit=unit)
+    return func
+  return decorator
+
+async def run_benchmark(bench: Benchmark, repeat: int = 5, scale: float = 1, warmup: bool = True) -> BenchmarkResult:
+  ops = max(1, int(bench.ops * scale))
+  if warmup: await bench.func(BenchmarkTimer(), max(1, ops // 10))
+  durations: list[float] = []
+  for _ in range(repeat):
+    timer = BenchmarkTimer()
+    await bench.func(timer, ops)
+    durations.append(timer.elapsed)
+  return BenchmarkResult(name=bench.name, ops=ops, unit=bench.unit, durations=durations)
+
+def load_benchmarks():
+  from tests.benchmarks import bench_net, bench_connection, bench_fetch, bench_media # noqa: F401
+  return BENCHMARKS
@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import fnmatch
+import json
+import platform
+import sys
+import time
+from tests.benchmarks import load_benchmarks, run_benchmark
+
+async def main():
+  parser = argparse.ArgumentParser(prog="python -m tests.benchmarks", description="Runs the streamtasks benchmarks.")
+  parser.add_argument("patterns", nargs="*", default=["*"], help="glob patterns of the benchmarks to run")
+  parser.add_argument("--repeat", type=int, default=5)
+  parser.add_argument("--scale", type=float, default=1, help="scales the number of operations per run")
+  parser.add_argument("--json", help="writes the results to this file, - for stdout")
+  parser.add_argument("--list", action="store_true", help="lists the available benchmarks")
+  args = parser.parse_args()
+
+  benchmarks = [ bench for name, bench in load_benchmarks().items() if any(fnmatch.fnmatch(name, p) for p in args.patterns) ]
+  if args.list:
+    for bench in benchmarks: print(bench.name)
+    return
+
+  results = []
+  for bench in benchmarks:
+    result = await run_benchmark(bench, repeat=args.repeat, scale=args.scale)
+    results.append(result)
+    print(f"{result.name:<40} {result.ops_per_second:>14,.1f} {result.unit}/s   median {result.median * 1000:>9.2f} ms   best {result.best * 1000:>9.2f} ms", file=sys.stderr)
+
+  if args.json:
+    report = {
+      "created": time.time(),
+      "python": sys.version,
+      "platform": platform.platform(),
+      "machine": platform.machine(),
+      "repeat": args.repeat,
+      "scale": args.scale,
+      "results": [ result.as_dict() for result in results ]
+    }
+    if args.json == "-": json.dump(report, sys.stdout, indent=2)
+    else:
+      with open(args.json, "w") as fd: json.dump(report, fd, indent=2)
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import socket
+import tempfile
+from streamtasks.connection import RawStreamConnection
+from tests.benchmarks import BenchmarkTimer, benchmark
+
+FRAME = os.urandom(1024)
+
+async def run_connection(timer: BenchmarkTimer, count: int, server_conn: RawStreamConnection, client_conn: RawStreamConnection):
+  async def send():
+    for _ in range(count): await client_conn.send(FRAME)
+  async def recv():
+    for _ in range(count): await server_conn.recv()
+  try:
+    with timer: await asyncio.gather(send(), recv())
+  finally:
+    client_conn.close()
+    server_conn.close()
+
+async def accept_connection(start_server, open_connection):
+  accepted: asyncio.Future[RawStreamConnection] = asyncio.get_running_loop().create_future()
+  server = await start_server(lambda reader, writer: accepted.set_result(RawStreamConnection(reader, writer)))
+  client_conn = RawStreamConnection(*await open_connection(server))
+  return server, await accepted, client_conn
+
+@benchmark("connection.stream[tcp]", ops=20000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int):
+  server, server_conn, client_conn = await accept_connection(
+    lambda cb: asyncio.start_server(cb, "127.0.0.1", 0),
+    lambda server: asyncio.open_connection(*server.sockets[0].getsockname()[:2]))
+  try: await run_connection(timer, count, server_conn, client_conn)
+  finally: server.close()
+
+if hasattr(socket, "AF_UNIX"):
+  @benchmark("connection.stream[unix]", ops=20000, unit="msg")
+  async def _(timer: BenchmarkTimer, count: int):
+    path = tempfile.mktemp(".sock")
+    server, server_conn, client_conn = await accept_connection(lambda cb: asyncio.start_unix_server(cb, path), lambda _: asyncio.open_unix_connection(path))
+    try: await run_connection(timer, count, server_conn, client_conn)
+    finally:
+      server.close()
+      if os.path.exists(path): os.unlink(path)
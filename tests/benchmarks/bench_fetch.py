@@ -0,0 +1,34 @@
+import asyncio
+from streamtasks.client import Client
+from streamtasks.client.fetch import FetchRequest, FetchServer
+from streamtasks.net import Switch
+from tests.benchmarks import BenchmarkTimer, benchmark
+
+async def run_fetch(timer: BenchmarkTimer, count: int, concurrency: int):
+  switch = Switch()
+  server_client, client = Client(await switch.add_local_connection()), Client(await switch.add_local_connection())
+  server_client.start()
+  client.start()
+  await server_client.set_address(1)
+  await client.set_address(2)
+
+  server = FetchServer(server_client, max_concurrency=32)
+  @server.route("echo")
+  async def _(req: FetchRequest): await req.respond(req.body)
+
+  server_task = asyncio.create_task(server.run())
+  try:
+    await client.fetch(1, "echo", 0)
+    async def fetch_many(count: int):
+      for i in range(count): await client.fetch(1, "echo", i)
+    # NOTE: spread the remainder, so that exactly count requests are timed
+    with timer: await asyncio.gather(*(fetch_many(count // concurrency + (idx < count % concurrency)) for idx in range(concurrency)))
+  finally:
+    server_task.cancel()
+    switch.stop_receiving()
+
+@benchmark("fetch.sequential", ops=2000, unit="req")
+async def _(timer: BenchmarkTimer, count: int): await run_fetch(timer, count, 1)
+
+@benchmark("fetch.concurrent[32]", ops=4096, unit="req")
+async def _(timer: BenchmarkTimer, count: int): await run_fetch(timer, count, 32)
@@ -0,0 +1,53 @@
+import asyncio
+import numpy as np
+from streamtasks.media.shm import SharedFramePool, SharedFrameReader
+from streamtasks.media.video_perf import merge_images
+from streamtasks.message.types import TimestampChuckMessage
+from streamtasks.net import Link, TopicDataMessage
+from streamtasks.net.serialization import RawData
+from tests.benchmarks import BenchmarkTimer, benchmark
+from tests.benchmarks.bench_net import setup_switch
+
+def generate_frames(count: int, width: int, height: int):
+  rng = np.random.default_rng(0)
+  return [ rng.integers(0, 256, width * height * 4, dtype=np.uint8).tobytes() for _ in range(count) ]
+
+async def run_pipeline(timer: BenchmarkTimer, count: int, shared_memory: bool):
+  frames = generate_frames(4, 640, 360)
+  switch, producer, consumers = await setup_switch(1, True)
+  pool, reader = SharedFramePool(), SharedFrameReader()
+  # NOTE: the producer may only run ahead by the number of pool slots, otherwise frames are overwritten before they are read
+  in_flight = asyncio.Semaphore(pool.slot_count)
+
+  async def send():
+    for i in range(count):
+      await in_flight.acquire()
+      if shared_memory: message = pool.create_message(i, frames[i % len(frames)])
+      else: message = TimestampChuckMessage(timestamp=i, data=frames[i % len(frames)])
+      await producer.send(TopicDataMessage(1, RawData(message.model_dump())))
+  async def recv(link: Link):
+    received = 0
+    while received < count:
+      message = await link.recv()
+      if isinstance(message, TopicDataMessage):
+        reader.read_message(message.data.data)
+        in_flight.release()
+        received += 1
+  try:
+    with timer: await asyncio.gather(send(), recv(consumers[0]))
+  finally:
+    reader.close()
+    pool.close()
+    switch.stop_receiving()
+
+@benchmark("media.compositor[4x720p]", ops=30, unit="frame")
+async def _(timer: BenchmarkTimer, count: int):
+  frames = generate_frames(4, 1280, 720)
+  with timer:
+    for _ in range(count): merge_images(frames, True)
+
+@benchmark("media.pipeline[360p inline]", ops=300, unit="frame")
+async def _(timer: BenchmarkTimer, count: int): await run_pipeline(timer, count, False)
+
+@benchmark("media.pipeline[360p shared memory]", ops=300, unit="frame")
+async def _(timer: BenchmarkTimer, count: int): await run_pipeline(timer, count, True)
@@ -0,0 +1,75 @@
+import asyncio
+from streamtasks.client import Client
+from streamtasks.net import Link, Switch, TopicRemappingLink, create_queue_connection
+from streamtasks.net.messages import InTopicsChangedMessage, OutTopicsChangedMessage, PricedId, TopicDataMessage
+from streamtasks.net.serialization import RawData
+from tests.benchmarks import BenchmarkTimer, benchmark
+
+
+async def send_data(link: Link, topic: int, count: int):
+  for i in range(count): await link.send(TopicDataMessage(topic, RawData({ "timestamp": i, "value": 1.0 })))
+
+async def recv_data(link: Link, count: int):
+  while count > 0:
+    if isinstance(await link.recv(), TopicDataMessage): count -= 1
+
+async def setup_switch(consumer_count: int, raw: bool, topic_id_map: dict[int, int] = {}):
+  switch = Switch()
+  producer_conn = create_queue_connection(raw=raw)
+  consumer_conns = [ create_queue_connection(raw=raw) for _ in range(consumer_count) ]
+  for conn in [ producer_conn, *consumer_conns ]: await switch.add_link(conn[0])
+  producer, consumers = producer_conn[1], [ conn[1] for conn in consumer_conns ]
+  if len(topic_id_map) > 0: producer, consumers = TopicRemappingLink(producer, topic_id_map), [ TopicRemappingLink(link, topic_id_map) for link in consumers ]
+
+  await producer.send(OutTopicsChangedMessage(set([ PricedId(1, 0) ]), set()))
+  for consumer in consumers: await consumer.send(InTopicsChangedMessage(set([ 1 ]), set()))
+  topic = topic_id_map.get(1, 1)
+  while not all(topic in conn[0].in_topics for conn in consumer_conns): await asyncio.sleep(0.001)
+  return switch, producer, consumers
+
+async def run_switch(timer: BenchmarkTimer, count: int, consumer_count: int, raw: bool, topic_id_map: dict[int, int] = {}):
+  switch, producer, consumers = await setup_switch(consumer_count, raw, topic_id_map)
+  try:
+    with timer: await asyncio.gather(send_data(producer, 1, count), *(recv_data(consumer, count) for consumer in consumers))
+  finally:
+    switch.stop_receiving()
+    for link in [ producer, *consumers ]: link.close()
+
+@benchmark("net.queue_connection[object]", ops=20000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int):
+  a, b = create_queue_connection(raw=False)
+  with timer: await asyncio.gather(send_data(a, 1, count), recv_data(b, count))
+
+@benchmark("net.queue_connection[raw]", ops=20000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int):
+  a, b = create_queue_connection(raw=True)
+  with timer: await asyncio.gather(send_data(a, 1, count), recv_data(b, count))
+
+@benchmark("net.switch[1 consumer]", ops=20000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int): await run_switch(timer, count, 1, False)
+
+@benchmark("net.switch[1 consumer, raw]", ops=20000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int): await run_switch(timer, count, 1, True)
+
+@benchmark("net.switch[1 consumer, remapped]", ops=20000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int): await run_switch(timer, count, 1, False, { 1: 9000 })
+
+@benchmark("net.switch[8 consumers]", ops=5000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int): await run_switch(timer, count, 8, False)
+
+@benchmark("net.client_topic", ops=10000, unit="msg")
+async def _(timer: BenchmarkTimer, count: int):
+  switch = Switch()
+  producer, consumer = Client(await switch.add_local_connection()), Client(await switch.add_local_connection())
+  producer.start()
+  consumer.start()
+  try:
+    async with producer.out_topic(1) as out_topic, out_topic.RegisterContext(), consumer.in_topic(1) as in_topic, in_topic.RegisterContext():
+      await out_topic.wait_requested(True)
+      async def send():
+        for i in range(count): await out_topic.send(RawData({ "timestamp": i, "value": 1.0 }))
+      async def recv():
+        for _ in range(count): await in_topic.recv_data()
+      with timer: await asyncio.gather(send(), recv())
+  finally:
+    switch.stop_receiving()
@@ -6,10 +6,12 @@ from streamtasks.client.discovery import wait_for_topic_signal
 from streamtasks.client.fetch import FetchRequest, FetchServer
 from streamtasks.client.receiver import TopicsReceiver
 from streamtasks.client.signal import SignalServer, send_signal
+from streamtasks.net.messages import AddressedMessage, InTopicsChangedMessage, TopicDataMessage
 from streamtasks.net.serialization import RawData
 from streamtasks.net import ConnectionClosedError, Switch, create_queue_connection
 from streamtasks.services.discovery import DiscoveryWorker
 from streamtasks.services.constants import NetworkPorts, NetworkTopics
+from streamtasks.utils import FlowControlPolicy
 from tests.shared import AddressReceiver, async_timeout
 
 
@@ -25,6 +27,7 @@ class TestClient(unittest.IsolatedAsyncioTestCase):
     self.switch = Switch()
     await self.switch.add_link(conn1[0])
     await self.switch.add_link(conn2[0])
+    self.switch_links = [ conn1[0], conn2[0] ]
 
     self.tasks = []
 
@@ -57,6 +60,7 @@ class TestClient(unittest.IsolatedAsyncioTestCase):
     await self.a.register_out_topics([ 1, 2 ])
 
     async with TopicsReceiver(self.b, [ 1, 2 ]) as b_recv:
+      while not { 1, 2 }.issubset(self.switch_links[1].in_topics): await asyncio.sleep(0.001)
       await self.a.send_stream_data(1, RawData("Hello 1"))
       await self.a.send_stream_data(2, RawData("Hello 2"))
 
@@ -67,6 +71,7 @@ class TestClient(unittest.IsolatedAsyncioTestCase):
       self.assertEqual((recv_data[0], recv_data[1].data), (2, "Hello 2"))
 
       await self.b.unregister_in_topics([ 1 ])
+      while 1 in self.switch_links[1].in_topics: await asyncio.sleep(0.001)
 
       await self.a.send_stream_data(1, RawData("Hello 1"))
       await self.a.send_stream_data(2, RawData("Hello 2"))
@@ -74,6 +79,48 @@ class TestClient(unittest.IsolatedAsyncioTestCase):
       recv_data = await b_recv.get()
       self.assertEqual((recv_data[0], recv_data[1].data), (2, "Hello 2"))
 
+  @async_timeout(1)
+  async def test_in_topic_drop_oldest(self):
+    await self.a.register_out_topics([ 1 ])
+    async with self.b.in_topic(1, max_size=2, policy=FlowControlPolicy.DROP_OLDEST) as in_topic:
+      await in_topic.set_registered(True)
+      await asyncio.sleep(0.001)
+      for i in range(5): await self.a.send_stream_data(1, RawData(i))
+      await asyncio.sleep(0.01)
+      self.assertEqual([ (await in_topic.recv_data()).data for _ in range(2) ], [ 3, 4 ])
+
+  @async_timeout(1)
+  async def test_in_topic_backpressure(self):
+    producer, consumer = await self.create_bounded_client(), await self.create_bounded_client()
+    async with producer.out_topic(1) as out_topic, out_topic.RegisterContext(), consumer.in_topic(1, max_size=2) as in_topic, in_topic.RegisterContext():
+      await out_topic.wait_requested(True)
+
+      async def send_all():
+        for i in range(20): await out_topic.send(RawData(i))
+      send_task = asyncio.create_task(send_all())
+      await asyncio.sleep(0.01)
+      self.assertFalse(send_task.done())
+      self.assertEqual([ (await in_topic.recv_data()).data for _ in range(20) ], list(range(20)))
+      await send_task
+
+  async def create_bounded_client(self):
+    conn = create_queue_connection(raw=True, max_size=2)
+    await self.switch.add_link(conn[0])
+    client = Client(conn[1])
+    client.start()
+    return client
+
+  @async_timeout(1)
+  async def test_receiver_dispatch(self):
+    await self.a.set_address(1)
+    async with TopicsReceiver(self.a, [ 1 ]) as topic_recv, AddressReceiver(self.a, 1, 10) as addr_recv:
+      self.assertEqual(self.a._get_receivers(TopicDataMessage(1, RawData(""))), (topic_recv,))
+      self.assertEqual(self.a._get_receivers(TopicDataMessage(2, RawData(""))), ())
+      self.assertEqual(self.a._get_receivers(AddressedMessage(1, 10, RawData(""))), (addr_recv,))
+      self.assertEqual(set(self.a._get_receivers(InTopicsChangedMessage(set(), set()))), { topic_recv, addr_recv })
+    self.assertEqual(self.a._topic_receivers, {})
+    self.assertEqual(self.a._port_receivers, {})
+
   @async_timeout(1)
   async def test_address(self):
     await self.a.set_address(1)
@@ -113,6 +160,71 @@ class TestClient(unittest.IsolatedAsyncioTestCase):
     b_result = await self.b.fetch(1, "test", "Hello 1")
     self.assertEqual(b_result, "Hello 2")
 
+  @async_timeout(1)
+  async def test_fetch_without_request_id(self):
+    await self.a.set_address(1)
+    await self.b.set_address(2)
+
+    server = FetchServer(self.a)
+
+    @server.route("test")
+    async def _(req: FetchRequest):
+      # NOTE: respond like a server that does not know request ids
+      await self.a.send_to(req._return_endpoint, RawData({ "body": req.body }))
+      req.response_sent = True
+
+    self.tasks.append(asyncio.create_task(server.run()))
+    self.assertEqual(await self.b.fetch(1, "test", "Hello"), "Hello")
+    self.assertEqual(await asyncio.gather(self.b.fetch(1, "test", 1), self.b.fetch(1, "test", 2)), [1, 2])
+
+  @async_timeout(1)
+  async def test_fetch_serial(self):
+    await self.a.set_address(1)
+    await self.b.set_address(2)
+
+    server = FetchServer(self.a)
+    handled: list[str] = []
+
+    @server.route("test")
+    async def _(req: FetchRequest):
+      handled.append(f"start {req.body}")
+      await asyncio.sleep(0)
+      handled.append(f"end {req.body}")
+      await req.respond(req.body)
+
+    self.tasks.append(asyncio.create_task(server.run()))
+    self.assertEqual(await asyncio.gather(self.b.fetch(1, "test", 1), self.b.fetch(1, "test", 2)), [1, 2])
+    self.assertIn(handled, [["start 1", "end 1", "start 2", "end 2"], ["start 2", "end 2", "start 1", "end 1"]]) # the requests did not interleave
+
+  @async_timeout(1)
+  async def test_fetch_concurrent(self):
+    await self.a.set_address(1)
+    await self.b.set_address(2)
+
+    server = FetchServer(self.a, max_concurrency=32)
+    slow_event = asyncio.Event()
+    return_endpoints = set()
+
+    @server.route("slow")
+    async def _(req: FetchRequest):
+      return_endpoints.add(req._return_endpoint)
+      await slow_event.wait()
+      await req.respond("slow")
+
+    @server.route("fast")
+    async def _(req: FetchRequest):
+      return_endpoints.add(req._return_endpoint)
+      await req.respond(req.body)
+
+    self.tasks.append(asyncio.create_task(server.run()))
+
+    slow_task = asyncio.create_task(self.b.fetch(1, "slow", None))
+    self.assertEqual(await asyncio.gather(*(self.b.fetch(1, "fast", i) for i in range(10))), list(range(10)))
+    self.assertFalse(slow_task.done())
+    slow_event.set()
+    self.assertEqual(await slow_task, "slow")
+    self.assertEqual(return_endpoints, { (2, NetworkPorts.DYNAMIC_START) })
+
   @async_timeout(1000)
   async def test_signal_server(self):
     await self.a.set_address(1)
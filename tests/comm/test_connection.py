@@ -1,9 +1,10 @@
 import asyncio
 import os
+import socket
 import tempfile
 import unittest
 from streamtasks.client import Client
-from streamtasks.connection import connect, create_server
+from streamtasks.connection import RawStreamConnection, connect, create_server
 from streamtasks.net import ConnectionClosedError, Switch
 from streamtasks.net.serialization import RawData
 from streamtasks.message.types import TextMessage
@@ -54,6 +55,27 @@ class TestConnection(unittest.IsolatedAsyncioTestCase):
 
     if os.path.exists(sock_path): os.unlink(sock_path)
 
+class TestRawStreamConnection(unittest.IsolatedAsyncioTestCase):
+  @async_timeout(1)
+  async def test_coalesced_send(self):
+    sock_a, sock_b = socket.socketpair()
+    conn_a = RawStreamConnection(*await asyncio.open_connection(sock=sock_a))
+    conn_b = RawStreamConnection(*await asyncio.open_connection(sock=sock_b))
+    messages = [ str(i).encode("utf-8") * (i + 1) for i in range(100) ]
+    for message in messages: await conn_a.send(message)
+    for message in messages: self.assertEqual(await conn_b.recv(), message)
+    conn_a.close()
+    conn_b.close()
+
+  @async_timeout(1)
+  async def test_resync(self):
+    reader = asyncio.StreamReader(limit=16)
+    frame = RawStreamConnection.FRAME_HEADER.pack(RawStreamConnection.SYNC_WORD, 5) + b"Hello"
+    reader.feed_data(b"\x00" * 100 + RawStreamConnection.SYNC_WORD[:2] + frame + frame[:3] + frame)
+    conn = RawStreamConnection(reader, None)
+    self.assertEqual(await conn.recv(), b"Hello")
+    self.assertEqual(await conn.recv(), b"Hello")
+
 class TestConnectionAuth(unittest.IsolatedAsyncioTestCase):
   async def asyncSetUp(self):
     self.auth_token = "ABC"
@@ -0,0 +1,28 @@
+import unittest
+import msgpack
+from streamtasks.message.utils import get_timestamp_from_message
+from streamtasks.net.serialization import RawData, find_map_value
+
+
+class TestSerialization(unittest.TestCase):
+  def test_find_map_value(self):
+    values = [ None, True, -1, 200, -70000, 2**63, 1.5, "x" * 300, b"x" * 70000, [ 1, [ 2 ] ], list(range(70000)), { "a": { "b": 1 } }, msgpack.ExtType(1, b"abcd") ]
+    data = { f"key{i}": value for i, value in enumerate(values) }
+    raw = msgpack.packb(data)
+    for key, value in data.items(): self.assertEqual(find_map_value(raw, key), value)
+    with self.assertRaises(KeyError): find_map_value(raw, "missing")
+    with self.assertRaises(ValueError): find_map_value(msgpack.packb([ 1 ]), "key0")
+
+  def test_raw_data_get(self):
+    data = RawData(msgpack.packb({ "data": b"x" * 4096, "timestamp": 42 }))
+    self.assertEqual(data.get("timestamp"), 42)
+    self.assertEqual(get_timestamp_from_message(data), 42)
+    self.assertIsNone(data._data, "the data must not be deserialized")
+
+    self.assertEqual(RawData({ "timestamp": 1.5 }).get("timestamp"), 1.5)
+    with self.assertRaises(KeyError): RawData(msgpack.packb([ 1 ])).get("timestamp")
+    with self.assertRaises(ValueError): get_timestamp_from_message(RawData({ "value": 1 }))
+
+
+if __name__ == '__main__':
+  unittest.main()
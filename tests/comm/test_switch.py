@@ -2,7 +2,7 @@ import unittest
 import asyncio
 from streamtasks.net.serialization import RawData
 
-from streamtasks.net import Link, Switch, TopicRemappingLink, create_queue_connection
+from streamtasks.net import ConnectionClosedError, Link, Switch, TopicRemappingLink, create_queue_connection
 from streamtasks.net.messages import InTopicsChangedMessage, OutTopicsChangedMessage, OutTopicsChangedRecvMessage, PricedId, TopicDataMessage
 from tests.shared import async_timeout
 
@@ -26,6 +26,8 @@ class TestSwitch(unittest.IsolatedAsyncioTestCase):
     self.b = conn2[1]
     self.tasks = []
 
+  def wrap_link(self, link: Link): return link
+
   async def asyncTearDown(self):
     for task in self.tasks: task.cancel()
     for task in self.tasks:
@@ -113,6 +115,35 @@ class TestSwitch(unittest.IsolatedAsyncioTestCase):
     self.assertIsInstance(received, InTopicsChangedMessage)
     self.assertIn(1, received.remove)
 
+  @async_timeout(1)
+  async def test_fan_out(self):
+    conn3 = create_queue_connection(raw=True)
+    await self.switch.add_link(conn3[0])
+    c = self.wrap_link(conn3[1])
+
+    await self.a.send(OutTopicsChangedMessage(set([ PricedId(1, 0) ]), set()))
+    await self.b.recv()
+    await c.recv()
+
+    await self.b.send(InTopicsChangedMessage(set([1]), set()))
+    await c.send(InTopicsChangedMessage(set([1]), set()))
+    await self.a.recv()
+
+    await self.a.send(TopicDataMessage(1, RawData("Hello")))
+    self.assertEqual((await self.b.recv()).data.data, "Hello")
+    self.assertEqual((await c.recv()).data.data, "Hello")
+
+    await c.send(InTopicsChangedMessage(set(), set([1])))
+    while 1 in conn3[0].in_topics: await asyncio.sleep(0.001)
+
+    await self.a.send(TopicDataMessage(1, RawData("World")))
+    self.assertEqual((await self.b.recv()).data.data, "World")
+    self.assertTrue(conn3[1].in_messages.empty())
+
+    self.b.close()
+    while len(self.switch.link_manager.links) != 2: await asyncio.sleep(0.001)
+    self.assertNotIn(1, self.switch._topic_links)
+
   @async_timeout(1)
   async def test_close(self):
     self.a.close()
@@ -123,6 +154,17 @@ class TestSwitch(unittest.IsolatedAsyncioTestCase):
     while len(self.switch.link_manager.links) != 0: await asyncio.sleep(0.001)
     self.assertEqual(len(self.switch.link_manager.links), 0)
 
+  @async_timeout(1)
+  async def test_close_interrupts_recv(self):
+    async def recv():
+      with self.assertRaises(ConnectionClosedError): await self.a.recv()
+      return asyncio.current_task().cancelling()
+
+    task = asyncio.create_task(recv())
+    await asyncio.sleep(0.001)
+    self.a.close()
+    self.assertEqual(await task, 0) # the cancellation by close must not leak into the receiving task
+
   @async_timeout(1)
   async def test_close_reverse(self):
     for link in self.switch.link_manager.links: link.close()
@@ -132,12 +174,21 @@ class TestSwitch(unittest.IsolatedAsyncioTestCase):
 class TestSwitchRemapped(TestSwitch):
   async def asyncSetUp(self):
     await super().asyncSetUp()
-    topic_map = { 1: 9000, 2: 9001 }
-    self.a = TopicRemappingLink(self.a, topic_map)
-    self.b = TopicRemappingLink(self.b, topic_map)
+    self.a = self.wrap_link(self.a)
+    self.b = self.wrap_link(self.b)
+
+  def wrap_link(self, link: Link): return TopicRemappingLink(link, { 1: 9000, 2: 9001 })
 
   @unittest.skip("not supported for remapped links")
   async def test_standard_workflow(self): pass
 
+  async def test_remap_unmapped(self):
+    link = self.wrap_link(create_queue_connection()[0])
+    message = TopicDataMessage(5, RawData("Hello"))
+    self.assertIs(link._remap_message(message, link._topic_id_map), message)
+    self.assertEqual(link._remap_message(message, { 5: 6 }).topic, 6)
+    message = OutTopicsChangedMessage(set([ PricedId(5, 1) ]), set([ 1 ]))
+    self.assertEqual(link._remap_message(message, link._topic_id_map), OutTopicsChangedMessage(set([ PricedId(5, 1) ]), set([ 9000 ])))
+
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,50 @@
+from fractions import Fraction
+import unittest
+import numpy as np
+from streamtasks.media.util import AudioChunker, AudioSequencer, PaddedAudioChunker, SampleBuffer
+
+class TestAudioBuffers(unittest.TestCase):
+  def test_sample_buffer(self):
+    buffer = SampleBuffer()
+    expected = np.arange(0, dtype=np.int16)
+    for i in range(100):
+      samples = np.arange(i * 50, (i + 1) * 50, dtype=np.int16)
+      buffer.push(samples)
+      expected = np.concatenate((expected, samples))
+      buffer.drop(30)
+      expected = expected[30:]
+      self.assertTrue(np.array_equal(buffer.data, expected))
+    self.assertLess(buffer._storage.shape[0], 4096) # NOTE: moves the samples to the front instead of growing
+
+  def test_chunker(self):
+    chunker = AudioChunker(100, 1000)
+    samples = np.arange(1000, dtype=np.float32)
+    chunks = [ (chunk.copy(), timestamp) for i in range(0, 1000, 70) for chunk, timestamp in chunker.next(samples[i:i + 70], i) ]
+    self.assertEqual([ timestamp for _, timestamp in chunks ], list(range(0, 900, 100)))
+    self.assertTrue(np.array_equal(np.concatenate([ chunk for chunk, _ in chunks ]), samples[:900]))
+
+  def test_padded_chunker(self):
+    chunker = PaddedAudioChunker(100, 1000, 10)
+    samples = np.arange(500, dtype=np.float32)
+    chunks = [ chunk.copy() for chunk, _ in chunker.next(samples, 0) ]
+    self.assertEqual(len(chunks), 4)
+    for i, chunk in enumerate(chunks): self.assertTrue(np.array_equal(chunk, samples[i * 100:i * 100 + 120]))
+    self.assertTrue(np.array_equal(chunker.strip_padding(chunks[1]), samples[110:210]))
+
+  def test_sequencer_gap(self):
+    sequencer = AudioSequencer(1000, 1, 0)
+    sequencer.insert(Fraction(0), np.ones((100, 2), dtype=np.int16))
+    sequencer.insert(Fraction(150, 1000), np.full((100, 2), 2, dtype=np.int16)) # NOTE: the gap is filled with silence
+    self.assertEqual(sequencer.get_max_samples(Fraction(0)), 250)
+    samples = sequencer.pop_start(Fraction(-10, 1000), 260)
+    self.assertTrue(np.array_equal(samples[:, 0], np.concatenate((np.zeros(10), np.ones(100), np.zeros(50), np.full(100, 2)))))
+    self.assertEqual(sequencer.start_time, Fraction(250, 1000))
+
+  def test_sequencer_overlap(self):
+    sequencer = AudioSequencer(1000, 1, 0)
+    sequencer.insert(Fraction(0), np.ones((100, 1), dtype=np.int16))
+    sequencer.insert(Fraction(50, 1000), np.full((100, 1), 2, dtype=np.int16)) # NOTE: the overlap is dropped
+    self.assertTrue(np.array_equal(sequencer.pop_start(Fraction(0), 150)[:, 0], np.concatenate((np.ones(100), np.full(50, 2)))))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import unittest
+from streamtasks.media.codec import CodecWorker
+
+
+class TestCodecWorker(unittest.IsolatedAsyncioTestCase):
+  async def test_thread_affine(self):
+    worker = CodecWorker()
+    thread_ids = await asyncio.gather(*(worker.run(threading.get_ident) for _ in range(10)))
+    self.assertEqual(len(set(thread_ids)), 1)
+    self.assertNotEqual(thread_ids[0], threading.get_ident())
+    worker.close()
+
+  async def test_order_and_errors(self):
+    worker = CodecWorker()
+    results: list[int] = []
+    def fail(): raise ValueError()
+    futs = [ worker.run(results.append, i) for i in range(5) ]
+    with self.assertRaises(ValueError): await worker.run(fail)
+    await asyncio.gather(*futs)
+    self.assertEqual(results, list(range(5)))
+
+    closed = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    worker.close(lambda: loop.call_soon_threadsafe(closed.set))
+    await asyncio.wait_for(closed.wait(), 1)
+    with self.assertRaises(ValueError): worker.run(fail)
+
+  async def test_close_in_batch(self):
+    worker = CodecWorker()
+    started, release = threading.Event(), threading.Event()
+    def block():
+      started.set()
+      release.wait()
+    blocked = worker.run(block)
+    await asyncio.to_thread(started.wait)
+    futs = [ worker.run(lambda i=i: i) for i in range(3) ] # NOTE: these and the final job end up in one batch
+    closed = threading.Event()
+    worker.close(closed.set)
+    release.set()
+    self.assertEqual(await asyncio.wait_for(asyncio.gather(*futs), 1), [0, 1, 2])
+    await blocked
+    self.assertTrue(await asyncio.to_thread(closed.wait, 1))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from streamtasks.media.pool import FrameBufferPool, copy_to_buffer
+
+class TestFrameBufferPool(unittest.TestCase):
+  def test_reuse(self):
+    pool = FrameBufferPool(max_free=1)
+    with pool.borrow((4, 4, 3)) as buffer:
+      self.assertFalse(buffer.any())
+      buffer[0, 0, 0] = 1
+    self.assertIs(pool.acquire((4, 4, 3)), buffer)
+    self.assertIsNot(pool.acquire((4, 4, 3)), buffer)
+    self.assertEqual(pool.acquire((4, 4, 3), np.float32).dtype, np.float32)
+
+  def test_max_free(self):
+    pool = FrameBufferPool(max_free=1)
+    a, b = pool.acquire((2,)), pool.acquire((2,))
+    pool.release(a)
+    pool.release(b)
+    self.assertIs(pool.acquire((2,)), a)
+    self.assertIsNot(pool.acquire((2,)), b)
+
+  def test_copy_to_buffer(self):
+    array = np.arange(24, dtype=np.uint8).reshape((4, 6))[:, :3] # NOTE: not contiguous
+    buffer = bytearray(array.nbytes)
+    copy_to_buffer(array, memoryview(buffer))
+    self.assertEqual(bytes(buffer), array.tobytes("C"))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,73 @@
+from multiprocessing import resource_tracker
+import unittest
+import numpy as np
+from streamtasks.media import shm
+from streamtasks.media.shm import SharedFramePool, SharedFrameReader
+
+class TestSharedFrames(unittest.TestCase):
+  def setUp(self):
+    self.pool = SharedFramePool(slot_count=2)
+    self.reader = SharedFrameReader()
+
+  def tearDown(self):
+    self.reader.close()
+    self.pool.close()
+
+  def test_read_write(self):
+    data = np.arange(64, dtype=np.uint8)
+    frame = self.reader.read_message(self.pool.create_message(1, data).model_dump())
+    self.assertEqual(frame.timestamp, 1)
+    self.assertEqual(bytes(frame.data), data.tobytes())
+    self.assertTrue(self.reader.is_valid(frame))
+
+  def test_overwritten(self):
+    message = self.pool.create_message(1, b"\x01" * 16).model_dump()
+    frame = self.reader.read_message(message)
+    self.pool.write(b"\x02" * 16)
+    self.assertTrue(self.reader.is_valid(frame))
+    self.pool.write(b"\x03" * 16)
+    self.assertFalse(self.reader.is_valid(frame))
+    with self.assertRaises(ValueError): self.reader.read_message(message)
+
+  def test_reallocate(self):
+    message = self.pool.create_message(1, b"\x01" * 16).model_dump()
+    self.pool.write(b"\x02" * 32)
+    with self.assertRaises(ValueError): self.reader.read_message(message)
+
+  def test_discard(self):
+    message = self.pool.create_message(1, b"\x01" * 16).model_dump()
+    frame = self.reader.read_message(message)
+    discarded = self.pool.create_message(2, b"\x02" * 16).model_dump()
+    self.pool.discard(self.reader.read_message(discarded).handle)
+    with self.assertRaises(ValueError): self.reader.read_message(discarded)
+    self.pool.write(b"\x03" * 16) # reuses the discarded slot
+    self.assertTrue(self.reader.is_valid(frame))
+
+  def test_segment_eviction(self):
+    reader = SharedFrameReader(max_segments=2)
+    pools = [ SharedFramePool(slot_count=1) for _ in range(4) ]
+    try:
+      frames = []
+      for idx, pool in enumerate(pools):
+        message = pool.create_message(idx, bytes([idx]) * 16)
+        shm._owned_segments.pop(pool.name) # NOTE: read the segment like a reader in another process
+        frames.append(reader.read_message(message.model_dump()))
+        self.assertLessEqual(len(reader._segments), 2)
+      self.assertEqual(list(reader._segments), [ pools[2].name, pools[3].name ])
+      self.assertEqual(bytes(frames[0].data), b"\x00" * 16) # evicted segments stay mapped while their frames are in use
+      self.assertTrue(reader.is_valid(frames[0])) # and are opened again when needed
+      frames.clear()
+    finally:
+      reader.close()
+      for pool in pools:
+        resource_tracker.register("/" + pool.name, "shared_memory") # NOTE: the reader unregistered the segment in the tracker shared with the pool
+        pool.close()
+    self.assertEqual(len(shm._unclosed_segments), 0)
+
+  def test_bytes_message(self):
+    frame = self.reader.read_message({ "timestamp": 1, "data": b"\x01\x02" })
+    self.assertEqual(frame.data, b"\x01\x02")
+    self.assertTrue(self.reader.is_valid(frame))
+
+if __name__ == '__main__':
+  unittest.main()
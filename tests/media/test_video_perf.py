@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from streamtasks.media.video_perf import composite_images, merge_images
+
+
+def reference_merge(images: list[bytes], alpha_front: bool):
+  out = np.zeros((len(images[0]) // 4, 4), dtype=np.uint32)
+  alpha_idx, color_idx = (0, slice(1, 4)) if alpha_front else (3, slice(0, 3))
+  out[:, alpha_idx] = 255
+  for image in images:
+    pixels = np.frombuffer(image, dtype=np.uint8).reshape(-1, 4).astype(np.uint32)
+    alpha = pixels[:, alpha_idx:alpha_idx + 1]
+    out[:, color_idx] = ((255 - alpha) * out[:, color_idx] + alpha * pixels[:, color_idx]) // 255
+  return out.astype(np.uint8).tobytes()
+
+class TestVideoPerf(unittest.TestCase):
+  def test_merge_images(self):
+    rng = np.random.default_rng(0)
+    for alpha_front in (True, False):
+      for pixel_count in (1, 7, 100_003):
+        images = [ rng.integers(0, 256, pixel_count * 4, dtype=np.uint8).tobytes() for _ in range(3) ]
+        expected = reference_merge(images, alpha_front)
+        self.assertEqual(merge_images(images, alpha_front), expected)
+
+        out = bytearray(len(expected))
+        composite_images(out, images, alpha_front)
+        self.assertEqual(bytes(out), expected)
+
+  def test_composite_repeated(self):
+    rng = np.random.default_rng(1)
+    for idx in range(200):
+      pixel_count = int(rng.integers(16384, 16384 * 6)) # several blocks, so that the thread pool is used
+      images = [ rng.integers(0, 256, pixel_count * 4, dtype=np.uint8).tobytes() for _ in range(2) ]
+      out = bytearray(pixel_count * 4)
+      composite_images(out, images, idx % 2 == 0)
+      if idx % 20 == 0: self.assertEqual(bytes(out), reference_merge(images, idx % 2 == 0))
+
+  def test_composite_readonly(self):
+    with self.assertRaises(BufferError): composite_images(b"\0" * 4, [ b"\0" * 4 ], True)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -22,6 +22,11 @@ class AddressReceiver(Receiver[tuple[int, RawData]]):
     self._address = address
     self._port = port
 
+  @property
+  def dispatch_topics(self): return ()
+  @property
+  def dispatch_ports(self): return (self._port,)
+
   def on_message(self, message: Message):
     if not isinstance(message, AddressedMessage): return
     a_message: AddressedMessage = message
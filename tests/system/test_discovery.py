@@ -1,5 +1,7 @@
+import os
+import tempfile
 import unittest
-from streamtasks.client.discovery import address_name_context, delete_topic_space, get_topic_space, get_topic_space_translation, register_topic_space, request_addresses, wait_for_address_name, wait_for_topic_signal
+from streamtasks.client.discovery import DiscoveryConstants, DiscoveryLeases, RegisterAddressNameRequestBody, address_name_context, delete_topic_space, get_topic_space, get_topic_space_translation, register_topic_space, request_addresses, wait_for_address_name, wait_for_topic_signal
 from streamtasks.client.fetch import FetchError
 from streamtasks.net import ConnectionClosedError, Switch, create_queue_connection
 from streamtasks.services.constants import NetworkAddresses, NetworkTopics
@@ -36,6 +38,52 @@ class TestWorkers(unittest.IsolatedAsyncioTestCase):
     client.start()
     return client
 
+  @async_timeout(1)
+  async def test_attached_worker(self):
+    switch = Switch()
+    worker = DiscoveryWorker()
+    worker.attach(switch)
+    worker_task = asyncio.create_task(worker.run())
+    client = Client(await switch.add_local_connection())
+    client.start()
+    await wait_for_topic_signal(client, NetworkTopics.DISCOVERY_SIGNAL)
+    self.assertEqual(await client.request_address(), NetworkAddresses.COUNTER_INIT)
+    self.assertEqual(len(switch.link_manager.links), 2)
+
+    worker_task.cancel()
+    try: await worker_task
+    except asyncio.CancelledError: pass
+    while len(switch.link_manager.links) != 1: await asyncio.sleep(0.001)
+    self.assertEqual(len(switch.link_manager.links), 1) # the switch keeps serving the client
+    switch.stop_receiving()
+
+  @async_timeout(1)
+  async def test_persistent_state(self):
+    with tempfile.TemporaryDirectory() as data_dir:
+      filename = os.path.join(data_dir, "discovery.json")
+      for restart in range(2):
+        switch = Switch()
+        worker = DiscoveryWorker(filename)
+        worker.attach(switch)
+        worker_task = asyncio.create_task(worker.run())
+        client = Client(await switch.add_local_connection())
+        client.start()
+        await wait_for_topic_signal(client, NetworkTopics.DISCOVERY_SIGNAL)
+        await client.request_address()
+        if restart == 0:
+          addresses = await request_addresses(client, 2)
+          topic_space_id, _ = await register_topic_space(client, [ 1, 2 ])
+          await client.fetch(NetworkAddresses.ID_DISCOVERY, DiscoveryConstants.FD_REGISTER_ADDRESS_NAME, RegisterAddressNameRequestBody(address_name="named", address=1337).model_dump())
+        else:
+          self.assertTrue(addresses.isdisjoint(await request_addresses(client, 2)))
+          self.assertIsNone(await client.resolve_address_name("named")) # the owner of the name may be gone
+          self.assertEqual(len(await get_topic_space(client, topic_space_id)), 2)
+
+        worker_task.cancel()
+        try: await worker_task
+        except asyncio.CancelledError: pass
+        switch.stop_receiving()
+
   @async_timeout(1)
   async def test_address_discovery(self):
     client = await self.create_client()
@@ -125,6 +173,24 @@ class TestWorkers(unittest.IsolatedAsyncioTestCase):
     self.assertEqual(expected_topics, topics)
     self.assertEqual(set(expected_topics), client._out_topics.items())
 
+  @async_timeout(1)
+  async def test_leases(self):
+    client = await self.create_client()
+    await wait_for_topic_signal(client, NetworkTopics.DISCOVERY_SIGNAL)
+    await client.request_address()
+    leases = DiscoveryLeases(client, address_batch_size=4, topic_id_batch_size=4)
+
+    leased_clients = [ Client(await self.create_link(), leases) for _ in range(6) ]
+    for leased_client in leased_clients: leased_client.start()
+    addresses = await asyncio.gather(*(leased_client.request_address() for leased_client in leased_clients))
+    self.assertEqual(addresses, list(range(NetworkAddresses.COUNTER_INIT + 1, NetworkAddresses.COUNTER_INIT + 7)))
+
+    self.assertEqual(await leased_clients[0].request_topic_ids(3), list(range(NetworkTopics.COUNTER_INIT, NetworkTopics.COUNTER_INIT + 3)))
+    self.assertEqual(await leased_clients[1].request_topic_ids(2), list(range(NetworkTopics.COUNTER_INIT + 3, NetworkTopics.COUNTER_INIT + 5)))
+    self.assertEqual(await client.request_topic_ids(1), [ NetworkTopics.COUNTER_INIT + 8 ]) # the lease holds the remaining ids of the second batch
+
+    self.assertEqual(await request_addresses(client, 1), { NetworkAddresses.COUNTER_INIT + 9 })
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -7,7 +7,7 @@ from streamtasks.client.fetch import FetchError
 from streamtasks.net import ConnectionClosedError, Switch
 from streamtasks.net.serialization import RawData
 from streamtasks.services.constants import NetworkAddressNames, NetworkTopics
-from streamtasks.system.task import Task, TaskHost, TaskHostRegistrationList, TaskManager, TaskManagerClient, TaskStatus
+from streamtasks.system.task import Task, TaskHost, TaskHostRegistrationList, TaskManager, TaskManagerClient, TaskStatus, TMTaskScheduleRequest, TMTaskScheduleStartRequest, TMTaskStartRequest
 from streamtasks.system.task_web import TaskWebBackend
 from streamtasks.client import Client
 from streamtasks.services.discovery import DiscoveryWorker
@@ -113,6 +113,23 @@ class TestTaskSystem(unittest.IsolatedAsyncioTestCase):
     self.assertIsNone(updated_task.error)
     self.assertEqual(updated_task.id, task.id)
 
+  @async_timeout(1)
+  async def test_bulk_start(self):
+    await self.demo_task_host.register()
+    tasks = await self.tm_client.schedule_start_tasks([ TMTaskScheduleStartRequest(host_id=self.demo_task_host.id, config=None) for _ in range(3) ])
+    scheduled_tasks = await self.tm_client.schedule_tasks([ TMTaskScheduleRequest(host_id=self.demo_task_host.id) for _ in range(2) ])
+    self.assertTrue(all(task.status is TaskStatus.scheduled for task in scheduled_tasks))
+    tasks += await self.tm_client.start_tasks([ TMTaskStartRequest(id=task.id, config=None) for task in scheduled_tasks ])
+    self.assertEqual([ task.id for task in tasks[3:] ], [ task.id for task in scheduled_tasks ])
+    self.assertTrue(all(task.status is TaskStatus.running and task.error is None for task in tasks))
+    self.assertEqual(set(self.demo_task_host.tasks.keys()), set(task.id for task in tasks))
+
+    with self.assertRaises(FetchError): # nothing is started, if one of the requests is invalid
+      await self.tm_client.schedule_start_tasks([ TMTaskScheduleStartRequest(host_id=self.demo_task_host.id, config=None), TMTaskScheduleStartRequest(host_id="missing", config=None) ])
+    self.assertEqual(len(self.demo_task_host.tasks), 5)
+
+    for task in tasks: await self.tm_client.cancel_task_wait(task.id)
+
   @async_timeout(1)
   async def test_topic_spaces(self):
     ts_id, ts_map = await register_topic_space(self.client, {1337})
@@ -1,6 +1,6 @@
 import unittest
 from .shared import TaskTestBase
-from streamtasks.system.tasks.calculator import CalculatorGrammar, CalculatorEvalContext, CalculatorEvalTransformer
+from streamtasks.system.tasks.calculator import CalculatorExpression, CalculatorGrammar, CalculatorEvalContext, CalculatorEvalTransformer
 import math
 
 
@@ -14,6 +14,25 @@ class TestCalculator(TaskTestBase):
 
     self.assertEqual(transformer.transform(res), math.sin(1) + 2)
 
+  def test_compiled(self):
+    formulas = [ "sin(a)+b", "a > b ? -a : +b", "!a & b | a ^ b", "max(a, b, 3) ** 2 % 5 / 2", "(a - b) * pi >= e", "a == b", "a != b <= 1", "1e400 + a", "-1e400 * b" ]
+    values = [ { "a": 1.0, "b": 2.0 }, { "a": 0.3, "b": 0.9 }, { "a": 2.0, "b": 2.0 } ]
+    for formula in formulas:
+      ast = CalculatorGrammar.parse(formula)
+      expression = CalculatorExpression(ast)
+      expected = [ CalculatorEvalTransformer(CalculatorEvalContext(v)).transform(ast) for v in values ]
+      self.assertEqual([ expression.evaluate(v) for v in values ], expected, formula)
+      self.assertEqual(expression.evaluate_batch(values), expected, formula)
+
+  def test_compiled_non_finite(self):
+    self.assertEqual(CalculatorExpression(CalculatorGrammar.parse("1e400")).evaluate({}), math.inf)
+    self.assertEqual(CalculatorExpression(CalculatorGrammar.parse("-1e400")).evaluate({}), -math.inf)
+    self.assertTrue(math.isnan(CalculatorExpression(CalculatorGrammar.parse("1e400 - 1e400")).evaluate({})))
+
+  def test_compiled_names(self):
+    with self.assertRaises(KeyError): CalculatorExpression(CalculatorGrammar.parse("a + 1")).evaluate({})
+    with self.assertRaises(AttributeError): CalculatorExpression(CalculatorGrammar.parse("__import__(1)"))
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,88 @@
+from contextlib import asynccontextmanager
+import threading
+import unittest
+from streamtasks.client import Client
+from streamtasks.net.serialization import RawData
+from streamtasks.system.task import SyncTask
+from streamtasks.utils import FlowControlPolicy, SyncQueue, context_task
+from tests.shared import async_timeout
+from .shared import TaskTestBase, run_task
+import asyncio
+
+
+class EchoTask(SyncTask):
+  def __init__(self, client: Client):
+    super().__init__(client)
+    self.in_topic = self.client.in_topic(100)
+    self.out_topic = self.client.out_topic(101)
+    self.message_queue: SyncQueue[int] = self.create_queue()
+
+  @asynccontextmanager
+  async def init(self):
+    async with self.in_topic, self.in_topic.RegisterContext(), self.out_topic, self.out_topic.RegisterContext(), context_task(self._run_receiver()):
+      self.client.start()
+      yield
+
+  async def _run_receiver(self):
+    while True: self.message_queue.put((await self.in_topic.recv_data()).data)
+
+  def run_sync(self):
+    for value in self.message_queue:
+      for i in range(3): self.send_data(self.out_topic, RawData(value * 3 + i))
+
+class StalledTask(EchoTask):
+  """bounds its inputs like the media tasks do, the sync thread stalls until it is released."""
+  def __init__(self, client: Client, max_size: int):
+    super().__init__(client)
+    self.in_topic = self.client.in_topic(100, max_size=max_size, policy=FlowControlPolicy.DROP_OLDEST)
+    self.message_queue = self.create_queue(max_size)
+    self.last_received: int | None = None
+    self.release_event = threading.Event()
+
+  async def _run_receiver(self):
+    while True:
+      self.last_received = (await self.in_topic.recv_data()).data
+      self.message_queue.put(self.last_received)
+
+  def run_sync(self):
+    self.release_event.wait()
+    for value in self.message_queue: self.send_data(self.out_topic, RawData(value))
+
+
+class TestSyncTask(TaskTestBase):
+  @async_timeout(5)
+  async def test_echo(self):
+    task = asyncio.create_task(run_task(EchoTask(self.worker_client)))
+    self.client.start()
+    async with self.client.out_topic(100) as out_topic, out_topic.RegisterContext(), self.client.in_topic(101) as in_topic, in_topic.RegisterContext():
+      await out_topic.wait_requested()
+      for i in range(10): await out_topic.send(RawData(i))
+      self.assertEqual([ (await in_topic.recv_data()).data for _ in range(30) ], list(range(30)))
+
+    task.cancel()
+    await asyncio.wait([ task ], timeout=1)
+    self.assertTrue(task.done()) # NOTE: the sync thread stops without polling
+
+  @async_timeout(5)
+  async def test_bounded_stalled(self):
+    stalled_task = StalledTask(self.worker_client, 4)
+    task = asyncio.create_task(run_task(stalled_task))
+    self.client.start()
+    async with self.client.out_topic(100) as out_topic, out_topic.RegisterContext(), self.client.in_topic(101) as in_topic, in_topic.RegisterContext():
+      await out_topic.wait_requested()
+      for i in range(100):
+        await out_topic.send(RawData(i))
+        self.assertLessEqual(stalled_task.message_queue.qsize(), 4)
+      while stalled_task.last_received != 99: await asyncio.sleep(0.001)
+      self.assertLessEqual(stalled_task.message_queue.qsize(), 4)
+      self.assertEqual(stalled_task.message_queue.dropped_count + stalled_task.in_topic._receiver._recv_queue.dropped_count, 96)
+
+      stalled_task.release_event.set()
+      self.assertEqual([ (await in_topic.recv_data()).data for _ in range(4) ], [ 96, 97, 98, 99 ]) # only the newest messages are kept
+
+    task.cancel()
+    await asyncio.wait([ task ], timeout=1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,15 @@
+import unittest
+from tests.benchmarks import load_benchmarks, run_benchmark
+
+
+class TestBenchmarks(unittest.IsolatedAsyncioTestCase):
+  async def test_benchmarks_run(self):
+    for name, bench in load_benchmarks().items():
+      with self.subTest(name):
+        result = await run_benchmark(bench, repeat=1, scale=0.01, warmup=False)
+        self.assertEqual(len(result.durations), 1)
+        self.assertGreater(result.ops_per_second, 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+import unittest
+from pydantic import ValidationError
+from streamtasks.message.codec import MessageCodec, NumberMessageCodec, TimestampChuckMessageCodec, TimestampSharedChuckMessageCodec
+from streamtasks.message.types import NumberMessage, SharedMemoryHandle, TimestampChuckMessage, TimestampMessage, TimestampSharedChuckMessage
+
+@dataclass
+class Packet:
+  data: bytes
+  is_keyframe: bool
+
+class PacketMessage(TimestampMessage):
+  packet: Packet
+
+
+class TestCodec(unittest.TestCase):
+  def test_decode(self):
+    self.assertEqual(TimestampChuckMessageCodec.decode({ "timestamp": 1, "data": b"abc" }), TimestampChuckMessage(timestamp=1, data=b"abc"))
+    self.assertEqual(NumberMessageCodec.decode({ "timestamp": 1, "value": 2 }), NumberMessage(timestamp=1, value=2.0))
+    with self.assertRaises(ValidationError): TimestampChuckMessageCodec.decode({ "timestamp": 1 })
+    with self.assertRaises(ValidationError): NumberMessageCodec.decode(None)
+
+  def test_encode(self):
+    message = TimestampSharedChuckMessage(timestamp=1, handle=SharedMemoryHandle(name="test", slot=1, generation=2, size=3))
+    self.assertEqual(TimestampSharedChuckMessageCodec.encode(message), message.model_dump())
+    self.assertEqual(TimestampSharedChuckMessageCodec.decode(TimestampSharedChuckMessageCodec.encode(message)), message)
+
+  def test_nested_dataclass(self):
+    codec = MessageCodec(PacketMessage)
+    message = PacketMessage(timestamp=1, packet=Packet(b"abc", True))
+    self.assertEqual(codec.encode(message), message.model_dump())
+    self.assertEqual(codec.decode(codec.encode(message)), message)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from uuid import uuid4
+from pydantic import UUID4, BaseModel, TypeAdapter
+from streamtasks.pydanticdb import PydanticDB
+
+class Entry(BaseModel):
+  id: UUID4
+  group: str
+  value: int
+
+class TestPydanticDB(unittest.TestCase):
+  def setUp(self):
+    self.data_dir = tempfile.TemporaryDirectory()
+    self.filename = os.path.join(self.data_dir.name, "entries.json")
+
+  def tearDown(self): self.data_dir.cleanup()
+
+  def create_db(self): return PydanticDB(Entry, self.filename, indexes=["group"])
+
+  def test_index(self):
+    db = self.create_db()
+    a, b, c = Entry(id=uuid4(), group="a", value=0), Entry(id=uuid4(), group="b", value=1), Entry(id=uuid4(), group="a", value=2)
+    for entry in (a, b, c): db.put(entry)
+    self.assertEqual(db.get(b.id), b)
+    self.assertEqual(db.find("group", "a"), [a, c])
+
+    db.put(Entry(id=a.id, group="b", value=3))
+    self.assertEqual(db.find("group", "a"), [c])
+    self.assertEqual([ e.value for e in db.find("group", "b") ], [1, 3])
+
+    db.delete(c.id)
+    self.assertNotIn(c.id, db)
+    self.assertEqual(db.find("group", "a"), [])
+    with self.assertRaises(KeyError): db.get(c.id)
+
+  def test_snapshots(self):
+    db = self.create_db()
+    entry = Entry(id=uuid4(), group="a", value=0)
+    db.put(entry)
+    entry.value = 1
+    self.assertEqual(db.get(entry.id).value, 0) # the stored entry is a copy
+    entries = db.entries
+    self.assertIs(db.entries, entries) # reads share one snapshot until the next write
+    db.put(entry)
+    self.assertEqual(entries[0].value, 0) # writes do not change older snapshots
+    self.assertEqual(db.entries[0].value, 1)
+
+  def test_journal(self):
+    db = self.create_db()
+    entries = [ Entry(id=uuid4(), group="a", value=i) for i in range(3) ]
+    for entry in entries: db.put(entry)
+    db.delete(entries[1].id)
+    self.assertFalse(os.path.exists(self.filename)) # only the journal was written
+    self.assertEqual(self.create_db().entries, (entries[0], entries[2]))
+    self.assertTrue(os.path.exists(self.filename)) # loading compacted the journal
+
+  def test_compaction(self):
+    db = self.create_db()
+    id = uuid4()
+    for i in range(100): db.put(Entry(id=id, group="a", value=i))
+    self.assertLess(os.path.getsize(db._journal_filename), 64 * 100)
+    self.assertEqual(self.create_db().entries, (Entry(id=id, group="a", value=99),))
+
+  def test_incomplete_record(self):
+    db = self.create_db()
+    entry = Entry(id=uuid4(), group="a", value=0)
+    db.put(entry)
+    with open(db._journal_filename, "ab") as fd: fd.write(b'{"put":{"id":')
+    db = self.create_db()
+    self.assertEqual(db.entries, (entry,))
+    entry2 = Entry(id=uuid4(), group="b", value=1)
+    db.put(entry2)
+    self.assertEqual(self.create_db().entries, (entry, entry2))
+
+  def test_snapshot_only(self):
+    entries = [ Entry(id=uuid4(), group="a", value=i) for i in range(2) ]
+    with open(self.filename, "wb") as fd: fd.write(TypeAdapter(list[Entry]).dump_json(entries))
+    self.assertEqual(self.create_db().entries, tuple(entries))
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from streamtasks.net.serialization import RawData
+from streamtasks.rawdatabuffer import RawDataBuffer
+
+
+class TestRawDataBuffer(unittest.TestCase):
+  def test_append_pop(self):
+    buffer = RawDataBuffer(1 << 16)
+    for i in range(10): buffer.append(RawData({ "timestamp": i, "value": "x" * i }))
+    self.assertEqual(len(buffer), 10)
+    self.assertEqual(buffer[-1].data["timestamp"], 9)
+    self.assertEqual(buffer.popleft().data["timestamp"], 0)
+    self.assertEqual([ data.data["timestamp"] for data in buffer ], list(range(1, 10)))
+    buffer.clear()
+    self.assertEqual(len(buffer), 0)
+    self.assertEqual(list(buffer), [])
+
+  def test_ring(self):
+    buffer = RawDataBuffer(1000)
+    for i in range(1000): buffer.append(RawData({ "timestamp": i, "value": "x" * 40 }))
+    timestamps = [ data.data["timestamp"] for data in buffer ]
+    self.assertGreater(len(timestamps), 10)
+    self.assertEqual(timestamps, list(range(1000 - len(timestamps), 1000)))
+    with self.assertRaises(ValueError): buffer.append(RawData("x" * 2000))
+
+  def test_seek_range(self):
+    buffer = RawDataBuffer(1 << 16)
+    for i in range(0, 100, 10): buffer.append(RawData({ "timestamp": i }))
+    self.assertEqual(buffer.seek(35), 4)
+    self.assertEqual(buffer.seek(1000), 10)
+    self.assertEqual([ data.data["timestamp"] for data in buffer.range(20, 50) ], [ 20, 30, 40 ])
+
+  def test_append_while_iterating(self):
+    buffer = RawDataBuffer(1000)
+    buffer.append(RawData({ "timestamp": 0 }))
+    received = []
+    for data in buffer:
+      received.append(data.data["timestamp"])
+      if len(received) < 200: buffer.append(RawData({ "timestamp": len(received) }))
+    self.assertEqual(received, list(range(200)))
+
+if __name__ == '__main__':
+  unittest.main()
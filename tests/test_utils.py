@@ -1,7 +1,8 @@
 import asyncio
+import queue
 import unittest
 
-from streamtasks.utils import AsyncBool, AsyncConsumer, AsyncMPProducer, AsyncObservable, AsyncProducer, AsyncTaskManager
+from streamtasks.utils import AsyncBool, AsyncConsumer, AsyncMinTracker, AsyncMPProducer, AsyncObservable, AsyncProducer, AsyncTaskManager, FlowControlPolicy, FlowControlQueue, SyncQueue
 from tests.shared import async_timeout
 
 
@@ -30,6 +31,24 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
     await asyncio.sleep(0)
     self.assertTrue(task.done())
 
+  @async_timeout(1)
+  async def test_flow_control_queue(self):
+    queue = FlowControlQueue(2, FlowControlPolicy.DROP_OLDEST)
+    queue.put_nowait(1, FlowControlPolicy.BLOCK)
+    for i in range(2, 6): queue.put_nowait(i)
+    self.assertEqual(queue.dropped_count, 3)
+    self.assertFalse(queue.put_nowait(6, FlowControlPolicy.DROP_NEWEST))
+    self.assertEqual([ queue.get_nowait(), queue.get_nowait() ], [ 1, 5 ])
+
+    queue.put_nowait(1, FlowControlPolicy.BLOCK)
+    queue.put_nowait(2, FlowControlPolicy.BLOCK)
+    put_task = asyncio.create_task(queue.put(3, FlowControlPolicy.BLOCK))
+    await asyncio.sleep(0)
+    self.assertFalse(put_task.done())
+    self.assertEqual(await queue.get(), 1)
+    await put_task
+    self.assertEqual([ await queue.get(), await queue.get() ], [ 2, 3 ])
+
   async def test_task_manager(self):
     m = AsyncTaskManager()
     async def routine(): await asyncio.Future()
@@ -40,6 +59,44 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
     self.assertTrue(t1.cancelled())
     self.assertTrue(t2.cancelled())
 
+  async def test_min_tracker(self):
+    tracker = AsyncMinTracker[str]()
+    self.assertEqual(tracker.min, 0)
+    for i in range(200): tracker.set("a", i) # NOTE: compacts the outdated heap entries
+    tracker.set("b", 50)
+    self.assertEqual(tracker.min, 50)
+    f1 = tracker.wait_min(100)
+    f2 = tracker.wait_min(150)
+    self.assertTrue(tracker.wait_min(50).done())
+    tracker.set("b", 120)
+    self.assertTrue(f1.done())
+    self.assertFalse(f2.done())
+    tracker.remove("b")
+    self.assertEqual(tracker.min, 199)
+    self.assertTrue(f2.done())
+    self.assertLess(len(tracker._heap), 100)
+
+  async def test_sync_queue(self):
+    q = SyncQueue[int]()
+    with self.assertRaises(queue.Empty): q.get(timeout=0.001)
+    received: list[int] = []
+    thread = asyncio.create_task(asyncio.to_thread(lambda: received.extend(q)))
+    for i in range(3): q.put(i)
+    await asyncio.sleep(0.01)
+    q.put(3)
+    q.close()
+    await asyncio.wait_for(thread, 1) # NOTE: wakes up immediately on close
+    self.assertEqual(received, [ 0, 1, 2, 3 ][:len(received)])
+    self.assertGreaterEqual(len(received), 3)
+    with self.assertRaises(EOFError): q.get()
+
+  def test_sync_queue_max_size(self):
+    q = SyncQueue[int](3)
+    for i in range(10): q.put(i)
+    self.assertEqual(q.qsize(), 3)
+    self.assertEqual(q.dropped_count, 7)
+    self.assertEqual(q.get_all(), [ 7, 8, 9 ])
+
 class DemoProducer(AsyncProducer):
   def __init__(self) -> None:
     super().__init__()